@@ -1,9 +1,12 @@
+import json
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 
+from app.agents.stateless_agent import StatelessAgentMixin
 
-class ExecutiveAgent(Agent):
+
+class ExecutiveAgent(StatelessAgentMixin, Agent):
     def __init__(self, model: OpenAIChat, tools: list):
         """
         Initializes the ExecutiveAgent.
@@ -25,7 +28,7 @@ class ExecutiveAgent(Agent):
             -   **Section: Route Overview 🗺️** (Detailed information about distance, duration, and major roads from the routing tool output.)
             -   **Section: Step-by-Step Directions:** (A full detailed list of step-by-step directions from the routing tool output.)
             -   **Section: Weather Conditions ☁️** (Current weather information for the start location from the weather tool output.)
-            -   **Section: Recommendations and Tips 💡** (Practical advice based on the weather conditions and route details, e.g., "Wear a raincoat," "Strong headwinds," "Perfect weather for cycling!"). Also include any noteworthy stops or areas of interest along the way if applicable (though this might require an additional tool or more complex reasoning not currently in your toolset).
+            -   **Section: Recommendations and Tips 💡** (Practical advice based on the weather conditions and route details, e.g., "Wear a raincoat," "Strong headwinds," "Perfect weather for cycling!"). Also include noteworthy stops or areas of interest along the way, using any points of interest and place names found by the plan.
 
             Keep your tone friendly, concise, and helpful. Aim to empower the user to enjoy a safe and efficient ride!
             """
@@ -46,24 +49,52 @@ class ExecutiveAgent(Agent):
         Returns:
             A string representing the final, formatted response to the user.
         """
-        # Construct a prompt for the Executive Agent using the context
-        # We'll pass the relevant parts of the context to the executive agent for synthesis.
-        # Ensure the keys here match the 'output_key' values used by the PlannerAgent.
-        synthesis_prompt = dedent(
-            f"""\
-        Here is the information gathered from executing the plan:
+        synthesis_prompt = build_synthesis_prompt(context)
+        return self.run_isolated(synthesis_prompt)  # type: ignore
 
-        --- Weather Report ---
-        {context.get("weather_report", "Weather information not available.")}
 
-        --- Route Details ---
-        {context.get("cycling_route_details", "Route information not available.")}
+# Sections with a fixed place in the prompt; every other output follows them
+_KNOWN_SECTIONS = [
+    ("Weather Report", "weather_report", "Weather information not available."),
+    ("Route Details", "cycling_route_details", "Route information not available."),
+]
 
-        --- Geocoding Information ---
-        Origin Geocode: {context.get("origin_geocode", "Not available.")}
-        Destination Geocode: {context.get("destination_geocode", "Not available.")}
 
-        Please synthesize this information into a comprehensive cycling route plan, following the specified output format and including weather-based recommendations.
-        """
-        )
-        return self.run(synthesis_prompt)  # type: ignore
+def _format_output(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, indent=1)
+    return str(value)
+
+
+def build_synthesis_prompt(context: dict) -> str:
+    """
+    The synthesis prompt for the outputs of an executed plan.
+
+    Weather, route and geocodes are laid out under fixed headings (these keys
+    match the `output_key` values the PlannerAgent is prompted with). Every
+    other output, such as POI search results or reverse-geocoded place names,
+    is passed on under its output key, so no tool call is wasted.
+    """
+    sections = ["Here is the information gathered from executing the plan:"]
+    for title, key, missing in _KNOWN_SECTIONS:
+        sections.append(f"--- {title} ---\n{_format_output(context.get(key, missing))}")
+    sections.append(
+        "--- Geocoding Information ---\n"
+        f"Origin Geocode: {context.get('origin_geocode', 'Not available.')}\n"
+        f"Destination Geocode: {context.get('destination_geocode', 'Not available.')}"
+    )
+
+    used = {key for _, key, _ in _KNOWN_SECTIONS}
+    used.update(("origin_geocode", "destination_geocode"))
+    for key, value in context.items():
+        # Synthesis steps only leave a marker behind
+        if key in used or value == "Ready for synthesis.":
+            continue
+        sections.append(f"--- {key} ---\n{_format_output(value)}")
+
+    sections.append(
+        "Please synthesize this information into a comprehensive cycling route "
+        "plan, following the specified output format and including weather-based "
+        "recommendations."
+    )
+    return "\n\n".join(sections) + "\n"
@@ -2,9 +2,13 @@ import json
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
+from agno.run.response import RunEvent
 
+from app.agents.stateless_agent import StatelessAgentMixin
+from app.services.plan_stream import parse_plan_stream
 
-class PlannerAgent(Agent):
+
+class PlannerAgent(StatelessAgentMixin, Agent):
     def __init__(self, model: OpenAIChat, tools: list):
         """
         Initializes the PlannerAgent.
@@ -35,6 +39,8 @@ class PlannerAgent(Agent):
                     - "geocoding.geocode_location" for geocoding
                     - "weather_tools.get_current_weather" for weather
                     - "routing.get_route" for routing
+                    - "reverse_geocoding.reverse_geocode" for naming a coordinate point (local, no rate limit)
+                    - "poi_search.search_pois" for finding points of interest (sights, food, markets), if that tool is available
                 2. Do NOT use parallel tool execution or "multi_tool_use.parallel" - all steps must be sequential.
                 3. The final step should always be a synthesis step with `tool: null` that combines all gathered information.
 
@@ -104,9 +110,9 @@ class PlannerAgent(Agent):
         Returns:
             A list of dictionaries, where each dictionary represents a step in the plan.
         """
-        # The base Agent's run method will execute the planning instructions
-        # and return the raw string output.
-        raw_plan_output = self.run(f"Plan the following task: {user_query}")
+        # Each query runs in its own throw-away session, so the planner's prompt
+        # and memory stay the same size no matter how many queries it served.
+        raw_plan_output = self.run_isolated(f"Plan the following task: {user_query}")
         response_content = (
             raw_plan_output.content
             if hasattr(raw_plan_output, "content")
@@ -134,3 +140,23 @@ class PlannerAgent(Agent):
             print(f"An unexpected error occurred during plan parsing: {e}")
             print(f"Raw output: {raw_plan_output}")
             return []
+
+    def stream_planning(self, user_query: str):
+        """
+        Streams the plan for the user's query.
+
+        Yields each step dictionary as soon as the model has finished writing it,
+        so execution can start before the whole plan exists (see
+        execute_plan_stream). Steps that are not valid JSON are yielded as
+        {"malformed": raw_text, "error": message}.
+        """
+        stream = self.run_isolated(
+            f"Plan the following task: {user_query}", stream=True
+        )
+        chunks = (
+            event.content
+            for event in stream
+            if getattr(event, "event", None) == RunEvent.run_response_content.value
+            and isinstance(event.content, str)
+        )
+        yield from parse_plan_stream(chunks)
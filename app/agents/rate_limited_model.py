@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from typing import Optional
+from agno.models.openai import OpenAIChat
+from openai import OpenAI
+
+from app.services.llm_rate_limiter import (
+    DEFAULT_COMPLETION_TOKENS,
+    PRIORITY_INTERACTIVE,
+    estimate_tokens,
+    get_llm_rate_limiter,
+)
+
+
+def _total_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+@dataclass
+class RateLimitedOpenAIChat(OpenAIChat):
+    """
+    OpenAIChat whose API calls are admitted through the shared LLMRateLimiter.
+
+    Every model invocation, sync or async (including the follow-up calls after
+    tool use), is budgeted individually, and 429 responses are retried by the limiter using
+    the server's retry-after hint instead of the OpenAI client's blind retries.
+    """
+
+    priority: int = PRIORITY_INTERACTIVE
+    max_retries: Optional[int] = 0
+    _client: Optional[OpenAI] = field(default=None, init=False, repr=False)
+
+    def get_client(self) -> OpenAI:
+        # OpenAIChat builds a new client (and connection pool) on every call;
+        # keep one per model so connections are reused across requests
+        if self._client is None:
+            self._client = super().get_client()
+        return self._client
+
+    def __deepcopy__(self, memo):
+        # Agno deep-copies models (e.g. for memory); copies share the client
+        if self._client is not None:
+            memo[id(self._client)] = self._client
+        return super().__deepcopy__(memo)
+
+    def _estimate_call_tokens(self, messages, tools) -> int:
+        prompt = "".join(str(message.content or "") for message in messages)
+        tokens = estimate_tokens(prompt) + 4 * len(messages)
+        if tools:
+            tokens += estimate_tokens(tools)
+        return tokens + (
+            self.max_completion_tokens or self.max_tokens or DEFAULT_COMPLETION_TOKENS
+        )
+
+    def invoke(self, messages, *args, **kwargs):
+        estimated = self._estimate_call_tokens(messages, kwargs.get("tools"))
+        return get_llm_rate_limiter().call(
+            lambda: super(RateLimitedOpenAIChat, self).invoke(
+                messages, *args, **kwargs
+            ),
+            estimated_tokens=estimated,
+            priority=self.priority,
+            usage_of=_total_tokens,
+        )
+
+    def invoke_stream(self, messages, *args, **kwargs):
+        limiter = get_llm_rate_limiter()
+        estimated = self._estimate_call_tokens(messages, kwargs.get("tools"))
+
+        # The first chunk carries any 429, so admission and retries wrap only the
+        # opening of the stream; the usage chunk at the end reconciles the budget.
+        # OpenAIChat requests that chunk itself (stream_options={"include_usage":
+        # True}), so it must not be passed again here; tests pin that it is sent.
+        stream = None
+
+        def open_stream():
+            nonlocal stream
+            stream = super(RateLimitedOpenAIChat, self).invoke_stream(
+                messages, *args, **kwargs
+            )
+            return next(stream, None)
+
+        first_chunk = limiter.call(
+            open_stream, estimated_tokens=estimated, priority=self.priority
+        )
+        if first_chunk is None:
+            return
+        debited = min(estimated, limiter.tokens_per_minute)
+        actual = _total_tokens(first_chunk)
+        # Settled however the stream ends: exhausted, closed early or failed
+        try:
+            yield first_chunk
+            for chunk in stream:
+                actual = _total_tokens(chunk) or actual
+                yield chunk
+        finally:
+            limiter.reconcile(debited, actual)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        estimated = self._estimate_call_tokens(messages, kwargs.get("tools"))
+        return await get_llm_rate_limiter().acall(
+            lambda: super(RateLimitedOpenAIChat, self).ainvoke(
+                messages, *args, **kwargs
+            ),
+            estimated_tokens=estimated,
+            priority=self.priority,
+            usage_of=_total_tokens,
+        )
+
+    async def ainvoke_stream(self, messages, *args, **kwargs):
+        limiter = get_llm_rate_limiter()
+        estimated = self._estimate_call_tokens(messages, kwargs.get("tools"))
+        stream = None
+
+        async def open_stream():
+            nonlocal stream
+            stream = super(RateLimitedOpenAIChat, self).ainvoke_stream(
+                messages, *args, **kwargs
+            )
+            return await anext(stream, None)
+
+        first_chunk = await limiter.acall(
+            open_stream, estimated_tokens=estimated, priority=self.priority
+        )
+        if first_chunk is None:
+            return
+        debited = min(estimated, limiter.tokens_per_minute)
+        actual = _total_tokens(first_chunk)
+        try:
+            yield first_chunk
+            async for chunk in stream:
+                actual = _total_tokens(chunk) or actual
+                yield chunk
+        finally:
+            limiter.reconcile(debited, actual)
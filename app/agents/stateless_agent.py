@@ -0,0 +1,63 @@
+from uuid import uuid4
+
+
+class StatelessAgentMixin:
+    """
+    Lets an Agno Agent serve any number of requests with constant memory.
+
+    The agent itself only holds configuration: the tool schemas and the system
+    message (instructions plus tool instructions) are built once by `prepare`
+    and reused verbatim. Each `run_isolated` call gets its own session with a
+    fresh memory, no history is added to the prompt, and everything the run
+    left on the agent is dropped when it finishes.
+
+    Mix in before Agent: `class PlannerAgent(StatelessAgentMixin, Agent)`.
+    An agent should only serve one request at a time; use one per worker thread.
+    """
+
+    _prepared = False
+
+    def prepare(self):
+        """Builds the tool schemas and system message once."""
+        if self._prepared:
+            return
+        self.initialize_agent()
+        self.determine_tools_for_model(model=self.model, session_id="template")
+        system_message = self.get_system_message(session_id="template")
+        if system_message is not None:
+            self.system_message = system_message.content
+        self.add_history_to_messages = False
+        self._prepared = True
+        self.release_session()
+
+    def run_isolated(self, message, **kwargs):
+        """
+        Runs `message` in a new, throw-away session and returns the RunResponse.
+        With `stream=True` the session is released once the stream is exhausted.
+        """
+        self.prepare()
+        try:
+            response = self.run(message, session_id=f"request-{uuid4()}", **kwargs)
+        except Exception:
+            self.release_session()
+            raise
+        if kwargs.get("stream"):
+            return self._release_after(response)
+        self.release_session()
+        return response
+
+    def _release_after(self, stream):
+        try:
+            yield from stream
+        finally:
+            self.release_session()
+
+    def release_session(self):
+        """Drops the per-request state (memory, run messages, session data)."""
+        # The Memory object is kept (building one deep-copies the model), only
+        # emptied
+        if self.memory is not None:
+            self.memory.clear()
+        self.session_id = None
+        self.reset_run_state()
+        self.reset_session()
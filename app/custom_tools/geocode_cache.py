@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from app.services.place_names import place_key
+
+
+class GeocodeCache:
+    """
+    Persistent geocode cache shared by every process on the host.
+
+    Results are stored in SQLite (WAL mode), so any number of worker processes
+    can read concurrently while one writes; a place geocoded by one worker is
+    reused by all the others and by later runs.
+
+    Names Nominatim did not find are stored too, as an empty result, so no
+    worker asks for them again until `not_found_max_age_days` have passed.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_age_days: float = 90.0,
+        not_found_max_age_days: float = 7.0,
+    ):
+        self.path = path or os.getenv("GEOCODE_CACHE_PATH", ".cache/geocodes.sqlite3")
+        self.max_age_s = max_age_days * 86400
+        self.not_found_max_age_s = not_found_max_age_days * 86400
+        self.stats = {"hits": 0, "not_found": 0, "misses": 0}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocodes (
+                name TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (name, country_code)
+            ) WITHOUT ROWID
+            """
+        )
+        self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _key(location_name, country_code):
+        # "Khalishpur, Khulna, Bangladesh" from a plan finds the warmed
+        # "Khalishpur, Khulna", while "Dhaka Division" and "Dhaka" stay apart
+        return place_key(location_name), str(country_code).lower()
+
+    def get(self, location_name, country_code="bd") -> Optional[dict]:
+        """
+        Returns the stored geocode for `location_name`, {} if it is known not
+        to be found, or None if it has to be looked up.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result FROM geocodes WHERE name = ? AND country_code = ? "
+                "AND created_at >= CASE WHEN result = '{}' THEN ? ELSE ? END",
+                (
+                    *self._key(location_name, country_code),
+                    now - self.not_found_max_age_s,
+                    now - self.max_age_s,
+                ),
+            ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        result = json.loads(row[0])
+        self.stats["hits" if result else "not_found"] += 1
+        return result
+
+    def store(self, location_name, country_code, result: dict):
+        """Stores a geocode; pass {} to record that the name was not found."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?)",
+                (
+                    *self._key(location_name, country_code),
+                    time.time(),
+                    json.dumps(result, ensure_ascii=False),
+                ),
+            )
+            self._connection.commit()
@@ -1,10 +1,21 @@
 import requests
+from typing import Optional
 from agno.tools import Toolkit
 
+from app.custom_tools.geocode_cache import GeocodeCache
+
 
 class GeocodingTools(Toolkit):
-    def __init__(self):
+    def __init__(self, geocode_cache: Optional[GeocodeCache] = None):
+        """
+        Args:
+            geocode_cache: Optional persistent cache. When given, places that were
+                geocoded before (by any process sharing the cache file) are
+                answered without calling Nominatim, and so are names it
+                recently did not find.
+        """
         super().__init__(name="geocoding")
+        self.geocode_cache = geocode_cache
         self.nominatim_url = "https://nominatim.openstreetmap.org/search"
         self.register(self.geocode_location)
 
@@ -22,6 +33,11 @@ class GeocodingTools(Toolkit):
             'display_name' is useful for the agent to confirm the location found.
         """
         try:
+            if self.geocode_cache is not None:
+                cached = self.geocode_cache.get(location_name, country_code)
+                if cached is not None:
+                    return cached
+
             params = {
                 "q": location_name,
                 "format": "json",  # Request JSON output
@@ -41,11 +57,17 @@ class GeocodingTools(Toolkit):
 
             if data:
                 # If a result is found, extract latitude, longitude, and display name.
-                return {
+                result = {
                     "latitude": float(data[0]["lat"]),
                     "longitude": float(data[0]["lon"]),
                     "display_name": data[0]["display_name"],
                 }
+                if self.geocode_cache is not None:
+                    self.geocode_cache.store(location_name, country_code, result)
+                return result
+            # Not found; network errors below are not cached, so they are retried
+            if self.geocode_cache is not None:
+                self.geocode_cache.store(location_name, country_code, {})
             return {}  # Return an empty dictionary if no location is found
         except requests.exceptions.RequestException as e:
             # Handle network-related errors (e.g., connection refused, timeout)
@@ -0,0 +1,219 @@
+import csv
+import os
+import numpy as np
+
+from app.services.poi_sources import (
+    iter_json_array,
+    iter_poi_text,
+    normalize_poi,
+)
+
+
+EARTH_RADIUS_KM = 6371.0
+# Offset that keeps packed cell rows/columns positive
+_CELL_OFFSET = 1 << 20
+# GeoNames feature codes worth labelling points with (populated places/sections)
+_GEONAMES_KINDS = {
+    "PPLC": "locality",
+    "PPLA": "locality",
+    "PPLA2": "locality",
+    "PPLA3": "locality",
+    "PPLA4": "locality",
+    "PPL": "locality",
+    "PPLX": "neighborhood",
+}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in kilometers."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class PlaceIndex:
+    """
+    Nearest-place lookup over a fixed set of places using a uniform grid.
+
+    Places are projected onto a local equirectangular plane (km) and bucketed into
+    square cells of `cell_km`. Each occupied cell keeps a padded row of its place
+    ids, so a batch of queries is answered with one NumPy gather over the 3x3
+    block of cells around each query. Queries with nothing within `cell_km` in
+    that block fall back to a brute-force scan, so the result is always the
+    nearest place on the projected plane.
+    """
+
+    # Bounds the (queries x candidates) distance matrix built per chunk
+    MAX_CHUNK_CANDIDATES = 1 << 22
+
+    def __init__(self, places, cell_km=5.0):
+        self.places = [
+            place
+            for place in places
+            if place.get("latitude") is not None and place.get("longitude") is not None
+        ]
+        self.cell_km = cell_km
+        latitudes = np.array([p["latitude"] for p in self.places], dtype=np.float64)
+        longitudes = np.array([p["longitude"] for p in self.places], dtype=np.float64)
+        self.latitudes, self.longitudes = latitudes, longitudes
+        self._x_scale = np.cos(np.radians(latitudes.mean())) if self.places else 1.0
+        self._xy = self._project(latitudes, longitudes)
+
+        keys = self._pack(np.floor(self._xy / cell_km).astype(np.int64))
+        self._cell_keys, cell_of_place, counts = np.unique(
+            keys, return_inverse=True, return_counts=True
+        )
+        # Row per occupied cell with its place ids, padded with -1
+        order = np.argsort(cell_of_place, kind="stable")
+        slot = np.arange(len(order)) - np.repeat(np.cumsum(counts) - counts, counts)
+        self._cell_members = np.full(
+            (len(self._cell_keys), counts.max() if len(counts) else 0),
+            -1,
+            dtype=np.int64,
+        )
+        self._cell_members[cell_of_place[order], slot] = order
+
+    def __len__(self):
+        return len(self.places)
+
+    def _project(self, latitudes, longitudes):
+        degree_km = np.radians(1.0) * EARTH_RADIUS_KM
+        return np.stack(
+            [
+                np.asarray(longitudes, dtype=np.float64) * degree_km * self._x_scale,
+                np.asarray(latitudes, dtype=np.float64) * degree_km,
+            ],
+            axis=-1,
+        ).reshape(-1, 2)
+
+    @staticmethod
+    def _pack(cells):
+        return ((cells[..., 0] + _CELL_OFFSET) << 32) | (cells[..., 1] + _CELL_OFFSET)
+
+    def _candidates(self, cells):
+        """Place ids in the 3x3 block around each cell, padded with -1."""
+        offsets = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+        keys = self._pack(cells[:, None, :] + offsets[None, :, :])
+        rows = np.searchsorted(self._cell_keys, keys)
+        rows = np.minimum(rows, len(self._cell_keys) - 1)
+        occupied = self._cell_keys[rows] == keys
+        candidates = self._cell_members[rows]
+        candidates[~occupied] = -1
+        return candidates.reshape(len(cells), -1)
+
+    def _nearest_in_grid(self, query_xy):
+        candidates = self._candidates(
+            np.floor(query_xy / self.cell_km).astype(np.int64)
+        )
+        d2 = ((query_xy[:, None, :] - self._xy[candidates]) ** 2).sum(axis=-1)
+        d2[candidates < 0] = np.inf
+        best = d2.argmin(axis=1)
+        rows = np.arange(len(query_xy))
+        return candidates[rows, best], d2[rows, best]
+
+    def _brute_force(self, query_xy):
+        indices = np.empty(len(query_xy), dtype=np.int64)
+        chunk_rows = max(1, self.MAX_CHUNK_CANDIDATES // len(self.places))
+        for start in range(0, len(query_xy), chunk_rows):
+            chunk = query_xy[start : start + chunk_rows]
+            d2 = ((chunk[:, None, :] - self._xy[None, :, :]) ** 2).sum(axis=-1)
+            indices[start : start + chunk_rows] = d2.argmin(axis=1)
+        return indices
+
+    def nearest(self, latitudes, longitudes, max_distance_km=None):
+        """
+        Nearest place for each query point.
+
+        Args:
+            latitudes: Array-like of query latitudes.
+            longitudes: Array-like of query longitudes (same length).
+            max_distance_km: Optional radius; points with no place within it get -1.
+
+        Returns:
+            (indices, distances_km) NumPy arrays; indices point into `places`.
+        """
+        latitudes = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+        longitudes = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+        indices = np.full(len(latitudes), -1, dtype=np.int64)
+        distances = np.full(len(latitudes), np.inf)
+        if not self.places or not len(latitudes):
+            return indices, distances
+
+        query_xy = self._project(latitudes, longitudes)
+        squared = np.empty(len(latitudes))
+        chunk_rows = max(
+            1, self.MAX_CHUNK_CANDIDATES // (9 * self._cell_members.shape[1])
+        )
+        for start in range(0, len(query_xy), chunk_rows):
+            end = start + chunk_rows
+            indices[start:end], squared[start:end] = self._nearest_in_grid(
+                query_xy[start:end]
+            )
+
+        # Anything outside the 3x3 block is at least one cell away, and within a
+        # radius no larger than a cell the block already decides
+        if max_distance_km is None or max_distance_km > self.cell_km:
+            unresolved = np.flatnonzero(squared > self.cell_km**2)
+            if len(unresolved):
+                indices[unresolved] = self._brute_force(query_xy[unresolved])
+
+        found = indices >= 0
+        distances[found] = haversine_km(
+            latitudes[found],
+            longitudes[found],
+            self.latitudes[indices[found]],
+            self.longitudes[indices[found]],
+        )
+        if max_distance_km is not None:
+            too_far = distances > max_distance_km
+            indices[too_far] = -1
+            distances[too_far] = np.inf
+        return indices, distances
+
+
+def load_places(path):
+    """Reads places in the `data/places_bangladesh.json` format."""
+    return [
+        place
+        for place in iter_json_array(path)
+        if place.get("latitude") is not None and place.get("longitude") is not None
+    ]
+
+
+def load_geonames_extract(path, feature_kinds=None):
+    """
+    Reads populated places from a GeoNames country extract (e.g. BD.txt from
+    https://download.geonames.org/export/dump/), tab separated, one place per line.
+    """
+    feature_kinds = feature_kinds or _GEONAMES_KINDS
+    places = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(row) < 8 or row[6] != "P" or row[7] not in feature_kinds:
+                continue
+            places.append(
+                {
+                    "name": row[1],
+                    "kind": feature_kinds[row[7]],
+                    "latitude": float(row[4]),
+                    "longitude": float(row[5]),
+                }
+            )
+    return places
+
+
+def load_pois(paths):
+    """Reads POIs with coordinates from the JSON and text POI sources."""
+    pois = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        parser = iter_poi_text if path.endswith(".txt") else iter_json_array
+        for raw in parser(path):
+            poi = normalize_poi(raw, path)
+            if "latitude" in poi and poi.get("name"):
+                pois.append(poi)
+    return pois
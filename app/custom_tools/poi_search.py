@@ -0,0 +1,100 @@
+import os
+from typing import Optional
+from agno.tools import Toolkit
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_service import EmbeddingService
+from app.services.llm_rate_limiter import PRIORITY_INTERACTIVE
+from app.services.poi_search_service import POISearchService
+
+# Fields passed back to the agents; content and full_data only bloat the prompt
+_RESULT_FIELDS = ("poi_name", "location", "category", "description", "coordinates")
+
+
+class POISearchTools(Toolkit):
+    def __init__(self, search_service: POISearchService):
+        super().__init__(name="poi_search")
+        self.search_service = search_service
+
+        self.register(self.search_pois)
+
+    def search_pois(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        limit: int = 5,
+    ) -> list:
+        """
+        Find points of interest in Bangladesh matching a description or a name.
+
+        Args:
+            query: What to look for (e.g., 'mughal architecture', 'Lalbagh Fort')
+            category: Optional POI category to restrict the results to
+            location: Optional place name the POI must be located in (e.g., 'Old Dhaka')
+            limit: Maximum number of results
+
+        Returns:
+            List of POIs with poi_name, location, category, description and
+            coordinates ("latitude, longitude"), best match first
+        """
+        try:
+            results = self.search_service.search(
+                query, limit=int(limit), category=category, location=location
+            )
+            return [
+                {field: result.get(field, "") for field in _RESULT_FIELDS}
+                for result in results
+            ]
+        except Exception as e:
+            print(f"Error searching POIs: {e}")
+            return []
+
+
+def build_poi_search_tools() -> Optional[POISearchTools]:
+    """
+    POISearchTools backed by the process-wide Weaviate client (see
+    `get_shared_weaviate_client`), or by the local int8 index exported by
+    setup_embeddings.py when Weaviate is not reachable. Returns None if neither
+    is available, in which case the planner simply goes without the tool.
+
+    Query embeddings run at interactive priority and go through the persistent
+    embedding cache, so phrases warmed by warm_cache.py cost no API call.
+    """
+    embedding_service = EmbeddingService(
+        priority=PRIORITY_INTERACTIVE, cache=EmbeddingCache()
+    )
+
+    try:
+        from app.vector_store.weaviate_client import get_shared_weaviate_client
+
+        # Connected and warmed up here, at startup; every thread shares it
+        weaviate_client = get_shared_weaviate_client()
+        stored = weaviate_client.get_vector_dimensions()
+        if stored is not None and stored != embedding_service.dimensions:
+            raise ValueError(
+                f"collection holds {stored}-d vectors but EMBEDDING_DIMENSIONS is "
+                f"{embedding_service.dimensions}; re-run setup_embeddings.py"
+            )
+        return POISearchTools(POISearchService(weaviate_client, embedding_service))
+    except Exception as e:
+        print(f"Weaviate POI search unavailable: {e}")
+
+    index_path = os.getenv("LOCAL_VECTOR_INDEX_PATH", ".cache/poi_index")
+    if not os.path.exists(os.path.join(index_path, "codes.npy")):
+        print(f"No local POI index at {index_path}, POI search disabled")
+        return None
+
+    from app.vector_store.quantized_index import QuantizedVectorIndex
+
+    local_index = QuantizedVectorIndex.load(index_path, mmap_codes=True)
+    if local_index.dimensions != embedding_service.dimensions:
+        print(
+            f"Local POI index holds {local_index.dimensions}-d vectors but "
+            f"EMBEDDING_DIMENSIONS is {embedding_service.dimensions}, "
+            "POI search disabled; re-run setup_embeddings.py"
+        )
+        return None
+    print(f"Using local POI index at {index_path}")
+    return POISearchTools(
+        POISearchService(None, embedding_service, local_index=local_index)
+    )
@@ -0,0 +1,160 @@
+import os
+import numpy as np
+from typing import Optional
+from agno.tools import Toolkit
+
+from app.custom_tools.place_index import (
+    PlaceIndex,
+    load_geonames_extract,
+    load_places,
+    load_pois,
+)
+
+
+DEFAULT_PLACES_PATH = "data/places_bangladesh.json"
+DEFAULT_POI_PATHS = [
+    "data/points_of_interest_bangladesh.json",
+    "data/point_of_interest.txt",
+]
+
+
+class ReverseGeocoder:
+    """
+    Offline reverse geocoding against local indexes of Bangladesh places and POIs.
+
+    District and division come from the nearest district seat, so points close to
+    a district border may be attributed to the neighbouring district. Areas
+    (neighbourhoods and localities) and landmarks are only reported within
+    `area_radius_km` and `landmark_radius_km`.
+    """
+
+    def __init__(self, places, pois=(), area_radius_km=3.0, landmark_radius_km=1.0):
+        self.districts = PlaceIndex(
+            [p for p in places if p.get("kind") == "district"], cell_km=25.0
+        )
+        self.areas = PlaceIndex(
+            [p for p in places if p.get("kind") in ("neighborhood", "locality")],
+            cell_km=area_radius_km,
+        )
+        self.landmarks = PlaceIndex(pois, cell_km=landmark_radius_km)
+        self.area_radius_km = area_radius_km
+        self.landmark_radius_km = landmark_radius_km
+
+    @classmethod
+    def from_files(cls, places_path=None, poi_paths=None, extract_path=None):
+        """
+        Builds the geocoder from the bundled places file and POI sources, plus an
+        optional extract (PLACES_EXTRACT_PATH): a GeoNames country file or a JSON
+        array in the places file format.
+        """
+        places = load_places(places_path or DEFAULT_PLACES_PATH)
+        extract_path = extract_path or os.getenv("PLACES_EXTRACT_PATH")
+        if extract_path:
+            if extract_path.endswith(".json"):
+                places.extend(load_places(extract_path))
+            else:
+                places.extend(load_geonames_extract(extract_path))
+        pois = load_pois(poi_paths or DEFAULT_POI_PATHS)
+        return cls(places, pois)
+
+    def reverse_batch(self, latitudes, longitudes) -> list:
+        """
+        Labels many points at once.
+
+        Returns:
+            One dictionary per point with 'label', 'area', 'district', 'division'
+            and 'landmark' ({'name', 'distance_km'} or None).
+        """
+        district_ids, _ = self.districts.nearest(latitudes, longitudes)
+        area_ids, _ = self.areas.nearest(
+            latitudes, longitudes, max_distance_km=self.area_radius_km
+        )
+        landmark_ids, landmark_km = self.landmarks.nearest(
+            latitudes, longitudes, max_distance_km=self.landmark_radius_km
+        )
+
+        results = []
+        for district_id, area_id, landmark_id, distance_km in zip(
+            district_ids, area_ids, landmark_ids, landmark_km
+        ):
+            district = self.districts.places[district_id] if district_id >= 0 else {}
+            area = self.areas.places[area_id] if area_id >= 0 else None
+            district_name = (area or {}).get("district") or district.get("name")
+            division_name = (area or {}).get("division") or district.get("division")
+
+            if area:
+                label = f"{area['name']}, {district_name}"
+            elif district_name:
+                label = f"{district_name} District"
+            else:
+                label = "Unknown"
+
+            landmark = None
+            if landmark_id >= 0:
+                landmark = {
+                    "name": self.landmarks.places[landmark_id]["name"],
+                    "distance_km": round(float(distance_km), 2),
+                }
+
+            results.append(
+                {
+                    "label": label,
+                    "area": area["name"] if area else None,
+                    "district": district_name,
+                    "division": division_name,
+                    "landmark": landmark,
+                }
+            )
+        return results
+
+    def reverse(self, latitude, longitude) -> dict:
+        return self.reverse_batch([latitude], [longitude])[0]
+
+
+class ReverseGeocodingTools(Toolkit):
+    def __init__(self, geocoder: Optional[ReverseGeocoder] = None):
+        """
+        Args:
+            geocoder: ReverseGeocoder to use; built from the bundled data files
+                when not given.
+        """
+        super().__init__(name="reverse_geocoding")
+        self.geocoder = geocoder or ReverseGeocoder.from_files()
+        self.register(self.reverse_geocode)
+        # label_points is not registered: a plan has no list of points to pass
+
+    def reverse_geocode(self, latitude: float, longitude: float) -> dict:
+        """
+        Finds the place name for a coordinate point using a local index (no network).
+
+        Args:
+            latitude: Latitude of the point.
+            longitude: Longitude of the point.
+
+        Returns:
+            A dictionary with 'label' (e.g. "Dhanmondi, Dhaka"), 'area', 'district',
+            'division' and the nearest 'landmark' within 1 km, or an empty dict on error.
+        """
+        try:
+            return self.geocoder.reverse(float(latitude), float(longitude))
+        except Exception as e:
+            print(f"Unexpected error in reverse geocoding: {e}")
+            return {}
+
+    def label_points(self, points: list) -> list:
+        """
+        Finds place names for many coordinate points at once, e.g. route waypoints or
+        weather sample points. For direct callers; not exposed to the planner.
+
+        Args:
+            points: A list of [latitude, longitude] pairs.
+
+        Returns:
+            A list with one reverse_geocode result per point, in the same order.
+        """
+        try:
+            coordinates = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            return self.geocoder.reverse_batch(coordinates[:, 0], coordinates[:, 1])
+        except Exception as e:
+            print(f"Unexpected error in reverse geocoding: {e}")
+            return []
@@ -0,0 +1,324 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = 111320.0
+# Offset that keeps packed cell rows/columns positive for any lat/lon
+_CELL_OFFSET = 1 << 24
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> float:
+    """Great-circle distance in meters between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> list:
+    """Decodes an encoded polyline (OSRM default geometry) into [lat, lon] pairs."""
+    coordinates, index, lat, lon = [], 0, 0, 0
+    factor = 10**precision
+    while index < len(encoded):
+        for axis in range(2):
+            shift, result = 0, 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            delta = ~(result >> 1) if result & 1 else result >> 1
+            if axis == 0:
+                lat += delta
+            else:
+                lon += delta
+        coordinates.append([lat / factor, lon / factor])
+    return coordinates
+
+
+def encode_polyline(coordinates: list, precision: int = 5) -> str:
+    """Encodes [lat, lon] pairs into a polyline string."""
+    factor = 10**precision
+    output, previous = [], (0, 0)
+    for lat, lon in coordinates:
+        current = (int(round(lat * factor)), int(round(lon * factor)))
+        for delta in (current[0] - previous[0], current[1] - previous[1]):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                output.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            output.append(chr(value + 63))
+        previous = current
+    return "".join(output)
+
+
+def compact_route(osrm_route: dict, waypoints: list) -> dict:
+    """
+    Reduces an OSRM route object to the fields the planner needs.
+
+    Steps are stored as [type, modifier, name, distance] lists and the geometry
+    as the encoded polyline, so a typical city route takes a few hundred bytes.
+    """
+    steps = []
+    for leg in osrm_route.get("legs", []):
+        for step in leg.get("steps", []):
+            maneuver = step.get("maneuver", {})
+            steps.append(
+                [
+                    maneuver.get("type", "unknown"),
+                    maneuver.get("modifier", ""),
+                    step.get("name", "").strip(),
+                    round(step.get("distance", 0), 1),
+                ]
+            )
+    return {
+        "distance": osrm_route["distance"],
+        "duration": osrm_route.get("duration"),
+        "geometry": osrm_route.get("geometry", ""),
+        "steps": steps,
+        # OSRM waypoint locations are [lon, lat] of the points snapped to the road
+        "start": [waypoints[0]["location"][1], waypoints[0]["location"][0]],
+        "end": [waypoints[-1]["location"][1], waypoints[-1]["location"][0]],
+    }
+
+
+class RouteCache:
+    """
+    Persistent approximate route cache for OSRM results.
+
+    Origin and destination are snapped to a square grid of `cell_size_m` meters.
+    A lookup reuses a stored route when both endpoints lie within `tolerance_m`
+    of the stored endpoints (searching the neighbouring cells too), and adds short
+    connector legs between the requested points and the stored route.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        cell_size_m: float = 150.0,
+        tolerance_m: float = 250.0,
+        max_age_days: float = 30.0,
+    ):
+        self.path = path or os.getenv("ROUTE_CACHE_PATH", ".cache/routes.sqlite3")
+        self.cell_size_deg = cell_size_m / METERS_PER_DEGREE
+        self.tolerance_m = tolerance_m
+        self.max_age_s = max_age_days * 86400
+        # Neighbour rings needed so that any endpoint within tolerance is found
+        self.search_radius = max(1, math.ceil(tolerance_m / cell_size_m))
+        self.stats = {"exact_hits": 0, "approximate_hits": 0, "misses": 0}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS routes (
+                origin_cell INTEGER NOT NULL,
+                destination_cell INTEGER NOT NULL,
+                origin_lat REAL NOT NULL,
+                origin_lon REAL NOT NULL,
+                destination_lat REAL NOT NULL,
+                destination_lon REAL NOT NULL,
+                created_at REAL NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (origin_cell, destination_cell)
+            ) WITHOUT ROWID
+            """
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._check_grid(cell_size_m)
+        self._connection.commit()
+
+    def _check_grid(self, cell_size_m):
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = 'cell_size_m'"
+        ).fetchone()
+        if row is not None and float(row[0]) != float(cell_size_m):
+            print(
+                f"Route cache grid changed ({row[0]} m -> {cell_size_m} m), clearing cached routes"
+            )
+            self._connection.execute("DELETE FROM routes")
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('cell_size_m', ?)",
+            (str(cell_size_m),),
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _cell(self, latitude, longitude):
+        return (
+            math.floor(latitude / self.cell_size_deg),
+            math.floor(longitude / self.cell_size_deg),
+        )
+
+    @staticmethod
+    def _pack(cell):
+        return ((cell[0] + _CELL_OFFSET) << 26) | (cell[1] + _CELL_OFFSET)
+
+    def _neighbourhood(self, latitude, longitude):
+        row, col = self._cell(latitude, longitude)
+        r = self.search_radius
+        return [
+            self._pack((row + d_row, col + d_col))
+            for d_row in range(-r, r + 1)
+            for d_col in range(-r, r + 1)
+        ]
+
+    def lookup(
+        self, origin_lat, origin_lon, destination_lat, destination_lon
+    ) -> Optional[dict]:
+        """
+        Returns a compact route (see `compact_route`) for the requested endpoints,
+        with connector legs added, or None if no stored route is close enough.
+        """
+        origin_cells = self._neighbourhood(origin_lat, origin_lon)
+        destination_cells = self._neighbourhood(destination_lat, destination_lon)
+        query = (
+            "SELECT origin_lat, origin_lon, destination_lat, destination_lon, payload "
+            f"FROM routes WHERE origin_cell IN ({','.join('?' * len(origin_cells))}) "
+            f"AND destination_cell IN ({','.join('?' * len(destination_cells))}) "
+            "AND created_at >= ?"
+        )
+        with self._lock:
+            rows = self._connection.execute(
+                query,
+                origin_cells + destination_cells + [time.time() - self.max_age_s],
+            ).fetchall()
+
+        best, best_offset, best_endpoints = None, None, None
+        for o_lat, o_lon, d_lat, d_lon, payload in rows:
+            origin_offset = haversine_m(origin_lat, origin_lon, o_lat, o_lon)
+            destination_offset = haversine_m(
+                destination_lat, destination_lon, d_lat, d_lon
+            )
+            if max(origin_offset, destination_offset) > self.tolerance_m:
+                continue
+            if best_offset is None or origin_offset + destination_offset < best_offset:
+                best, best_offset = payload, origin_offset + destination_offset
+                best_endpoints = (origin_offset, destination_offset)
+
+        if best is None:
+            outcome = "misses"
+        elif best_offset == 0:
+            outcome = "exact_hits"
+        else:
+            outcome = "approximate_hits"
+        with self._lock:
+            self.stats[outcome] += 1
+        if best is None:
+            return None
+
+        route = json.loads(zlib.decompress(best))
+        return self._add_connectors(
+            route,
+            origin_lat,
+            origin_lon,
+            destination_lat,
+            destination_lon,
+            *best_endpoints,
+        )
+
+    def contains(
+        self, origin_lat, origin_lon, destination_lat, destination_lon
+    ) -> bool:
+        """
+        True if an unexpired route is stored for exactly these endpoints (to
+        within a meter). Unlike `lookup`, routes that are only within tolerance
+        do not count, and the hit statistics are left alone.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT origin_lat, origin_lon, destination_lat, destination_lon "
+                "FROM routes WHERE origin_cell = ? AND destination_cell = ? "
+                "AND created_at >= ?",
+                (
+                    self._pack(self._cell(origin_lat, origin_lon)),
+                    self._pack(self._cell(destination_lat, destination_lon)),
+                    time.time() - self.max_age_s,
+                ),
+            ).fetchone()
+        if row is None:
+            return False
+        o_lat, o_lon, d_lat, d_lon = row
+        return (
+            haversine_m(origin_lat, origin_lon, o_lat, o_lon) <= 1.0
+            and haversine_m(destination_lat, destination_lon, d_lat, d_lon) <= 1.0
+        )
+
+    def store(
+        self, origin_lat, origin_lon, destination_lat, destination_lon, route: dict
+    ):
+        """Stores a compact route under the snapped cells of its endpoints."""
+        payload = zlib.compress(
+            json.dumps(route, separators=(",", ":")).encode("utf-8")
+        )
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._pack(self._cell(origin_lat, origin_lon)),
+                    self._pack(self._cell(destination_lat, destination_lon)),
+                    origin_lat,
+                    origin_lon,
+                    destination_lat,
+                    destination_lon,
+                    time.time(),
+                    payload,
+                ),
+            )
+            self._connection.commit()
+
+    def _add_connectors(
+        self,
+        route,
+        origin_lat,
+        origin_lon,
+        destination_lat,
+        destination_lon,
+        origin_offset,
+        destination_offset,
+    ):
+        """
+        Adds straight connector legs from the requested points to the stored route
+        when they differ from the endpoints the route was originally fetched for.
+        """
+        steps = route["steps"]
+        geometry = decode_polyline(route["geometry"]) if route["geometry"] else []
+
+        # Offsets under a few meters are geocoding noise, not worth a step
+        if origin_offset >= 5:
+            start_gap = haversine_m(origin_lat, origin_lon, *route["start"])
+            steps.insert(0, ["connector", "start", "", round(start_gap, 1)])
+            geometry.insert(0, [origin_lat, origin_lon])
+            route["distance"] += start_gap
+        if destination_offset >= 5:
+            end_gap = haversine_m(*route["end"], destination_lat, destination_lon)
+            arrive_index = len(steps)
+            if steps and steps[-1][0] == "arrive":
+                arrive_index -= 1
+            steps.insert(arrive_index, ["connector", "end", "", round(end_gap, 1)])
+            geometry.append([destination_lat, destination_lon])
+            route["distance"] += end_gap
+
+        route["geometry"] = encode_polyline(geometry)
+        return route
@@ -1,11 +1,21 @@
 import requests
+from typing import Optional
 from agno.tools import Toolkit
 
+from app.custom_tools.route_cache import RouteCache, compact_route
+
 
 class RoutingTools(Toolkit):
-    def __init__(self):
+    def __init__(self, route_cache: Optional[RouteCache] = None):
+        """
+        Args:
+            route_cache: Optional approximate route cache. When given, routes whose
+                endpoints are within the cache tolerance of a stored route are served
+                from the cache instead of calling OSRM.
+        """
         super().__init__(name="routing")
         self.base_url = "http://router.project-osrm.org/route/v1/"
+        self.route_cache = route_cache
         self.register(self.get_route)
 
     def get_route(
@@ -28,6 +38,50 @@ class RoutingTools(Toolkit):
         Returns:
             A string describing the route, including distance, duration, and step-by-step instructions.
         """
+        if self.route_cache is not None:
+            endpoints = self._endpoints(
+                origin_latitude,
+                origin_longitude,
+                destination_latitude,
+                destination_longitude,
+            )
+            if endpoints is not None:
+                cached_route = self.route_cache.lookup(*endpoints)
+                if cached_route is not None:
+                    return self.format_route(cached_route)
+
+        return self.fetch_route(
+            origin_latitude,
+            origin_longitude,
+            destination_latitude,
+            destination_longitude,
+        )
+
+    @staticmethod
+    def _endpoints(*values):
+        try:
+            return tuple(float(value) for value in values)
+        except (TypeError, ValueError):
+            return None
+
+    def fetch_route(
+        self,
+        origin_latitude: float,
+        origin_longitude: float,
+        destination_latitude: float,
+        destination_longitude: float,
+    ) -> str:
+        """
+        Like `get_route`, but always asks OSRM, even when a nearby route is
+        cached; the result is still stored in the route cache. Used by the
+        cache warm-up and not registered as a tool.
+        """
+        endpoints = self._endpoints(
+            origin_latitude,
+            origin_longitude,
+            destination_latitude,
+            destination_longitude,
+        )
         try:
             # OSRM API expects longitude,latitude pairs separated by semicolons
             coordinates = f"{origin_longitude},{origin_latitude};{destination_longitude},{destination_latitude}"
@@ -38,51 +92,10 @@ class RoutingTools(Toolkit):
             data = response.json()
 
             if data["code"] == "Ok":
-                route = data["routes"][0]
-                summary = f"### Route Overview 🗺️\n"
-                summary += f"- **Distance:** {route['distance'] / 1000:.2f} km\n"
-
-                # Extract and format step-by-step instructions
-                if "legs" in route and route["legs"]:
-                    summary += "\n### Step-by-Step Directions:\n```\n"
-                    step_number = 1
-                    for leg in route["legs"]:
-                        for step in leg["steps"]:
-                            maneuver = step.get("maneuver", {})
-                            step_type = maneuver.get("type", "unknown")
-                            modifier = maneuver.get("modifier", "")
-                            road_name = step.get("name", "").strip()
-                            distance = step.get("distance", 0)
-
-                            # Construct readable instruction
-                            if step_type == "depart":
-                                instruction = (
-                                    f"Depart onto {road_name or 'an unnamed road'}"
-                                )
-                            elif step_type == "arrive":
-                                instruction = "Arrive at your destination"
-                            elif step_type == "roundabout":
-                                instruction = f"Enter roundabout and take the exit onto {road_name or 'an unnamed road'}"
-                            elif step_type == "end of road":
-                                instruction = f"End of road {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
-                            elif step_type == "merge":
-                                instruction = f"Merge {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
-                            elif step_type == "on ramp":
-                                instruction = f"Take on ramp {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
-                            elif step_type == "off ramp":
-                                instruction = f"Take off ramp {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
-                            else:
-                                direction = (
-                                    modifier.replace("_", " ").capitalize()
-                                    if modifier
-                                    else ""
-                                )
-                                instruction = f"{step_type.capitalize()} {direction} onto {road_name or 'an unnamed road'}".strip()
-
-                            summary += f"{step_number}. {instruction} ({distance / 1000:.2f} km)\n"
-                            step_number += 1
-                    summary += "```\n"
-                return summary
+                route = compact_route(data["routes"][0], data["waypoints"])
+                if self.route_cache is not None and endpoints is not None:
+                    self.route_cache.store(*endpoints, route)
+                return self.format_route(route)
 
             elif data["code"] == "NoRoute":
                 return "No route found between the given coordinates."
@@ -96,3 +109,49 @@ class RoutingTools(Toolkit):
             return f"Error parsing OSRM routing data: Missing field {str(e)}"
         except Exception as e:
             return f"Unexpected error in OSRM routing: {str(e)}"
+
+    @staticmethod
+    def format_route(route: dict) -> str:
+        """
+        Formats a compact route (see `compact_route`) as the markdown summary
+        returned to the agents.
+        """
+        summary = f"### Route Overview 🗺️\n"
+        summary += f"- **Distance:** {route['distance'] / 1000:.2f} km\n"
+
+        # Extract and format step-by-step instructions
+        if route["steps"]:
+            summary += "\n### Step-by-Step Directions:\n```\n"
+            for step_number, (step_type, modifier, road_name, distance) in enumerate(
+                route["steps"], 1
+            ):
+                # Construct readable instruction
+                if step_type == "depart":
+                    instruction = f"Depart onto {road_name or 'an unnamed road'}"
+                elif step_type == "arrive":
+                    instruction = "Arrive at your destination"
+                elif step_type == "connector":
+                    instruction = (
+                        "Ride from your starting point to the route"
+                        if modifier == "start"
+                        else "Ride from the route to your destination"
+                    )
+                elif step_type == "roundabout":
+                    instruction = f"Enter roundabout and take the exit onto {road_name or 'an unnamed road'}"
+                elif step_type == "end of road":
+                    instruction = f"End of road {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
+                elif step_type == "merge":
+                    instruction = f"Merge {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
+                elif step_type == "on ramp":
+                    instruction = f"Take on ramp {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
+                elif step_type == "off ramp":
+                    instruction = f"Take off ramp {modifier.capitalize()} onto {road_name or 'an unnamed road'}"
+                else:
+                    direction = (
+                        modifier.replace("_", " ").capitalize() if modifier else ""
+                    )
+                    instruction = f"{step_type.capitalize()} {direction} onto {road_name or 'an unnamed road'}".strip()
+
+                summary += f"{step_number}. {instruction} ({distance / 1000:.2f} km)\n"
+            summary += "```\n"
+        return summary
@@ -0,0 +1,334 @@
+import json
+import time
+from collections import Counter
+
+from app.custom_tools.place_index import PlaceIndex
+from app.custom_tools.route_cache import haversine_m
+from app.services.place_names import name_parts
+from app.services.poi_sources import iter_json_array
+
+
+# Typical POI search phrases; override with a file of your own (one per line)
+DEFAULT_INTEREST_PHRASES = [
+    "historical places",
+    "mughal architecture",
+    "museums",
+    "old mosques",
+    "hindu temples",
+    "buddhist monasteries",
+    "churches",
+    "archaeological sites",
+    "parks and gardens",
+    "lakes",
+    "river views",
+    "boat rides",
+    "beaches",
+    "hills and viewpoints",
+    "waterfalls",
+    "tea gardens",
+    "forests and wildlife",
+    "mangrove forest",
+    "bird watching",
+    "sunset spots",
+    "street food",
+    "traditional sweets",
+    "biryani restaurants",
+    "tea stalls",
+    "cafes",
+    "local markets",
+    "shopping malls",
+    "handicrafts and souvenirs",
+    "art galleries",
+    "cultural centres",
+    "liberation war memorials",
+    "monuments",
+    "universities",
+    "photography spots",
+    "family friendly places",
+    "quiet places to rest",
+    "places to visit in old dhaka",
+    "scenic cycling routes",
+    "rest stops for cyclists",
+    "places open in the evening",
+]
+
+
+class Throttle:
+    """Spaces calls to an upstream service at least `interval_s` apart."""
+
+    def __init__(self, interval_s):
+        self.interval_s = interval_s
+        self._next_call = 0.0
+
+    def wait(self):
+        delay = self._next_call - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_call = time.monotonic() + self.interval_s
+
+
+def load_name_list(path):
+    """
+    Reads a list of names: a JSON array (of strings or objects with a "name"),
+    or a text file with one name per line ('#' starts a comment).
+    """
+    if path.endswith(".json"):
+        return [
+            item["name"] if isinstance(item, dict) else str(item)
+            for item in iter_json_array(path)
+        ]
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+
+def iter_query_texts(path):
+    """Yields the query texts of a batch input file (see batch_main.py)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                record = record.get("query")
+            if isinstance(record, str) and record.strip():
+                yield record
+
+
+def _coverage(section, total):
+    return {
+        "section": section,
+        "total": total,
+        "cached": 0,
+        "fetched": 0,
+        "failed": 0,
+    }
+
+
+class CacheWarmer:
+    """
+    Fills the persistent geocode, route and embedding caches ahead of traffic.
+
+    Everything already cached is skipped and every result is persisted as soon
+    as it arrives, so an interrupted run simply continues where it stopped when
+    started again. Calls to Nominatim and OSRM are spaced by the given intervals
+    (both public services ask for at most one request per second); embeddings
+    go through the shared OpenAI rate limiter.
+
+    Progress is kept in `coverage`, one entry per section, and is up to date
+    even when a run is interrupted.
+    """
+
+    def __init__(
+        self,
+        geocoding_tools,
+        routing_tools,
+        embedding_service=None,
+        geocode_interval_s=1.0,
+        route_interval_s=1.0,
+        report_only=False,
+    ):
+        """
+        Args:
+            geocoding_tools: GeocodingTools with a geocode cache.
+            routing_tools: RoutingTools with a route cache.
+            embedding_service: EmbeddingService with an embedding cache; needed
+                only for `warm_embeddings`.
+            geocode_interval_s: Minimum seconds between Nominatim requests.
+            route_interval_s: Minimum seconds between OSRM requests.
+            report_only: Only measure coverage, never call an upstream service.
+        """
+        if geocoding_tools.geocode_cache is None or routing_tools.route_cache is None:
+            raise ValueError("Cache warm-up needs tools with persistent caches")
+        self.geocoding_tools = geocoding_tools
+        self.routing_tools = routing_tools
+        self.embedding_service = embedding_service
+        self.geocode_throttle = Throttle(geocode_interval_s)
+        self.route_throttle = Throttle(route_interval_s)
+        self.report_only = report_only
+        self.coverage = []
+
+    def warm_geocodes(self, section, names, country_code="bd") -> dict:
+        """Geocodes every name; returns {name: geocode} for the ones that resolved."""
+        names = list(dict.fromkeys(names))
+        coverage = _coverage(section, len(names))
+        self.coverage.append(coverage)
+        cache = self.geocoding_tools.geocode_cache
+
+        geocodes = {}
+        for name in names:
+            result = cache.get(name, country_code)
+            if result == {}:
+                # Known not to be found; not retried until the entry expires
+                coverage["failed"] += 1
+                continue
+            if result is not None:
+                coverage["cached"] += 1
+            elif self.report_only:
+                continue
+            else:
+                self.geocode_throttle.wait()
+                result = self.geocoding_tools.geocode_location(name, country_code)
+                if not result:
+                    coverage["failed"] += 1
+                    print(f"  Not geocoded: {name}")
+                    continue
+                coverage["fetched"] += 1
+            geocodes[name] = result
+        return geocodes
+
+    def warm_routes(self, section, pairs, geocodes) -> None:
+        """Routes every (origin, destination) name pair whose geocodes are known."""
+        pairs = list(dict.fromkeys(pairs))
+        coverage = _coverage(section, len(pairs))
+        self.coverage.append(coverage)
+        cache = self.routing_tools.route_cache
+
+        for origin, destination in pairs:
+            if origin not in geocodes or destination not in geocodes:
+                continue
+            endpoints = (
+                geocodes[origin]["latitude"],
+                geocodes[origin]["longitude"],
+                geocodes[destination]["latitude"],
+                geocodes[destination]["longitude"],
+            )
+            # A route that is only within the lookup tolerance is served with
+            # connector legs; the pair itself is warmed once its exact route is in
+            if cache.contains(*endpoints):
+                coverage["cached"] += 1
+                continue
+            if self.report_only:
+                continue
+            self.route_throttle.wait()
+            self.routing_tools.fetch_route(*endpoints)
+            # fetch_route only stores routes it could fetch
+            if cache.contains(*endpoints):
+                coverage["fetched"] += 1
+            else:
+                coverage["failed"] += 1
+                print(f"  Not routed: {origin} -> {destination}")
+
+    def warm_embeddings(self, section, phrases, batch_size=100) -> None:
+        """Embeds every phrase as the POI search would embed it as a query."""
+        phrases = list(dict.fromkeys(p.strip() for p in phrases if p.strip()))
+        coverage = _coverage(section, len(phrases))
+        self.coverage.append(coverage)
+        service = self.embedding_service
+        if service is None:
+            return
+
+        cached = service.cache.get_many(service.model, service.dimensions, phrases)
+        missing = [p for p, vector in zip(phrases, cached) if vector is None]
+        coverage["cached"] = len(phrases) - len(missing)
+        if self.report_only:
+            return
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start : start + batch_size]
+            vectors = service.get_embeddings(batch)
+            fetched = sum(1 for vector in vectors if vector is not None)
+            coverage["fetched"] += fetched
+            coverage["failed"] += len(batch) - fetched
+
+
+def default_neighborhoods(extractor):
+    """
+    Every district seat and neighbourhood in the gazetteer, named the way the
+    speculative geocoding names them ("Khalishpur, Khulna").
+    """
+    return [
+        extractor.describe(place["name"])
+        for place in extractor.places.values()
+        if place.get("kind") in ("district", "neighborhood")
+    ]
+
+
+def qualified_poi_names(pois, extractor):
+    """
+    POI names qualified with their district the way plans and the speculative
+    geocoding name them ("Ahsan Manzil, Dhaka"); the district is that of the
+    nearest district seat in the gazetteer.
+
+    `pois` holds POI records, or plain names which are kept as given, as are
+    records without coordinates and names that already include their district.
+    """
+    seats = PlaceIndex(
+        [
+            place
+            for place in extractor.places.values()
+            if place.get("kind") == "district"
+        ]
+    )
+    names = [poi if isinstance(poi, str) else poi.get("name") for poi in pois]
+    located = [
+        i
+        for i, poi in enumerate(pois)
+        if isinstance(poi, dict)
+        and poi.get("name")
+        and poi.get("latitude") is not None
+        and poi.get("longitude") is not None
+    ]
+    if located and len(seats):
+        indices, _ = seats.nearest(
+            [float(pois[i]["latitude"]) for i in located],
+            [float(pois[i]["longitude"]) for i in located],
+        )
+        for i, seat in zip(located, indices):
+            district = seats.places[seat]["name"]
+            if district.lower() not in name_parts(names[i]):
+                names[i] = f"{names[i]}, {district}"
+    return [name for name in names if name]
+
+
+def query_route_pairs(extractor, query_texts, limit):
+    """The `limit` most requested (origin, destination) pairs in past queries."""
+    counts = Counter()
+    for text in query_texts:
+        origin, destination = extractor.extract(text)
+        if origin and destination and origin["name"] != destination["name"]:
+            counts[(origin["name"], destination["name"])] += 1
+    return [pair for pair, _ in counts.most_common(limit)]
+
+
+def local_route_pairs(places, geocodes, limit, max_distance_km=40.0):
+    """
+    Ordered pairs of places in the same city, shortest rides first, for when
+    there is no query history to rank pairs by.
+    """
+    candidates = []
+    for origin in places:
+        for destination in places:
+            if origin["name"] == destination["name"]:
+                continue
+            if origin["city"] is None or origin["city"] != destination["city"]:
+                continue
+            a, b = geocodes.get(origin["name"]), geocodes.get(destination["name"])
+            if a is None or b is None:
+                continue
+            distance_m = haversine_m(
+                a["latitude"], a["longitude"], b["latitude"], b["longitude"]
+            )
+            if distance_m <= max_distance_km * 1000:
+                candidates.append((distance_m, origin["name"], destination["name"]))
+    candidates.sort()
+    return [(origin, destination) for _, origin, destination in candidates[:limit]]
+
+
+def print_coverage(coverage):
+    print("=" * 80)
+    print("📊 CACHE COVERAGE")
+    print("=" * 80)
+    print(
+        f"  {'section':<26}{'total':>7}{'cached':>8}{'fetched':>9}"
+        f"{'failed':>8}{'pending':>9}{'coverage':>10}"
+    )
+    for entry in coverage:
+        covered = entry["cached"] + entry["fetched"]
+        pending = entry["total"] - covered - entry["failed"]
+        percent = 100.0 * covered / entry["total"] if entry["total"] else 100.0
+        print(
+            f"  {entry['section']:<26}{entry['total']:>7}{entry['cached']:>8}"
+            f"{entry['fetched']:>9}{entry['failed']:>8}{pending:>9}{percent:>9.1f}%"
+        )
+    print("=" * 80)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import numpy as np
+from typing import Optional
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache shared by every process on the host.
+
+    Vectors are stored as float32 blobs in SQLite (WAL mode), keyed by model,
+    dimensions and a hash of the text, so a text is only ever embedded once per
+    model no matter which worker asks for it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3"
+        )
+        self.stats = {"hits": 0, "misses": 0}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, dimensions, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1(text.encode("utf-8")).digest()
+
+    def get_many(self, model, dimensions, texts) -> list:
+        """Returns one stored vector (list of floats) or None per text."""
+        hashes = [self._hash(text) for text in texts]
+        found = {}
+        # Stay well under SQLite's limit on bound parameters
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start : start + 500]
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND dimensions = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, dimensions] + chunk,
+                ).fetchall()
+            found.update(rows)
+
+        vectors = []
+        for text_hash in hashes:
+            blob = found.get(text_hash)
+            if blob is None:
+                self.stats["misses"] += 1
+                vectors.append(None)
+            else:
+                self.stats["hits"] += 1
+                vectors.append(np.frombuffer(blob, dtype=np.float32).tolist())
+        return vectors
+
+    def store_many(self, model, dimensions, texts, vectors):
+        rows = [
+            (
+                model,
+                dimensions,
+                self._hash(text),
+                np.asarray(vector, dtype=np.float32).tobytes(),
+            )
+            for text, vector in zip(texts, vectors)
+            if vector is not None
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows
+            )
+            self._connection.commit()
@@ -1,24 +1,89 @@
 from openai import OpenAI
 import json
+import os
 import re
+from app.services.llm_rate_limiter import (
+    PRIORITY_BULK,
+    estimate_tokens,
+    get_llm_rate_limiter,
+)
 
 
 class EmbeddingService:
-    def __init__(self):
-        self.client = OpenAI()
+    def __init__(self, priority=PRIORITY_BULK, dimensions=None, cache=None):
+        # Retries on 429 are handled by the shared rate limiter
+        self.client = OpenAI(max_retries=0)
         self.model = "text-embedding-3-small"
+        # text-embedding-3 models return shortened vectors natively; 512 keeps
+        # nearly full recall at a third of the memory (see benchmarks/)
+        self.dimensions = int(dimensions or os.getenv("EMBEDDING_DIMENSIONS", "512"))
+        self.priority = priority
+        self.rate_limiter = get_llm_rate_limiter()
+        # Optional EmbeddingCache shared with other processes
+        self.cache = cache
 
     def get_embedding(self, text):
         try:
             text = str(text).strip()
             if not text:
                 return None
-            response = self.client.embeddings.create(input=text, model=self.model)
-            return response.data[0].embedding
+            if self.cache is not None:
+                cached = self.cache.get_many(self.model, self.dimensions, [text])[0]
+                if cached is not None:
+                    return cached
+            response = self.rate_limiter.call(
+                lambda: self.client.embeddings.create(
+                    input=text, model=self.model, dimensions=self.dimensions
+                ),
+                estimated_tokens=estimate_tokens(text),
+                priority=self.priority,
+                usage_of=lambda r: r.usage.total_tokens,
+            )
+            embedding = response.data[0].embedding
+            if self.cache is not None:
+                self.cache.store_many(self.model, self.dimensions, [text], [embedding])
+            return embedding
         except Exception as e:
             print(f"Embedding error: {e}")
             return None
 
+    def get_embeddings(self, texts):
+        """Embeds several texts in one request; failed or empty texts map to None"""
+        texts = [str(text).strip() for text in texts]
+        non_empty = [(i, text) for i, text in enumerate(texts) if text]
+        embeddings = [None] * len(texts)
+        if non_empty and self.cache is not None:
+            cached = self.cache.get_many(
+                self.model, self.dimensions, [text for _, text in non_empty]
+            )
+            for (i, _), vector in zip(non_empty, cached):
+                embeddings[i] = vector
+            non_empty = [(i, text) for i, text in non_empty if embeddings[i] is None]
+        if not non_empty:
+            return embeddings
+        try:
+            inputs = [text for _, text in non_empty]
+            response = self.rate_limiter.call(
+                lambda: self.client.embeddings.create(
+                    input=inputs, model=self.model, dimensions=self.dimensions
+                ),
+                estimated_tokens=sum(estimate_tokens(text) for text in inputs),
+                priority=self.priority,
+                usage_of=lambda r: r.usage.total_tokens,
+            )
+            for (i, _), item in zip(non_empty, response.data):
+                embeddings[i] = item.embedding
+            if self.cache is not None:
+                self.cache.store_many(
+                    self.model,
+                    self.dimensions,
+                    inputs,
+                    [embeddings[i] for i, _ in non_empty],
+                )
+        except Exception as e:
+            print(f"Embedding error: {e}")
+        return embeddings
+
     def prepare_poi_content(self, poi):
         """Create searchable content from POI data"""
         content_parts = []
@@ -37,7 +102,14 @@ class EmbeddingService:
         if poi.get("type"):
             content_parts.append(f"Type: {poi['type']}")
 
+        if poi.get("key_features"):
+            content_parts.append(f"Key Features: {poi['key_features']}")
+        if poi.get("visiting_tips"):
+            content_parts.append(f"Visiting Tips: {poi['visiting_tips']}")
+
         # Add location info
+        if poi.get("address"):
+            content_parts.append(f"Address: {poi['address']}")
         if poi.get("location"):
             content_parts.append(f"Location: {poi['location']}")
         if poi.get("district"):
@@ -47,69 +119,74 @@ class EmbeddingService:
 
         return " | ".join(content_parts)
 
+    def build_poi_properties(self, poi, content):
+        """Build the Weaviate properties for a POI"""
+        coordinates = ""
+        if poi.get("latitude") and poi.get("longitude"):
+            coordinates = f"{poi['latitude']}, {poi['longitude']}"
+
+        return {
+            "content": content,
+            "poi_name": poi.get("name", ""),
+            "location": poi.get("location", poi.get("address", "")),
+            "category": poi.get("category", poi.get("type", "")),
+            "description": poi.get("description", ""),
+            "coordinates": coordinates,
+            "full_data": poi,
+        }
+
     def store_poi_data(self, weaviate_client, poi_data):
         """Store POI data with embeddings in Weaviate using v4 API"""
         successful_stores = 0
-        collection = weaviate_client.client.collections.get("BangladeshPOI")
 
-        # Prepare batch data
-        batch_data = []
+        with weaviate_client.batch_writer("BangladeshPOI") as writer:
+            for i, poi in enumerate(poi_data):
+                try:
+                    content = self.prepare_poi_content(poi)
+                    if not content:
+                        print(f"No content for POI {i}: {poi}")
+                        continue
 
-        for i, poi in enumerate(poi_data):
-            try:
-                content = self.prepare_poi_content(poi)
-                if not content:
-                    print(f"No content for POI {i}: {poi}")
-                    continue
+                    embedding = self.get_embedding(content)
+                    if embedding is None:
+                        print(f"No embedding for POI {i}: {poi}")
+                        continue
 
-                embedding = self.get_embedding(content)
-                if embedding is None:
-                    print(f"No embedding for POI {i}: {poi}")
-                    continue
+                    # Prepare data object for batch insertion
+                    data_object = self.build_poi_properties(poi, content)
 
-                coordinates = ""
-                if poi.get("latitude") and poi.get("longitude"):
-                    coordinates = f"{poi['latitude']}, {poi['longitude']}"
-
-                # Prepare data object for batch insertion
-                data_object = {
-                    "content": content,
-                    "poi_name": poi.get("name", ""),
-                    "location": poi.get("location", ""),
-                    "category": poi.get("category", poi.get("type", "")),
-                    "description": poi.get("description", ""),
-                    "coordinates": coordinates,
-                    "full_data": poi,
-                }
-
-                batch_data.append({"properties": data_object, "vector": embedding})
-
-                # Process in batches of 100
-                if len(batch_data) >= 100:
-                    self._insert_batch(collection, batch_data)
-                    successful_stores += len(batch_data)
-                    batch_data = []
-                    print(f"Processed {successful_stores}/{len(poi_data)} POIs...")
-
-            except Exception as e:
-                print(f"Error preparing POI {i}|{poi}: {e}")
-                continue
-
-        # Insert remaining batch data
-        if batch_data:
-            self._insert_batch(collection, batch_data)
-            successful_stores += len(batch_data)
+                    writer.add_objects(
+                        [{"properties": data_object, "vector": embedding}]
+                    )
+                    successful_stores += 1
+                    if successful_stores % 100 == 0:
+                        print(f"Processed {successful_stores}/{len(poi_data)} POIs...")
+
+                except Exception as e:
+                    print(f"Error preparing POI {i}|{poi}: {e}")
+                    continue
 
+        successful_stores -= len(writer.failed_objects)
+        report_failed_objects(writer.failed_objects)
         print(f"Successfully stored {successful_stores}/{len(poi_data)} POIs")
         return successful_stores
 
-    def _insert_batch(self, collection, batch_data):
-        """Insert a batch of data into Weaviate"""
-        try:
-            with collection.batch.dynamic() as batch:
-                for item in batch_data:
-                    batch.add_object(
-                        properties=item["properties"], vector=item["vector"]
-                    )
-        except Exception as e:
-            print(f"Batch insert error: {e}")
+
+def report_failed_objects(failed_objects, path=None):
+    """Print a summary of objects Weaviate rejected and save them as JSONL"""
+    if not failed_objects:
+        return
+    path = path or os.getenv("FAILED_OBJECTS_PATH", ".cache/failed_objects.jsonl")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for failed in failed_objects:
+            f.write(json.dumps(failed, ensure_ascii=False) + "\n")
+
+    messages = {}
+    for failed in failed_objects:
+        messages[failed["message"]] = messages.get(failed["message"], 0) + 1
+    print(f"{len(failed_objects)} objects failed to write (details in {path}):")
+    for message, count in sorted(messages.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {count} x {message}")
@@ -0,0 +1,317 @@
+import math
+import queue
+import re
+import threading
+import time
+import uuid
+
+from app.services.poi_sources import normalize_poi
+
+
+_SENTINEL = object()
+_POI_NAMESPACE = uuid.UUID("5b1a7d8e-3f0c-4a57-9d0e-6c2f1b4e8a90")
+
+
+def _name_key(name):
+    name = re.sub(r"\(.*?\)", " ", str(name).lower())
+    return " ".join(re.sub(r"[^\w\s]", " ", name).split())
+
+
+def _distance_km(lat1, lon1, lat2, lon2):
+    # Equirectangular approximation is plenty for a "same place" check
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371.0 * math.hypot(x, y)
+
+
+class POIDeduplicator:
+    """
+    Streaming deduplication of POIs by normalized name and proximity.
+
+    Only a small fingerprint per distinct POI is kept (not the records), and each
+    POI gets a deterministic UUID. A later duplicate with richer content reuses the
+    UUID so it overwrites the earlier object in Weaviate; poorer duplicates are dropped.
+    """
+
+    def __init__(self, max_distance_km: float = 2.0):
+        self.max_distance_km = max_distance_km
+        self._seen = {}
+
+    def check(self, poi: dict, content_length: int):
+        """
+        Returns the UUID to write the POI under, or None if it should be skipped.
+        """
+        name_key = _name_key(poi.get("name", ""))
+        if not name_key:
+            return None
+        latitude, longitude = poi.get("latitude"), poi.get("longitude")
+
+        candidates = self._seen.setdefault(name_key, [])
+        for candidate in candidates:
+            c_lat, c_lon, c_uuid, c_length = candidate
+            # Name alone only identifies a place when neither side has coordinates
+            if latitude is None or c_lat is None:
+                same_place = latitude is None and c_lat is None
+            else:
+                same_place = (
+                    _distance_km(latitude, longitude, c_lat, c_lon)
+                    <= self.max_distance_km
+                )
+            if same_place:
+                if content_length <= c_length:
+                    return None
+                candidate[3] = content_length
+                return c_uuid
+
+        poi_uuid = str(uuid.uuid5(_POI_NAMESPACE, f"{name_key}|{latitude}|{longitude}"))
+        candidates.append([latitude, longitude, poi_uuid, content_length])
+        return poi_uuid
+
+
+class StageStats:
+    """Counts items and busy time for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.dropped = 0
+        self.failed = 0
+        self.replaced = 0
+        self.busy_s = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items=1, busy_s=0.0, dropped=0, failed=0, replaced=0):
+        with self._lock:
+            self.items += items
+            self.replaced += replaced
+            self.busy_s += busy_s
+            self.dropped += dropped
+            self.failed += failed
+
+    def summary(self, elapsed_s):
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "replaced": self.replaced,
+            "busy_s": round(self.busy_s, 2),
+            "items_per_s": round(self.items / elapsed_s, 1) if elapsed_s else 0.0,
+        }
+
+
+class POIIngestionPipeline:
+    """
+    Staged POI ingestion: parse -> normalize/dedupe -> embed -> write.
+
+    Stages run in their own threads connected by bounded queues, so a slow stage
+    (usually embedding) throttles the parsers instead of letting records pile up
+    in memory. Embedding runs on `embed_workers` threads, each sending batches of
+    `embed_batch_size` texts per OpenAI request.
+
+    Args:
+        embedding_service: EmbeddingService used for content and vectors.
+        write_batch: Callable receiving a list of {"uuid", "properties", "vector"}
+            items. Objects the server rejects later are reported by the writer
+            itself (see BatchWriter.failed_objects), not by this stage.
+        queue_size: Capacity of each inter-stage queue (the backpressure bound).
+    """
+
+    def __init__(
+        self,
+        embedding_service,
+        write_batch,
+        embed_workers: int = 4,
+        embed_batch_size: int = 64,
+        write_batch_size: int = 100,
+        queue_size: int = 256,
+    ):
+        self.embedding_service = embedding_service
+        self.write_batch = write_batch
+        self.embed_workers = embed_workers
+        self.embed_batch_size = embed_batch_size
+        self.write_batch_size = write_batch_size
+        self.queue_size = queue_size
+        self.stats = {
+            name: StageStats(name) for name in ("parse", "normalize", "embed", "write")
+        }
+        # UUIDs of the objects handed to `write_batch` without an error
+        self._stored_uuids = set()
+
+    def _parse(self, sources, output):
+        stats = self.stats["parse"]
+        try:
+            for source_name, records in sources:
+                # A malformed source is skipped; the remaining ones still run
+                try:
+                    started = time.perf_counter()
+                    for raw in records:
+                        stats.record(busy_s=time.perf_counter() - started)
+                        output.put((source_name, raw))
+                        started = time.perf_counter()
+                except Exception as e:
+                    print(f"Error parsing POI source {source_name}: {e}")
+                    stats.record(items=0, failed=1)
+        finally:
+            output.put(_SENTINEL)
+
+    def _normalize(self, input_queue, output):
+        stats = self.stats["normalize"]
+        deduplicator = POIDeduplicator()
+        batch = []
+        while True:
+            item = input_queue.get()
+            if item is _SENTINEL:
+                break
+            started = time.perf_counter()
+            source_name, raw = item
+            try:
+                poi = normalize_poi(raw, source_name)
+                content = self.embedding_service.prepare_poi_content(poi)
+                poi_uuid = deduplicator.check(poi, len(content)) if content else None
+                if poi_uuid is None:
+                    stats.record(items=0, dropped=1)
+                    continue
+                batch.append((poi_uuid, poi, content))
+                stats.record(busy_s=time.perf_counter() - started)
+            except Exception as e:
+                print(f"Error normalizing POI {raw}: {e}")
+                stats.record(items=0, failed=1)
+                continue
+
+            if len(batch) >= self.embed_batch_size:
+                output.put(batch)
+                batch = []
+        if batch:
+            output.put(batch)
+        for _ in range(self.embed_workers):
+            output.put(_SENTINEL)
+
+    def _embed(self, input_queue, output):
+        stats = self.stats["embed"]
+        try:
+            while True:
+                batch = input_queue.get()
+                if batch is _SENTINEL:
+                    break
+                started = time.perf_counter()
+                try:
+                    embedded = self._embed_batch(batch)
+                except Exception as e:
+                    print(f"Error embedding POI batch: {e}")
+                    stats.record(items=0, failed=len(batch))
+                    continue
+                stats.record(
+                    items=len(embedded),
+                    busy_s=time.perf_counter() - started,
+                    failed=len(batch) - len(embedded),
+                )
+                output.put(embedded)
+        finally:
+            # The writer waits for one sentinel per embed worker
+            output.put(_SENTINEL)
+
+    def _embed_batch(self, batch):
+        embeddings = self.embedding_service.get_embeddings(
+            [content for _, _, content in batch]
+        )
+        embedded = []
+        for (poi_uuid, poi, content), embedding in zip(batch, embeddings):
+            if embedding is None:
+                continue
+            embedded.append(
+                {
+                    "uuid": poi_uuid,
+                    "properties": self.embedding_service.build_poi_properties(
+                        poi, content
+                    ),
+                    "vector": embedding,
+                }
+            )
+        return embedded
+
+    def _write(self, input_queue):
+        stats = self.stats["write"]
+        finished_workers = 0
+        # Keyed by UUID: a richer duplicate replaces a pending one in place, so
+        # one chunk never carries the same object twice
+        pending = {}
+        # Embed workers finish out of order, so a poorer duplicate could arrive
+        # after the richer one that replaced it; keep the richest per UUID.
+        written_lengths = {}
+        stored = self._stored_uuids
+
+        def flush():
+            started = time.perf_counter()
+            try:
+                self.write_batch(list(pending.values()))
+                stored.update(pending)
+                stats.record(items=len(pending), busy_s=time.perf_counter() - started)
+            except Exception as e:
+                print(f"Error writing POI batch: {e}")
+                stats.record(items=0, failed=len(pending))
+            pending.clear()
+
+        while finished_workers < self.embed_workers:
+            items = input_queue.get()
+            if items is _SENTINEL:
+                finished_workers += 1
+                continue
+            for item in items:
+                length = len(item["properties"]["content"])
+                if written_lengths.get(item["uuid"], -1) >= length:
+                    stats.record(items=0, dropped=1)
+                    continue
+                # Only an object already sent is written twice; a pending one is
+                # replaced in place
+                if item["uuid"] in stored:
+                    stats.record(items=0, replaced=1)
+                written_lengths[item["uuid"]] = length
+                pending[item["uuid"]] = item
+            if len(pending) >= self.write_batch_size:
+                flush()
+                print(f"Processed {stats.items} POIs...")
+        if pending:
+            flush()
+
+    def run(self, sources) -> dict:
+        """
+        Runs the pipeline to completion.
+
+        Args:
+            sources: Iterable of (source_name, record_iterator) pairs, e.g.
+                [("json", iter_json_array(path)), ("text", iter_poi_text(path))].
+
+        Returns:
+            A summary with the number of stored POIs and per-stage throughput.
+        """
+        raw_queue = queue.Queue(maxsize=self.queue_size)
+        normalized_queue = queue.Queue(maxsize=max(self.queue_size // 32, 2))
+        embedded_queue = queue.Queue(maxsize=max(self.queue_size // 32, 2))
+
+        threads = [
+            threading.Thread(target=self._parse, args=(sources, raw_queue)),
+            threading.Thread(
+                target=self._normalize, args=(raw_queue, normalized_queue)
+            ),
+            threading.Thread(target=self._write, args=(embedded_queue,)),
+        ] + [
+            threading.Thread(
+                target=self._embed, args=(normalized_queue, embedded_queue)
+            )
+            for _ in range(self.embed_workers)
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "stored": len(self._stored_uuids),
+            "elapsed_s": round(elapsed, 2),
+            "stages": [stage.summary(elapsed) for stage in self.stats.values()],
+        }
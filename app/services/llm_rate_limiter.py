@@ -0,0 +1,263 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is optional
+    tiktoken = None
+
+
+# Lower value = admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+# Completion budget assumed for chat calls that don't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1024
+
+_encoding = None
+
+
+def estimate_tokens(text) -> int:
+    """Estimates the number of tokens in `text`, using tiktoken when available."""
+    global _encoding
+    text = str(text or "")
+    if tiktoken is not None:
+        try:
+            if _encoding is None:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            return len(_encoding.encode(text))
+        except Exception:
+            pass
+    # ~4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+def get_retry_after(error):
+    """
+    Extracts the server's retry-after hint (in seconds) from an OpenAI error,
+    following the exception chain so errors wrapped by Agno are handled too.
+
+    Returns None if the error is not a rate limit error, or 0.0 if it is one
+    but the server gave no hint.
+    """
+    while error is not None:
+        response = getattr(error, "response", None)
+        status_code = getattr(error, "status_code", None) or getattr(
+            response, "status_code", None
+        )
+        headers = getattr(response, "headers", None) or {}
+        if status_code == 429:
+            for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+                value = headers.get(header)
+                if value is not None:
+                    try:
+                        return max(float(value) * scale, 0.0)
+                    except ValueError:
+                        continue
+            if error.__cause__ is None:
+                return 0.0
+        error = error.__cause__
+    return None
+
+
+class LLMRateLimiter:
+    """
+    Process-wide admission control for OpenAI calls.
+
+    Requests-per-minute and tokens-per-minute budgets are modelled as token buckets
+    that refill continuously. Callers wait in a priority queue, so interactive
+    planning/synthesis is admitted before queued bulk embedding work. Server
+    retry-after hints pause all admissions until the hinted time.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 30000,
+        max_retries: int = 5,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+
+        self.stats = {"admitted": 0, "rate_limited": 0, "waited_s": 0.0}
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._request_allowance = min(
+            float(self.requests_per_minute),
+            self._request_allowance + elapsed * self.requests_per_minute / 60.0,
+        )
+        self._token_allowance = min(
+            float(self.tokens_per_minute),
+            self._token_allowance + elapsed * self.tokens_per_minute / 60.0,
+        )
+
+    def _seconds_until_available(self, tokens, now):
+        if now < self._paused_until:
+            return self._paused_until - now
+        request_deficit = 1.0 - self._request_allowance
+        token_deficit = tokens - self._token_allowance
+        return max(
+            request_deficit * 60.0 / self.requests_per_minute,
+            token_deficit * 60.0 / self.tokens_per_minute,
+            0.0,
+        )
+
+    def acquire(self, estimated_tokens: int, priority: int = PRIORITY_INTERACTIVE):
+        """
+        Blocks until one request and `estimated_tokens` tokens fit in the budget.
+
+        Returns:
+            The number of tokens debited, to be passed to `reconcile` later.
+        """
+        # A single call larger than the whole minute budget would never be admitted
+        tokens = min(max(int(estimated_tokens), 1), self.tokens_per_minute)
+        entry = (priority, next(self._sequence))
+        started = time.monotonic()
+
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == entry:
+                        wait_s = self._seconds_until_available(tokens, now)
+                        if wait_s <= 0:
+                            self._request_allowance -= 1.0
+                            self._token_allowance -= tokens
+                            break
+                        self._condition.wait(timeout=wait_s)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+            self.stats["admitted"] += 1
+            self.stats["waited_s"] += time.monotonic() - started
+        return tokens
+
+    def reconcile(self, debited_tokens: int, actual_tokens):
+        """Corrects the token budget once the real usage of a call is known."""
+        if actual_tokens is None:
+            return
+        with self._condition:
+            self._token_allowance += debited_tokens - actual_tokens
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """Stops admitting requests for `seconds` (server retry-after hint)."""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # The rejected request consumed nothing server-side, but the window is
+            # evidently full: drain local allowances so we don't burst on resume.
+            self._request_allowance = min(self._request_allowance, 0.0)
+            self._token_allowance = min(self._token_allowance, 0.0)
+            self.stats["rate_limited"] += 1
+            self._condition.notify_all()
+
+    def call(
+        self,
+        function,
+        estimated_tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        usage_of=None,
+    ):
+        """
+        Runs `function()` once admitted, retrying on 429 responses after the
+        server's retry-after delay (or exponential backoff if none is given).
+
+        Args:
+            function: Zero-argument callable performing the OpenAI request.
+            estimated_tokens: Expected prompt + completion tokens of the call.
+            priority: PRIORITY_INTERACTIVE, PRIORITY_BULK or any int (lower first).
+            usage_of: Optional callable returning the actual total tokens used,
+                given the function's result.
+        """
+        for attempt in range(self.max_retries + 1):
+            debited = self.acquire(estimated_tokens, priority)
+            try:
+                result = function()
+            except Exception as e:
+                # The failed request used no tokens; the retry debits its own
+                self.reconcile(debited, 0)
+                retry_after = get_retry_after(e)
+                if retry_after is None or attempt == self.max_retries:
+                    raise
+                self.pause(retry_after or min(2**attempt, 60))
+                continue
+
+            if usage_of is not None:
+                try:
+                    self.reconcile(debited, usage_of(result))
+                except Exception:
+                    pass
+            return result
+
+    async def acall(
+        self,
+        function,
+        estimated_tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        usage_of=None,
+    ):
+        """
+        Like `call` for a coroutine function. Waiting for admission happens on a
+        worker thread, so the event loop is never blocked.
+        """
+        for attempt in range(self.max_retries + 1):
+            debited = await asyncio.to_thread(self.acquire, estimated_tokens, priority)
+            try:
+                result = await function()
+            except Exception as e:
+                self.reconcile(debited, 0)
+                retry_after = get_retry_after(e)
+                if retry_after is None or attempt == self.max_retries:
+                    raise
+                self.pause(retry_after or min(2**attempt, 60))
+                continue
+
+            if usage_of is not None:
+                try:
+                    self.reconcile(debited, usage_of(result))
+                except Exception:
+                    pass
+            return result
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_llm_rate_limiter() -> LLMRateLimiter:
+    """
+    Returns the limiter shared by every OpenAI caller in this process.
+
+    Budgets come from OPENAI_RPM_LIMIT / OPENAI_TPM_LIMIT. When several processes
+    share one organization, give each process its share of the org limits.
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = LLMRateLimiter(
+                requests_per_minute=int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+                tokens_per_minute=int(os.getenv("OPENAI_TPM_LIMIT", "30000")),
+            )
+        return _shared_limiter
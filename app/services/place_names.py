@@ -0,0 +1,41 @@
+import re
+
+
+_COUNTRY_PARTS = {"bangladesh", "bd"}
+_IGNORED_PARTS = _COUNTRY_PARTS | {"division", "district", "city"}
+
+
+def name_parts(name):
+    """
+    'Dhanmondi, Dhaka, Bangladesh' -> ['dhanmondi', 'dhaka']
+
+    Loose form used to tell whether two names refer to the same place: the
+    country and administrative words ("Khulna Division") are dropped.
+    """
+    parts = []
+    for part in str(name).lower().split(","):
+        part = " ".join(
+            word for word in part.split() if word not in ("division", "district")
+        )
+        if part and part not in _IGNORED_PARTS:
+            parts.append(part)
+    return parts
+
+
+def place_key(name):
+    """
+    'Dhaka Division, Bangladesh.' -> 'dhaka division'
+
+    Exact form used as a cache key: case, spacing, punctuation and a trailing
+    country are dropped, but administrative words are kept, since "Dhaka
+    Division", "Dhaka District" and "Dhaka" are geocoded to different places.
+    """
+    parts = [
+        " ".join(re.sub(r"[^\w\s]", " ", part).split())
+        for part in str(name).lower().split(",")
+    ]
+    parts = [part for part in parts if part]
+    named = list(parts)
+    while named and named[-1] in _COUNTRY_PARTS:
+        named.pop()
+    return ", ".join(named or parts)
@@ -0,0 +1,274 @@
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{.+\..+\}")
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def resolve_args(args, execution_context, log=print):
+    """
+    Resolves placeholder arguments (e.g. "{origin_geocode.latitude}") against
+    the outputs stored in the execution context.
+
+    Args:
+        args: The raw `args` dictionary of a plan step (may be None).
+        execution_context: Outputs of previously executed steps, keyed by `output_key`.
+        log: Callable used for progress/warning messages.
+
+    Returns:
+        A dictionary of resolved arguments with unresolved (None) values removed.
+    """
+    resolved_args = {}
+    if args:
+        for arg_key, arg_value in args.items():
+            if isinstance(arg_value, str) and PLACEHOLDER_PATTERN.match(arg_value):
+                # This is a placeholder, e.g., "{origin_geocode.latitude}"
+                parts = arg_value.strip("{}").split(".")
+                if len(parts) == 2:
+                    context_key, attribute = parts
+                    if context_key in execution_context and isinstance(
+                        execution_context[context_key], dict
+                    ):
+                        resolved_args[arg_key] = execution_context[context_key].get(
+                            attribute
+                        )
+                    else:
+                        log(f"   ⚠️  Could not resolve placeholder '{arg_value}'")
+                        resolved_args[arg_key] = None
+                else:
+                    log(f"   ⚠️  Invalid placeholder format '{arg_value}'")
+                    resolved_args[arg_key] = arg_value
+            else:
+                resolved_args[arg_key] = arg_value
+
+    # Filter out args that are None after resolution
+    return {k: v for k, v in resolved_args.items() if v is not None}
+
+
+def run_step(step, label, tool_instances, execution_context, log=print):
+    """
+    Calls the tool of a single plan step.
+
+    Args:
+        step: The step dictionary (must have a `tool`).
+        label: Prefix for error messages (e.g. "Step 3").
+        tool_instances: Mapping of tool instance names to toolkits.
+        execution_context: Outputs of previously executed steps.
+        log: Callable used for progress/warning messages.
+
+    Returns:
+        A tuple of (result, error) where `error` is None on success.
+    """
+    tool_call = step.get("tool")
+    tool_instance_name, method_name = None, None
+    try:
+        # Parse tool_call (e.g., "geocoding.geocode_location")
+        tool_instance_name, method_name = tool_call.split(".")
+        tool_instance = tool_instances.get(tool_instance_name)
+
+        if not tool_instance:
+            log(f"   ❌ Tool instance '{tool_instance_name}' not found")
+            return None, f"{label}: Tool instance '{tool_instance_name}' not found"
+
+        # Looked up with a default, so an AttributeError raised inside the tool
+        # is reported as the tool's own error
+        method = getattr(tool_instance, method_name, None)
+        if method is None:
+            log(
+                f"   ❌ Method '{method_name}' not found in tool '{tool_instance_name}'"
+            )
+            return (
+                None,
+                f"{label}: Method '{method_name}' not found in tool "
+                f"'{tool_instance_name}'",
+            )
+
+        # Resolve arguments with placeholders from execution_context
+        final_tool_args = resolve_args(step.get("args"), execution_context, log)
+
+        log(f"   🔧 Calling: {tool_call}")
+        return method(**final_tool_args), None
+
+    except Exception as e:
+        log(f"   ❌ Error: {e}")
+        return None, f"{label}: {e}"
+
+
+def execute_plan(plan_steps, tool_instances, verbose=True):
+    """
+    Executes the planner's steps sequentially and collects their outputs.
+
+    Args:
+        plan_steps: The list of step dictionaries produced by the PlannerAgent.
+        tool_instances: Mapping of tool instance names (e.g. "geocoding") to toolkits.
+        verbose: Print per-step progress to the terminal.
+
+    Returns:
+        A tuple of (execution_context, errors) where `errors` lists the
+        messages of steps that failed.
+    """
+    log = print if verbose else _silent
+    execution_context = {}
+    errors = []
+
+    for i, step in enumerate(plan_steps, 1):
+        goal = step.get("goal", "No Goal Defined")
+        tool_call = step.get("tool")
+        output_key = step.get("output_key")
+
+        log(f"📋 Step {i}/{len(plan_steps)}: {goal}")
+
+        if tool_call:
+            step_result, error = run_step(
+                step, f"Step {i}", tool_instances, execution_context, log
+            )
+            if error:
+                errors.append(error)
+                continue
+
+            if output_key:
+                execution_context[output_key] = step_result
+                log("   ✅ Completed and stored in context")
+            else:
+                log("   ✅ Completed")
+        else:
+            log("   📝 Synthesis step - preparing for final response")
+            if "input_keys" in step and step["input_keys"] and output_key:
+                execution_context[output_key] = "Ready for synthesis."
+
+    return execution_context, errors
+
+
+def step_dependencies(step):
+    """Output keys a step reads: its placeholders and, for synthesis, input_keys."""
+    keys = set()
+    for value in (step.get("args") or {}).values():
+        if isinstance(value, str) and PLACEHOLDER_PATTERN.match(value):
+            keys.add(value.strip("{}").split(".")[0])
+    if not step.get("tool"):
+        keys.update(step.get("input_keys") or [])
+    return keys
+
+
+def execute_plan_stream(plan_steps, tool_instances, verbose=True, max_workers=4):
+    """
+    Executes plan steps while the plan is still being generated.
+
+    Each step starts as soon as it has arrived and every output it references
+    (see `step_dependencies`) is available, so independent steps run in
+    parallel. A malformed step, or a step depending on a failed one, fails on
+    its own; the rest of the plan still runs.
+
+    Args:
+        plan_steps: Iterable of step dictionaries, typically
+            PlannerAgent.stream_planning(); malformed steps carry "malformed".
+        tool_instances: Mapping of tool instance names (e.g. "geocoding") to toolkits.
+        verbose: Print per-step progress to the terminal.
+        max_workers: Maximum number of tool calls running at once.
+
+    Returns:
+        A tuple of (execution_context, errors), as execute_plan.
+    """
+    log = print if verbose else _silent
+    execution_context = {}
+    errors = []
+    failed_keys = set()
+    waiting = []
+    events = queue.Queue()
+
+    def read_plan():
+        try:
+            for step in plan_steps:
+                events.put(("step", step))
+        except Exception as e:
+            events.put(("stream_error", e))
+        events.put(("end", None))
+
+    def run(label, step, context):
+        result, error = None, f"{label}: interrupted"
+        try:
+            result, error = run_step(step, label, tool_instances, context, log)
+        finally:
+            # Posted even on a BaseException, or the loop waits for it forever
+            events.put(("done", (label, step, result, error)))
+
+    def fail(label, step, error):
+        log(f"   ❌ {error}")
+        errors.append(f"{label}: {error}")
+        if step.get("output_key"):
+            failed_keys.add(step["output_key"])
+
+    threading.Thread(target=read_plan, daemon=True).start()
+    received, running, stream_open = 0, 0, True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while stream_open or running:
+            kind, payload = events.get()
+            if kind == "step":
+                received += 1
+                label = f"Step {received}"
+                if "malformed" in payload:
+                    fail(label, payload, payload["error"])
+                else:
+                    waiting.append((label, payload, step_dependencies(payload)))
+            elif kind == "done":
+                running -= 1
+                label, step, result, error = payload
+                if error:
+                    errors.append(error)
+                    if step.get("output_key"):
+                        failed_keys.add(step["output_key"])
+                elif step.get("output_key"):
+                    execution_context[step["output_key"]] = result
+                    log(f"   ✅ {label} completed and stored in context")
+                else:
+                    log(f"   ✅ {label} completed")
+            elif kind == "stream_error":
+                log(f"   ❌ Plan stream failed: {payload}")
+                errors.append(f"Plan stream failed: {payload}")
+            else:
+                stream_open = False
+
+            # Start everything that became ready; failures can unblock others
+            progress = True
+            while progress:
+                progress = False
+                for entry in list(waiting):
+                    label, step, dependencies = entry
+                    resolved = dependencies & (execution_context.keys() | failed_keys)
+                    if step.get("tool"):
+                        blocked = dependencies & failed_keys
+                        if blocked:
+                            waiting.remove(entry)
+                            fail(label, step, f"depends on failed {sorted(blocked)}")
+                            progress = True
+                            continue
+                    if resolved != dependencies and stream_open:
+                        continue
+                    if resolved != dependencies and (running or step.get("tool")):
+                        continue
+
+                    waiting.remove(entry)
+                    progress = True
+                    log(f"📋 {label}: {step.get('goal', 'No Goal Defined')}")
+                    if step.get("tool"):
+                        running += 1
+                        pool.submit(run, label, step, dict(execution_context))
+                    else:
+                        log("   📝 Synthesis step - preparing for final response")
+                        if step.get("input_keys") and step.get("output_key"):
+                            execution_context[step["output_key"]] = (
+                                "Ready for synthesis."
+                            )
+
+    for label, step, dependencies in waiting:
+        missing = sorted(dependencies - execution_context.keys())
+        fail(label, step, f"inputs never produced: {missing}")
+
+    return execution_context, errors
@@ -0,0 +1,98 @@
+import json
+import re
+
+
+_OUTPUT_KEY_PATTERN = re.compile(r'"output_key"\s*:\s*"([^"]+)"')
+
+
+class PlanStepParser:
+    """
+    Incremental parser for a streamed JSON plan (an array of step objects).
+
+    Text is pushed in arbitrary chunks with `feed`; every step object is returned
+    as soon as its closing brace arrives. Text before the array (e.g. a ```json
+    fence) and after it is ignored. A step that is not valid JSON is returned as a
+    malformed step ({"malformed": raw_text, "error": ...}) instead of failing the
+    whole plan, and so is an object left unfinished when the stream ends.
+    """
+
+    def __init__(self):
+        self._state = "before_array"
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._current = []
+
+    def feed(self, text: str) -> list:
+        """Consumes the next chunk and returns the steps it completed."""
+        steps = []
+        for char in text:
+            if self._state == "before_array":
+                if char == "[":
+                    self._state = "in_array"
+                continue
+            if self._state == "done":
+                break
+
+            if self._depth == 0:
+                # Between elements of the top-level array
+                if char == "{":
+                    self._depth = 1
+                    self._current = [char]
+                elif char == "]":
+                    self._state = "done"
+                continue
+
+            self._current.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    steps.append(self._decode("".join(self._current)))
+                    self._current = []
+        return steps
+
+    def close(self) -> list:
+        """Ends the stream; returns a malformed step for any unfinished object."""
+        if self._depth > 0 and self._current:
+            raw = "".join(self._current)
+            self._current, self._depth = [], 0
+            return [malformed_step(raw, "Plan output ended in the middle of a step")]
+        return []
+
+    @staticmethod
+    def _decode(raw):
+        try:
+            step = json.loads(raw)
+        except json.JSONDecodeError as e:
+            return malformed_step(raw, f"Malformed plan step: {e}")
+        if not isinstance(step, dict):
+            return malformed_step(raw, "Plan step is not an object")
+        return step
+
+
+def malformed_step(raw, error):
+    step = {"malformed": raw, "error": error}
+    # Recover the output key if possible so dependent steps fail right away
+    match = _OUTPUT_KEY_PATTERN.search(raw)
+    if match:
+        step["output_key"] = match.group(1)
+    return step
+
+
+def parse_plan_stream(chunks):
+    """Yields the steps of a plan as the text `chunks` arrive."""
+    parser = PlanStepParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
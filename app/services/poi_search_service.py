@@ -0,0 +1,165 @@
+import os
+import re
+
+
+def _tokens(text):
+    # Aliases in parentheses ("Lalbagh Fort (Lalbagh Kella)") are kept as tokens
+    return set(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
+
+
+class POISearchService:
+    """
+    POI search that answers named-place lookups without an embedding call.
+
+    Every query first runs a BM25 search over `poi_name` and `content`. If the top
+    hit is a strong name match (see `is_strong_keyword_match`), it is returned
+    directly. Otherwise the query is embedded and a hybrid BM25 + vector search
+    runs with weight `alpha` on the vector score.
+
+    Without a Weaviate client, queries are answered by vector search alone over
+    the local int8 index exported by setup_embeddings.py (`local_index`).
+    """
+
+    def __init__(
+        self,
+        weaviate_client,
+        embedding_service,
+        alpha=None,
+        class_name="BangladeshPOI",
+        min_name_overlap=0.8,
+        min_score_margin=1.5,
+        local_index=None,
+    ):
+        """
+        Args:
+            weaviate_client: WeaviateClient used for the queries.
+            embedding_service: EmbeddingService used when the fast path misses.
+            alpha: Vector weight of the hybrid search (POI_HYBRID_ALPHA, default 0.5).
+            min_name_overlap: Share of the query's and the top name's tokens that
+                must be shared for a keyword-only answer.
+            min_score_margin: Required ratio of the top BM25 score to the runner-up.
+            local_index: QuantizedVectorIndex searched when `weaviate_client` is
+                None.
+        """
+        if weaviate_client is None and local_index is None:
+            raise ValueError(
+                "POISearchService needs a Weaviate client or a local index"
+            )
+        self.weaviate_client = weaviate_client
+        self.embedding_service = embedding_service
+        self.alpha = float(
+            alpha if alpha is not None else os.getenv("POI_HYBRID_ALPHA", "0.5")
+        )
+        self.class_name = class_name
+        self.min_name_overlap = min_name_overlap
+        self.min_score_margin = min_score_margin
+        self.local_index = local_index
+        self._local_positions = None
+        self.stats = {"keyword_only": 0, "hybrid": 0, "local": 0}
+
+    def is_strong_keyword_match(self, query, results):
+        """
+        True if the top BM25 result is clearly the place the query names: its name
+        and the query share most of their tokens, and it scores well ahead of the
+        runner-up.
+        """
+        if not results:
+            return False
+        query_tokens = _tokens(query)
+        name_tokens = _tokens(results[0]["poi_name"])
+        if not query_tokens or not name_tokens:
+            return False
+
+        shared = len(query_tokens & name_tokens)
+        if (
+            shared / len(name_tokens) < self.min_name_overlap
+            or shared / len(query_tokens) < self.min_name_overlap
+        ):
+            return False
+
+        if len(results) < 2:
+            return True
+        top_score = results[0]["_additional"]["score"] or 0.0
+        runner_up_score = results[1]["_additional"]["score"] or 0.0
+        return top_score >= self.min_score_margin * runner_up_score
+
+    def search(self, query, limit=5, category=None, location=None):
+        """
+        Search POIs for `query`, optionally filtered by category and location.
+
+        Returns:
+            A list of result dictionaries (see WeaviateClient.search_similar), with
+            `_additional.match` set to "keyword", "hybrid" or "local".
+        """
+        if self.weaviate_client is None:
+            return self.local_search(query, limit)
+
+        keyword_results = self.weaviate_client.keyword_search(
+            query,
+            class_name=self.class_name,
+            limit=max(limit, 2),
+            category=category,
+            location=location,
+        )
+        if self.is_strong_keyword_match(query, keyword_results):
+            self.stats["keyword_only"] += 1
+            return self._tag(keyword_results[:limit], "keyword")
+
+        query_vector = self.embedding_service.get_embedding(query)
+        if query_vector is None:
+            # Embedding failed; keyword results are better than nothing
+            return self._tag(keyword_results[:limit], "keyword")
+
+        self.stats["hybrid"] += 1
+        return self._tag(
+            self.weaviate_client.hybrid_search(
+                query,
+                query_vector,
+                alpha=self.alpha,
+                class_name=self.class_name,
+                limit=limit,
+                category=category,
+                location=location,
+            ),
+            "hybrid",
+        )
+
+    def local_search(self, query, limit=5):
+        """
+        Vector search over the local index. Category and location filters are
+        not available there, so they are not applied.
+        """
+        query_vector = self.embedding_service.get_embedding(query)
+        if query_vector is None:
+            return []
+        if len(query_vector) != self.local_index.dimensions:
+            print(
+                f"Local POI index holds {self.local_index.dimensions}-d vectors, "
+                f"queries are {len(query_vector)}-d; re-export the index"
+            )
+            return []
+
+        self.stats["local"] += 1
+        metadata = self.local_index.metadata or [{}] * len(self.local_index)
+        if self._local_positions is None:
+            self._local_positions = {
+                poi_id: i for i, poi_id in enumerate(self.local_index.ids)
+            }
+        positions = self._local_positions
+        results = []
+        for poi_id, similarity in self.local_index.search(query_vector, k=limit):
+            entry = metadata[positions[poi_id]]
+            results.append(
+                {
+                    "poi_name": entry.get("poi_name", ""),
+                    "coordinates": entry.get("coordinates", ""),
+                    "_additional": {"distance": 1.0 - similarity, "score": similarity},
+                }
+            )
+        return self._tag(results, "local")
+
+    @staticmethod
+    def _tag(results, match):
+        for result in results:
+            result["_additional"]["match"] = match
+        return results
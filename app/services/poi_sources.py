@@ -0,0 +1,136 @@
+import json
+import re
+
+# "23.7186° N, 90.3886° E" (also accepts "23.7186 N" and decimal pairs)
+_COORDINATE_PATTERN = re.compile(
+    r"(-?\d+(?:\.\d+)?)\s*°?\s*([NS])?\s*,\s*(-?\d+(?:\.\d+)?)\s*°?\s*([EW])?",
+    re.IGNORECASE,
+)
+_TEXT_HEADER_PATTERN = re.compile(r"^\s*\d+\.\s+(.+?)\s*$")
+_TEXT_FIELD_PATTERN = re.compile(r"^\s*([A-Za-z][A-Za-z ]*?)\s*:\s*(.*)$")
+_TEXT_FIELDS = {
+    "type": "type",
+    "description": "description",
+    "address": "address",
+    "coordinates": "coordinates",
+    "key features": "key_features",
+    "visiting tips": "visiting_tips",
+}
+
+
+def iter_json_array(path, chunk_size=65536):
+    """
+    Streams the elements of a top-level JSON array without loading the file.
+
+    Only one element (plus a read chunk) is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    with open(path, "r", encoding="utf-8") as f:
+        eof = False
+        while True:
+            if not eof and len(buffer) < chunk_size:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    if eof:
+                        return
+                    continue
+                if buffer[0] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                buffer = buffer[1:]
+                started = True
+                continue
+
+            if buffer.startswith(","):
+                buffer = buffer[1:].lstrip()
+            if buffer.startswith("]"):
+                return
+            if not buffer:
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                continue
+
+            try:
+                element, end = decoder.raw_decode(buffer)
+                # A number at the buffer end may be cut off mid-token ("2.5e"), so
+                # only trust elements followed by a separator
+                complete = eof or buffer[end:].lstrip()[:1] in (",", "]")
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                # Element spans the chunk boundary: read more and retry
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield element
+            buffer = buffer[end:]
+
+
+def iter_poi_text(path):
+    """
+    Streams POIs from the numbered text format of `data/point_of_interest.txt`:
+
+        1. Lalbagh Fort (Lalbagh Kella)
+        Type: Mughal Historical Fort
+        Coordinates: 23.7186° N, 90.3886° E
+        ...
+    """
+    record = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            header = _TEXT_HEADER_PATTERN.match(line)
+            if header and not _TEXT_FIELD_PATTERN.match(line):
+                if record:
+                    yield record
+                record = {"name": header.group(1)}
+                continue
+
+            field = _TEXT_FIELD_PATTERN.match(line)
+            if record is not None and field:
+                key = _TEXT_FIELDS.get(field.group(1).strip().lower())
+                if key:
+                    record[key] = field.group(2).strip()
+    if record:
+        yield record
+
+
+def parse_coordinates(value):
+    """Parses "23.7186° N, 90.3886° E" style coordinates into (latitude, longitude)."""
+    match = _COORDINATE_PATTERN.search(str(value or ""))
+    if not match:
+        return None, None
+    latitude, lat_hemisphere, longitude, lon_hemisphere = match.groups()
+    latitude, longitude = float(latitude), float(longitude)
+    if lat_hemisphere and lat_hemisphere.upper() == "S":
+        latitude = -latitude
+    if lon_hemisphere and lon_hemisphere.upper() == "W":
+        longitude = -longitude
+    return latitude, longitude
+
+
+def normalize_poi(raw: dict, source: str) -> dict:
+    """Maps a raw record from any source onto the common POI shape."""
+    latitude, longitude = raw.get("latitude"), raw.get("longitude")
+    if (latitude is None or longitude is None) and raw.get("coordinates"):
+        latitude, longitude = parse_coordinates(raw["coordinates"])
+
+    poi = {
+        key: " ".join(str(value).split())
+        for key, value in raw.items()
+        if value not in (None, "") and key not in ("latitude", "longitude")
+    }
+    poi.pop("coordinates", None)
+    if latitude is not None and longitude is not None:
+        poi["latitude"] = float(latitude)
+        poi["longitude"] = float(longitude)
+    poi["source"] = source
+    return poi
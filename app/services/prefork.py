@@ -0,0 +1,297 @@
+import gc
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+import traceback
+
+
+def _worker_main(initializer, handler, finalizer, threads, tasks, results):
+    pid = os.getpid()
+    try:
+        state = initializer() if initializer is not None else None
+    except Exception:
+        results.put(("init_failed", pid, None, traceback.format_exc(), None))
+        return
+    results.put(("ready", pid, None, None, None))
+
+    def serve():
+        while True:
+            item = tasks.get()
+            if item is None:
+                return
+            sequence, payload = item
+            results.put(("started", pid, sequence, None, None))
+            try:
+                # Pickled here: the queue pickles in a feeder thread, where a
+                # failure is only logged and the result silently lost
+                value = pickle.dumps(handler(state, payload))
+            except Exception as e:
+                results.put(("done", pid, sequence, None, f"{type(e).__name__}: {e}"))
+            else:
+                results.put(("done", pid, sequence, value, None))
+
+    serving = [threading.Thread(target=serve, daemon=True) for _ in range(threads)]
+    for thread in serving:
+        thread.start()
+    for thread in serving:
+        thread.join()
+
+    report = None
+    if finalizer is not None:
+        try:
+            report = finalizer(state)
+        except Exception as e:
+            print(f"Worker {pid} finalizer failed: {e}")
+    results.put(("exit", pid, None, report, None))
+
+
+class _Worker:
+    def __init__(self, process, tasks):
+        self.process = process
+        self.tasks = tasks
+        self.assigned = set()
+        # Tasks reported as timed out that may still occupy a thread
+        self.stuck = set()
+        self.ready = False
+
+
+class PreforkSupervisor:
+    """
+    Runs tasks on N forked worker processes, each serving several threads.
+
+    Everything the supervisor loaded before `start` is inherited by the workers
+    without being rebuilt, and is moved out of the garbage collector's reach
+    first so the collector does not touch it. Only data held in numpy arrays or
+    memory-mapped files (the place index grids, the int8 codes) stays shared:
+    ordinary Python objects such as dicts, lists and compiled patterns have
+    their reference counts updated on every read, so each worker ends up with
+    its own copy of the pages it reads. Anything holding threads, sockets or
+    SQLite connections must be created per worker by `initializer`.
+
+    Each worker has its own task queue, so the supervisor knows exactly which
+    tasks a worker holds: a worker that dies has those tasks reported as failed
+    and is replaced. With `task_timeout`, a task running longer than that is
+    reported as failed too; a worker whose threads are all stuck on such tasks
+    is killed and replaced.
+    """
+
+    def __init__(
+        self,
+        processes,
+        handler,
+        initializer=None,
+        finalizer=None,
+        threads_per_process=1,
+        queued_per_thread=2,
+        task_timeout=None,
+    ):
+        """
+        Args:
+            processes: Number of worker processes.
+            handler: handler(state, task) -> result, called on a worker thread.
+                Results must be picklable.
+            initializer: Called once in each worker after the fork; its return
+                value is the `state` passed to `handler`.
+            finalizer: finalizer(state) -> picklable report, called when a worker
+                shuts down; reports are collected in `reports`.
+            threads_per_process: Threads serving tasks in each worker.
+            queued_per_thread: Tasks handed to a worker per thread in advance.
+            task_timeout: Seconds a task may run before it is reported as
+                failed; None waits forever.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Prefork mode needs the 'fork' start method")
+        self._context = multiprocessing.get_context("fork")
+        self.processes = processes
+        self.handler = handler
+        self.initializer = initializer
+        self.finalizer = finalizer
+        self.threads_per_process = threads_per_process
+        self.capacity = threads_per_process * queued_per_thread
+        self.task_timeout = task_timeout
+        self.reports = []
+        self.restarts = 0
+        self._workers = {}
+        self._results = None
+        self._sequence = itertools.count()
+        self._tasks = {}
+        self._started = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def start(self):
+        if self._results is not None:
+            return
+        self._results = self._context.Queue()
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.processes):
+            self._spawn()
+
+    def _spawn(self):
+        tasks = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                self.initializer,
+                self.handler,
+                self.finalizer,
+                self.threads_per_process,
+                tasks,
+                self._results,
+            ),
+            daemon=True,
+        )
+        process.start()
+        self._workers[process.pid] = _Worker(process, tasks)
+
+    def _dispatch(self, task_iterator):
+        """Hands out tasks to the least loaded workers; False once exhausted."""
+        while self._workers:
+            worker = min(self._workers.values(), key=lambda w: len(w.assigned))
+            if len(worker.assigned) >= self.capacity:
+                return True
+            try:
+                task = next(task_iterator)
+            except StopIteration:
+                return False
+            sequence = next(self._sequence)
+            self._tasks[sequence] = task
+            worker.assigned.add(sequence)
+            worker.tasks.put((sequence, task))
+        return True
+
+    def _reap(self):
+        """Replaces dead workers; yields a failure for every task they held."""
+        for pid, worker in list(self._workers.items()):
+            if worker.process.exitcode is None:
+                continue
+            del self._workers[pid]
+            if not worker.ready:
+                raise RuntimeError(
+                    f"Worker process {pid} exited during startup "
+                    f"(exit code {worker.process.exitcode})"
+                )
+            print(
+                f"Worker process {pid} died (exit code {worker.process.exitcode}), "
+                "starting a replacement"
+            )
+            self.restarts += 1
+            self._spawn()
+            for sequence in sorted(worker.assigned - worker.stuck):
+                self._started.pop(sequence, None)
+                yield self._tasks.pop(sequence), None, "Worker process died"
+
+    def _expire(self):
+        """Yields a failure for every task running past `task_timeout`."""
+        if self.task_timeout is None:
+            return
+        now = time.monotonic()
+        for sequence, (pid, started) in list(self._started.items()):
+            if now - started < self.task_timeout:
+                continue
+            del self._started[sequence]
+            yield (
+                self._tasks.pop(sequence),
+                None,
+                f"Task timed out after {self.task_timeout:g} s",
+            )
+            worker = self._workers.get(pid)
+            if worker is None:
+                continue
+            worker.stuck.add(sequence)
+            if len(worker.stuck) >= self.threads_per_process:
+                print(
+                    f"Worker process {pid} is stuck on {len(worker.stuck)} "
+                    "tasks, replacing it"
+                )
+                worker.process.kill()
+                worker.process.join(timeout=5.0)
+                yield from self._reap()
+
+    def map(self, tasks):
+        """
+        Runs every task and yields (task, result, error) tuples as they finish,
+        in completion order. `error` is None on success. Tasks are pulled from
+        `tasks` lazily, at most `queued_per_thread` per worker thread at a time.
+        """
+        self.start()
+        task_iterator = iter(tasks)
+        more = True
+        while True:
+            if more:
+                more = self._dispatch(task_iterator)
+            if not more and not self._tasks:
+                return
+            yield from self._expire()
+            try:
+                kind, pid, sequence, value, error = self._results.get(timeout=0.5)
+            except queue.Empty:
+                yield from self._reap()
+                continue
+
+            worker = self._workers.get(pid)
+            if kind == "ready" and worker is not None:
+                worker.ready = True
+            elif kind == "init_failed":
+                raise RuntimeError(f"Worker process {pid} failed to start:\n{value}")
+            elif kind == "started" and sequence in self._tasks:
+                self._started[sequence] = (pid, time.monotonic())
+            elif kind == "done":
+                if worker is not None:
+                    worker.assigned.discard(sequence)
+                    worker.stuck.discard(sequence)
+                self._started.pop(sequence, None)
+                if sequence in self._tasks:
+                    if value is not None:
+                        try:
+                            value = pickle.loads(value)
+                        except Exception as e:
+                            value, error = None, f"Result not readable: {e}"
+                    yield self._tasks.pop(sequence), value, error
+
+    def shutdown(self, timeout=30.0):
+        """Stops the workers after their queued tasks and collects their reports."""
+        if self._results is None:
+            return
+        for worker in self._workers.values():
+            for _ in range(self.threads_per_process):
+                worker.tasks.put(None)
+
+        # Results must be drained before joining, or a worker blocked on a
+        # full pipe never exits
+        remaining = set(self._workers)
+        deadline = time.monotonic() + timeout
+        while remaining and time.monotonic() < deadline:
+            try:
+                kind, pid, _, value, _ = self._results.get(timeout=0.5)
+            except queue.Empty:
+                remaining = {
+                    pid
+                    for pid in remaining
+                    if self._workers[pid].process.exitcode is None
+                }
+                continue
+            if kind == "exit":
+                remaining.discard(pid)
+                if value is not None:
+                    self.reports.append(value)
+            elif kind == "init_failed":
+                remaining.discard(pid)
+
+        for worker in self._workers.values():
+            worker.process.join(timeout=1.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._workers = {}
+        self._results = None
+        gc.unfreeze()
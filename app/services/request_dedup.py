@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def geocode_key(location_name, country_code="bd"):
+    return (" ".join(str(location_name).lower().split()), str(country_code).lower())
+
+
+def weather_key(city, country_code=None):
+    return (" ".join(str(city).lower().split()), (country_code or "").upper())
+
+
+def route_key(
+    origin_latitude, origin_longitude, destination_latitude, destination_longitude
+):
+    # ~1 m precision; geocodes of the same place resolve to identical coordinates
+    return tuple(
+        round(float(value), 5)
+        for value in (
+            origin_latitude,
+            origin_longitude,
+            destination_latitude,
+            destination_longitude,
+        )
+    )
+
+
+def is_cacheable(result):
+    """Failed tool calls return {} or an error string; those are not shared."""
+    if not result:
+        return False
+    if isinstance(result, str):
+        lowered = result.lower()
+        return not (
+            lowered.startswith("error") or lowered.startswith("unexpected error")
+        )
+    return True
+
+
+# Tool methods whose results are shared across the batch, with their key builders.
+DEDUP_KEYS = {
+    ("geocoding", "geocode_location"): geocode_key,
+    ("weather_tools", "get_current_weather"): weather_key,
+    ("routing", "get_route"): route_key,
+}
+
+
+class SharedRequestCache:
+    """
+    Thread-safe single-flight LRU cache for tool sub-requests.
+
+    Concurrent callers asking for the same key share one upstream call; completed
+    results are kept up to `max_entries` so memory stays bounded for large batches.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _count(self, namespace, outcome):
+        counters = self.stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get_or_compute(self, namespace, key, compute):
+        """
+        Returns the cached result for (namespace, key), computing it once if missing.
+
+        Args:
+            namespace: Logical group of the request (e.g. "geocoding.geocode_location").
+            key: Hashable request key inside the namespace.
+            compute: Zero-argument callable that performs the upstream request.
+        """
+        cache_key = (namespace, key)
+        with self._lock:
+            future = self._entries.get(cache_key)
+            if future is not None:
+                self._entries.move_to_end(cache_key)
+                self._count(namespace, "hits")
+                owner = False
+            else:
+                future = Future()
+                self._entries[cache_key] = future
+                self._count(namespace, "misses")
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self._entries.pop(cache_key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if not is_cacheable(result):
+                self._entries.pop(cache_key, None)
+            while len(self._entries) > self.max_entries:
+                oldest_key, oldest = next(iter(self._entries.items()))
+                if not oldest.done():
+                    break
+                self._entries.pop(oldest_key)
+        future.set_result(result)
+        return result
+
+
+class DedupToolProxy:
+    """
+    Wraps a toolkit so that calls to its deduplicated methods go through a
+    SharedRequestCache. Other attributes are passed through unchanged.
+    """
+
+    def __init__(
+        self, tool_instance_name: str, tool_instance, cache: SharedRequestCache
+    ):
+        self._tool_instance_name = tool_instance_name
+        self._tool_instance = tool_instance
+        self._cache = cache
+
+    def __getattr__(self, name):
+        attribute = getattr(self._tool_instance, name)
+        key_builder = DEDUP_KEYS.get((self._tool_instance_name, name))
+        if key_builder is None or not callable(attribute):
+            return attribute
+
+        namespace = f"{self._tool_instance_name}.{name}"
+
+        def deduplicated(**kwargs):
+            try:
+                key = key_builder(**kwargs)
+            except (TypeError, ValueError):
+                # Unexpected arguments: let the tool itself report the problem
+                return attribute(**kwargs)
+            return self._cache.get_or_compute(
+                namespace, key, lambda: attribute(**kwargs)
+            )
+
+        return deduplicated
+
+
+def wrap_tool_instances(tool_instances: dict, cache: SharedRequestCache) -> dict:
+    """Returns a copy of `tool_instances` with every toolkit wrapped for dedup."""
+    return {
+        name: DedupToolProxy(name, tool_instance, cache)
+        for name, tool_instance in tool_instances.items()
+    }
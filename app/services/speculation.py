@@ -0,0 +1,325 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.custom_tools.place_index import load_places
+from app.services.place_names import name_parts
+from app.services.request_dedup import is_cacheable, route_key, weather_key
+
+
+_STOP_WORDS = "and|with|via|for|along|including|then|today|tomorrow|tonight|please"
+_STOP = rf"(?=\s+(?:{_STOP_WORDS})\b|[.;?!]|$)"
+_ROUTE_PATTERNS = [
+    re.compile(rf"\bfrom\s+(?P<origin>.+?)\s+to\s+(?P<destination>.+?){_STOP}", re.I),
+    re.compile(
+        rf"\bto\s+(?P<destination>(?:(?!\bto\s).)+?)\s+from\s+(?P<origin>.+?){_STOP}",
+        re.I,
+    ),
+    re.compile(
+        rf"\bbetween\s+(?P<origin>.+?)\s+and\s+(?P<destination>.+?){_STOP}", re.I
+    ),
+]
+# When names collide, the most specific place wins
+_KIND_RANK = {"neighborhood": 0, "locality": 1, "district": 2, "division": 3}
+
+
+class LocationExtractor:
+    """
+    Cheap origin/destination extraction from a ride request.
+
+    "from X to Y" and "between X and Y" phrasings are matched first; otherwise the
+    first two gazetteer places mentioned in the query are used. Places found in
+    the gazetteer are qualified with their district ("Khalishpur, Khulna").
+    """
+
+    def __init__(self, places=None, places_path="data/places_bangladesh.json"):
+        if places is None:
+            try:
+                places = load_places(places_path)
+            except OSError as e:
+                print(f"Gazetteer not loaded: {e}")
+                places = []
+        self.places = {}
+        for place in places:
+            key = place["name"].lower()
+            current = self.places.get(key)
+            if current is None or _KIND_RANK.get(place.get("kind"), 9) < _KIND_RANK.get(
+                current.get("kind"), 9
+            ):
+                self.places[key] = place
+        names = sorted(self.places, key=len, reverse=True)
+        self._gazetteer_pattern = (
+            re.compile(r"\b(" + "|".join(re.escape(n) for n in names) + r")\b", re.I)
+            if names
+            else None
+        )
+
+    def city_of(self, name):
+        """District (or division) a gazetteer place lies in, or None if unknown."""
+        place = self.places.get(str(name).lower())
+        if place is None:
+            return None
+        if place.get("district"):
+            return place["district"]
+        return place["name"]
+
+    def city_from_address(self, address):
+        """
+        City of the most specific gazetteer place in a geocoded address such as
+        Nominatim's "Gulshan 1, Gulshan, Dhaka, Dhaka Division, Bangladesh".
+        """
+        for part in str(address or "").split(","):
+            parts = name_parts(part)
+            city = self.city_of(parts[0]) if parts else None
+            if city:
+                return city
+        return None
+
+    def describe(self, name):
+        """
+        Returns {"name", "city"} for a raw place name: the name to geocode and
+        the city to fetch weather for. The city is None unless the place or one
+        of its qualifiers is in the gazetteer.
+        """
+        parts = name_parts(name)
+        if not parts:
+            return None
+        place = self.places.get(parts[0])
+        if place is None:
+            city = next(filter(None, map(self.city_of, parts[1:])), None)
+            return {"name": ", ".join(parts), "city": city}
+        city = self.city_of(place["name"])
+        qualified = [place["name"]] + [p for p in parts[1:] if p != city.lower()]
+        if city != place["name"]:
+            qualified.append(city)
+        return {"name": ", ".join(qualified), "city": city}
+
+    def extract(self, query):
+        """Returns (origin, destination) descriptions; either may be None."""
+        for pattern in _ROUTE_PATTERNS:
+            match = pattern.search(query)
+            if match:
+                return (
+                    self.describe(match.group("origin").strip(" ,")),
+                    self.describe(match.group("destination").strip(" ,")),
+                )
+        if self._gazetteer_pattern is None:
+            return None, None
+        found = []
+        for match in self._gazetteer_pattern.finditer(query):
+            if match.group(1).lower() not in [f.lower() for f in found]:
+                found.append(match.group(1))
+        described = [self.describe(name) for name in found[:2]]
+        return tuple(described + [None] * (2 - len(described)))
+
+
+class Speculation:
+    """
+    Tool calls started for one query before its plan exists.
+
+    `wrap` returns tool instances that answer matching plan steps from the
+    speculative results; mismatching or failed speculations are ignored and the
+    real tool is called instead.
+    """
+
+    def __init__(self, origin, destination):
+        self.origin = origin
+        self.destination = destination
+        self.futures = {}
+        self.stats = {"reused": 0, "missed": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _result(self, name):
+        future = self.futures.get(name)
+        if future is None or future.cancelled():
+            return None
+        try:
+            result = future.result()
+        except Exception:
+            return None
+        return result if is_cacheable(result) else None
+
+    def match_geocode(self, location_name):
+        """Speculative geocode for `location_name`, if it names the same place."""
+        parts = name_parts(location_name)
+        for role, place in (("origin", self.origin), ("destination", self.destination)):
+            if not place or not parts:
+                continue
+            speculated = name_parts(place["name"])
+            if parts[0] != speculated[0]:
+                continue
+            result = self._result(f"{role}_geocode")
+            if not isinstance(result, dict):
+                return None
+            # Any qualifier the plan adds ("..., Khulna") must agree with the result
+            context = " ".join(speculated).lower() + " "
+            context += str(result.get("display_name", "")).lower()
+            if all(part in context for part in parts[1:]):
+                return result
+        return None
+
+    def match_weather(self, city, country_code=None):
+        if (country_code or "BD").upper() != "BD":
+            return None
+        for role, place in (("origin", self.origin), ("destination", self.destination)):
+            if not place or place["city"] is None:
+                continue
+            if weather_key(city) == weather_key(place["city"]):
+                return self._result(f"{role}_weather")
+        return None
+
+    def match_route(self, **kwargs):
+        if "route" not in self.futures:
+            return None
+        origin = self._result("origin_geocode")
+        destination = self._result("destination_geocode")
+        if not isinstance(origin, dict) or not isinstance(destination, dict):
+            return None
+        try:
+            requested = route_key(**kwargs)
+        except (TypeError, ValueError):
+            return None
+        speculated = route_key(
+            origin["latitude"],
+            origin["longitude"],
+            destination["latitude"],
+            destination["longitude"],
+        )
+        return self._result("route") if requested == speculated else None
+
+    def wrap(self, tool_instances):
+        """Returns a copy of `tool_instances` that reuses matching speculative results."""
+        return {
+            name: SpeculativeToolProxy(name, tool_instance, self)
+            for name, tool_instance in tool_instances.items()
+        }
+
+    def discard(self):
+        """Cancels speculative calls that have not started yet."""
+        for future in self.futures.values():
+            future.cancel()
+
+
+_MATCHERS = {
+    ("geocoding", "geocode_location"): Speculation.match_geocode,
+    ("weather_tools", "get_current_weather"): Speculation.match_weather,
+    ("routing", "get_route"): Speculation.match_route,
+}
+
+
+class SpeculativeToolProxy:
+    """Wraps a toolkit so plan steps that were speculated reuse the result."""
+
+    def __init__(self, tool_instance_name, tool_instance, speculation: Speculation):
+        self._tool_instance_name = tool_instance_name
+        self._tool_instance = tool_instance
+        self._speculation = speculation
+
+    def __getattr__(self, name):
+        attribute = getattr(self._tool_instance, name)
+        matcher = _MATCHERS.get((self._tool_instance_name, name))
+        if matcher is None or not callable(attribute):
+            return attribute
+
+        def speculative(**kwargs):
+            try:
+                result = matcher(self._speculation, **kwargs)
+            except TypeError:
+                result = None
+            if result is not None:
+                self._speculation._count("reused")
+                return result
+            self._speculation._count("missed")
+            return attribute(**kwargs)
+
+        return speculative
+
+
+class Speculator:
+    """
+    Starts likely geocoding, weather and routing calls for a query while the
+    planner LLM is still running, so their latency overlaps with planning.
+
+    The origin and destination are geocoded, the weather is fetched for their
+    cities, and once both geocodes are in the route between them is requested
+    too. Weather is only speculated for a city found in the gazetteer, either
+    from the query or from the geocoded address, never for a raw name.
+    """
+
+    def __init__(self, tool_instances, extractor=None, max_workers=8):
+        """
+        Args:
+            tool_instances: Mapping of tool instance names to toolkits (may be
+                dedup proxies), used for the speculative calls.
+            extractor: LocationExtractor; built from the bundled gazetteer if omitted.
+            max_workers: Threads shared by all speculative calls.
+        """
+        self.tool_instances = tool_instances
+        self.extractor = extractor or LocationExtractor()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="speculation"
+        )
+
+    def start(self, user_query) -> Speculation:
+        origin, destination = self.extractor.extract(user_query or "")
+        speculation = Speculation(origin, destination)
+        geocoding = self.tool_instances.get("geocoding")
+        weather_tools = self.tool_instances.get("weather_tools")
+        routing = self.tool_instances.get("routing")
+
+        for role, place in (("origin", origin), ("destination", destination)):
+            if place and geocoding is not None:
+                speculation.futures[f"{role}_geocode"] = self.executor.submit(
+                    geocoding.geocode_location, location_name=place["name"]
+                )
+        cities = set()
+        for role, place in (("origin", origin), ("destination", destination)):
+            if not place or weather_tools is None or place["city"] in cities:
+                continue
+            if place["city"] is not None:
+                cities.add(place["city"])
+                speculation.futures[f"{role}_weather"] = self.executor.submit(
+                    weather_tools.get_current_weather,
+                    city=place["city"],
+                    country_code="BD",
+                )
+            elif f"{role}_geocode" in speculation.futures:
+                # Not in the gazetteer: the city comes from the geocoded address
+                speculation.futures[f"{role}_weather"] = self.executor.submit(
+                    self._weather_after_geocode, speculation, role, weather_tools
+                )
+        if origin and destination and geocoding is not None and routing is not None:
+            speculation.futures["route"] = self.executor.submit(
+                self._route, speculation, routing
+            )
+        return speculation
+
+    def _weather_after_geocode(self, speculation, role, weather_tools):
+        geocode = speculation._result(f"{role}_geocode")
+        if not isinstance(geocode, dict):
+            return None
+        city = self.extractor.city_from_address(geocode.get("display_name"))
+        if city is None:
+            return None
+        getattr(speculation, role)["city"] = city
+        return weather_tools.get_current_weather(city=city, country_code="BD")
+
+    @staticmethod
+    def _route(speculation, routing):
+        origin = speculation._result("origin_geocode")
+        destination = speculation._result("destination_geocode")
+        if not isinstance(origin, dict) or not isinstance(destination, dict):
+            return None
+        return routing.get_route(
+            origin_latitude=origin["latitude"],
+            origin_longitude=origin["longitude"],
+            destination_latitude=destination["latitude"],
+            destination_longitude=destination["longitude"],
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,155 @@
+import json
+import os
+import numpy as np
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """L2-normalizes vectors so that dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(vectors) -> tuple:
+    """
+    Symmetric per-vector int8 quantization.
+
+    Returns:
+        (codes, scales) where vectors ≈ codes * scales[:, None].
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+class QuantizedVectorIndex:
+    """
+    In-process cosine search over int8-quantized embeddings.
+
+    Only the int8 codes (1 byte per dimension) and one scale per vector are held
+    in RAM. Full-precision vectors, when available, are memory-mapped from disk
+    and used to rescore the top `k * oversample` candidates, recovering nearly
+    all of the recall lost to quantization.
+    """
+
+    CHUNK_ROWS = 8192
+
+    def __init__(self, codes, scales, ids, full_vectors=None, metadata=None):
+        self.codes = codes
+        self.scales = scales
+        self.ids = list(ids)
+        self.full_vectors = full_vectors
+        self.metadata = metadata
+
+    @classmethod
+    def build(cls, vectors, ids, metadata=None):
+        vectors = normalize_rows(vectors)
+        codes, scales = quantize_int8(vectors)
+        return cls(codes, scales, ids, full_vectors=vectors, metadata=metadata)
+
+    @property
+    def dimensions(self):
+        return self.codes.shape[1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def memory_bytes(self) -> int:
+        """Resident bytes of the quantized representation (codes + scales)."""
+        return self.codes.nbytes + self.scales.nbytes
+
+    def storage_bytes(self) -> int:
+        """
+        Total bytes of the index: codes and scales plus the full-precision
+        vectors kept for rescoring (memory-mapped, so paged in on demand).
+        """
+        full_bytes = 0
+        if self.full_vectors is not None:
+            full_bytes = len(self.ids) * self.dimensions * 4
+        return self.memory_bytes() + full_bytes
+
+    def save(self, directory):
+        """Writes the index as .npy files that `load` can memory-map."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "codes.npy"), self.codes)
+        np.save(os.path.join(directory, "scales.npy"), self.scales)
+        if self.full_vectors is not None:
+            np.save(
+                os.path.join(directory, "vectors.npy"),
+                np.asarray(self.full_vectors, dtype=np.float32),
+            )
+        with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "metadata": self.metadata}, f)
+
+    @classmethod
+    def load(cls, directory, rescore=True, mmap_codes=False):
+        """
+        Loads an index saved with `save`. Codes are read into RAM; full-precision
+        vectors stay memory-mapped so only rescored rows are paged in.
+
+        With `mmap_codes`, the codes are memory-mapped as well: every process
+        that loads the same directory then shares one copy in the page cache
+        (used by prefork workers).
+        """
+        codes = np.load(
+            os.path.join(directory, "codes.npy"), mmap_mode="r" if mmap_codes else None
+        )
+        scales = np.load(os.path.join(directory, "scales.npy"))
+        full_vectors = None
+        vectors_path = os.path.join(directory, "vectors.npy")
+        if rescore and os.path.exists(vectors_path):
+            full_vectors = np.load(vectors_path, mmap_mode="r")
+        with open(os.path.join(directory, "ids.json"), "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        return cls(codes, scales, stored["ids"], full_vectors, stored.get("metadata"))
+
+    def _approximate_scores(self, queries):
+        scores = np.empty((len(queries), len(self.ids)), dtype=np.float32)
+        # Chunked so the int8 -> float32 upcast never materializes the whole
+        # matrix; each chunk is upcast once for all queries in the batch
+        for start in range(0, len(self.ids), self.CHUNK_ROWS):
+            end = start + self.CHUNK_ROWS
+            chunk = self.codes[start:end].astype(np.float32)
+            scores[:, start:end] = (queries @ chunk.T) * self.scales[start:end]
+        return scores
+
+    def search(self, query_vector, k: int = 10, oversample: int = 4):
+        """
+        Returns up to `k` (id, cosine_similarity) pairs, best first.
+
+        Args:
+            query_vector: Query embedding with the index's dimensionality.
+            k: Number of results.
+            oversample: Candidates per result rescored at full precision
+                (ignored when full-precision vectors are not available).
+        """
+        return self.search_batch([query_vector], k, oversample)[0]
+
+    def search_batch(self, query_vectors, k: int = 10, oversample: int = 4):
+        """Like `search` for several queries at once; returns one list per query."""
+        if not self.ids:
+            return [[] for _ in query_vectors]
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        all_scores = self._approximate_scores(queries)
+
+        rescore = self.full_vectors is not None and oversample > 1
+        candidate_count = min(len(self.ids), k * oversample if rescore else k)
+
+        results = []
+        for query, scores in zip(queries, all_scores):
+            candidates = np.argpartition(-scores, candidate_count - 1)[:candidate_count]
+            if rescore:
+                candidates = np.sort(candidates)  # sequential reads from the mmap
+                candidate_scores = (
+                    np.asarray(self.full_vectors[candidates], dtype=np.float32) @ query
+                )
+            else:
+                candidate_scores = scores[candidates]
+
+            order = np.argsort(-candidate_scores)[:k]
+            results.append(
+                [(self.ids[candidates[i]], float(candidate_scores[i])) for i in order]
+            )
+        return results
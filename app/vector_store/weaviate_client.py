@@ -1,16 +1,118 @@
 import weaviate
 import os
+import re
+import threading
 from openai import OpenAI
 from weaviate.classes.config import Configure
+from weaviate.classes.init import AdditionalConfig
+from weaviate.classes.query import Filter, HybridFusion, MetadataQuery
+from weaviate.config import ConnectionConfig
+from app.vector_store.quantized_index import QuantizedVectorIndex
+
+
+class BatchWriter:
+    """
+    One long-lived batch stream for a whole ingestion run.
+
+    Objects are streamed to Weaviate in fixed-size batches sent by
+    `concurrent_requests` background workers. Objects rejected by the server are
+    collected in `failed_objects` when the writer closes.
+
+    Concurrent batches may land in any order, so an object re-sent under a UUID
+    that was already queued (a deduplication replacement) waits until everything
+    queued before it has been written; the newer version always wins.
+    """
+
+    def __init__(
+        self, collection, batch_size=100, concurrent_requests=4, dimensions=None
+    ):
+        self.collection = collection
+        # Vector size of the collection; taken from the first object if unknown
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+        self.concurrent_requests = concurrent_requests
+        self.added = 0
+        self.failed_objects = []
+        self._context = None
+        self._batch = None
+        self._queued_uuids = set()
+
+    def __enter__(self):
+        self._context = self.collection.batch.fixed_size(
+            batch_size=self.batch_size, concurrent_requests=self.concurrent_requests
+        )
+        self._batch = self._context.__enter__()
+        return self
+
+    def add_objects(self, items):
+        """
+        Queue {"properties", "vector", "uuid"} items for writing. Server side
+        failures are only known once the writer is closed (`failed_objects`).
+        """
+        for item in items:
+            if self.dimensions is None:
+                self.dimensions = len(item["vector"])
+            elif len(item["vector"]) != self.dimensions:
+                raise ValueError(
+                    f"Vector has {len(item['vector'])} dimensions but collection "
+                    f"{self.collection.name} holds {self.dimensions}-d vectors; "
+                    "set EMBEDDING_DIMENSIONS to match or recreate the collection"
+                )
+            object_uuid = item.get("uuid")
+            if object_uuid is not None:
+                if object_uuid in self._queued_uuids:
+                    self._batch.flush()
+                self._queued_uuids.add(object_uuid)
+            self._batch.add_object(
+                properties=item["properties"],
+                vector=item["vector"],
+                uuid=object_uuid,
+            )
+            self.added += 1
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._context.__exit__(exc_type, exc_val, exc_tb)
+        self.failed_objects = [
+            {
+                "uuid": str(error.object_.uuid),
+                "poi_name": (error.object_.properties or {}).get("poi_name", ""),
+                "message": error.message,
+            }
+            for error in self.collection.batch.failed_objects
+        ]
 
 
 class WeaviateClient:
-    def __init__(self):
-        self.client = weaviate.connect_to_local()
+    # Keyword fields for BM25; matches on the POI name weigh three times as much
+    KEYWORD_PROPERTIES = ["poi_name^3", "content"]
+
+    def __init__(self, pool_connections=None, pool_maxsize=None):
+        # One pooled HTTP session and one multiplexed gRPC channel; the client is
+        # thread-safe, so concurrent queries share them instead of connecting
+        self.client = weaviate.connect_to_local(
+            additional_config=AdditionalConfig(
+                connection=ConnectionConfig(
+                    session_pool_connections=int(
+                        pool_connections or os.getenv("WEAVIATE_POOL_CONNECTIONS", "20")
+                    ),
+                    session_pool_maxsize=int(
+                        pool_maxsize or os.getenv("WEAVIATE_POOL_MAXSIZE", "100")
+                    ),
+                )
+            ),
+        )
         self.openai_client = OpenAI()
-        print("=" * 50)
-        print(f"Weaviate client status: {self.client.is_ready()}")
-        print("=" * 50)
+
+    def warmup(self, class_name="BangladeshPOI"):
+        """
+        Primes the connection so the first real query doesn't pay for the
+        HTTP/gRPC handshakes or the collection's schema lookup.
+        """
+        if not self.client.is_ready():
+            raise RuntimeError("Weaviate is not ready")
+        if self.client.collections.exists(class_name):
+            collection = self.client.collections.get(class_name)
+            collection.query.fetch_objects(limit=1, return_properties=[])
 
     def close(self):
         if hasattr(self.client, "close"):
@@ -22,8 +124,32 @@ class WeaviateClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def create_schema(self, class_name="BangladeshPOI"):
-        """Create collection schema using Weaviate v4 API"""
+    def _vector_index_config(self, quantizer):
+        """HNSW config with optional compression (none, pq, bq or sq)"""
+        quantizer = (quantizer or "none").lower()
+        if quantizer == "none":
+            return Configure.VectorIndex.hnsw()
+        if quantizer == "pq":
+            # PQ trains its codebook on the first objects; smaller POI sets still
+            # need enough samples, so train as soon as 10k objects exist
+            quantizer_config = Configure.VectorIndex.Quantizer.pq(training_limit=10000)
+        elif quantizer == "bq":
+            quantizer_config = Configure.VectorIndex.Quantizer.bq(rescore_limit=200)
+        elif quantizer == "sq":
+            quantizer_config = Configure.VectorIndex.Quantizer.sq(training_limit=10000)
+        else:
+            raise ValueError(f"Unknown vector index quantizer: {quantizer}")
+        return Configure.VectorIndex.hnsw(quantizer=quantizer_config)
+
+    def create_schema(self, class_name="BangladeshPOI", quantizer=None):
+        """
+        Create collection schema using Weaviate v4 API
+
+        Args:
+            class_name: Name of the collection.
+            quantizer: Vector index compression ("none", "pq", "bq" or "sq").
+                Defaults to the VECTOR_INDEX_QUANTIZER environment variable.
+        """
         try:
             # Check if collection already exists
             if self.client.collections.exists(class_name):
@@ -35,6 +161,9 @@ class WeaviateClient:
             # Create collection with properties
             collection = self.client.collections.create(
                 name=class_name,
+                vector_index_config=self._vector_index_config(
+                    quantizer or os.getenv("VECTOR_INDEX_QUANTIZER", "none")
+                ),
                 properties=[
                     weaviate.classes.config.Property(
                         name="content", data_type=weaviate.classes.config.DataType.TEXT
@@ -75,37 +204,199 @@ class WeaviateClient:
             print(f"Error creating schema: {e}")
             return None
 
-    def search_similar(self, query_vector, class_name="BangladeshPOI", limit=5):
+    @staticmethod
+    def to_result(obj):
+        metadata = obj.metadata
+        return {
+            "content": obj.properties.get("content", ""),
+            "poi_name": obj.properties.get("poi_name", ""),
+            "location": obj.properties.get("location", ""),
+            "category": obj.properties.get("category", ""),
+            "description": obj.properties.get("description", ""),
+            "coordinates": obj.properties.get("coordinates", ""),
+            "full_data": obj.properties.get("full_data", {}),
+            "_additional": {
+                "distance": metadata.distance if metadata else None,
+                "score": metadata.score if metadata else None,
+            },
+        }
+
+    @staticmethod
+    def build_filters(category=None, location=None):
+        """
+        Filters pushed down into the query: exact category, and every word of
+        `location`. The location property is word-tokenized, so a multi-word
+        location ("Old Dhaka") is matched word by word rather than as one
+        substring pattern, which would never match a single token.
+        """
+        filters = []
+        if category:
+            filters.append(Filter.by_property("category").equal(category))
+        location_tokens = re.findall(r"\w+", location.lower()) if location else []
+        if location_tokens:
+            filters.append(Filter.by_property("location").contains_all(location_tokens))
+        if not filters:
+            return None
+        return Filter.all_of(filters) if len(filters) > 1 else filters[0]
+
+    def search_similar(
+        self,
+        query_vector,
+        class_name="BangladeshPOI",
+        limit=5,
+        category=None,
+        location=None,
+    ):
         """Search for similar POIs using vector similarity"""
         try:
             collection = self.client.collections.get(class_name)
 
             response = collection.query.near_vector(
-                near_vector=query_vector, limit=limit, return_metadata=["distance"]
+                near_vector=query_vector,
+                limit=limit,
+                filters=self.build_filters(category, location),
+                return_metadata=["distance"],
             )
 
-            results = []
-            for obj in response.objects:
-                result = {
-                    "content": obj.properties.get("content", ""),
-                    "poi_name": obj.properties.get("poi_name", ""),
-                    "location": obj.properties.get("location", ""),
-                    "category": obj.properties.get("category", ""),
-                    "description": obj.properties.get("description", ""),
-                    "coordinates": obj.properties.get("coordinates", ""),
-                    "full_data": obj.properties.get("full_data", {}),
-                    "_additional": {
-                        "distance": obj.metadata.distance if obj.metadata else None
-                    },
-                }
-                results.append(result)
-
-            return results
+            return [self.to_result(obj) for obj in response.objects]
 
         except Exception as e:
             print(f"Search error: {e}")
             return []
 
+    def keyword_search(
+        self,
+        query_text,
+        class_name="BangladeshPOI",
+        limit=5,
+        category=None,
+        location=None,
+    ):
+        """Search POIs with BM25 over the name and content; needs no embedding"""
+        try:
+            collection = self.client.collections.get(class_name)
+
+            response = collection.query.bm25(
+                query=query_text,
+                query_properties=self.KEYWORD_PROPERTIES,
+                limit=limit,
+                filters=self.build_filters(category, location),
+                return_metadata=MetadataQuery(score=True),
+            )
+
+            return [self.to_result(obj) for obj in response.objects]
+
+        except Exception as e:
+            print(f"Keyword search error: {e}")
+            return []
+
+    def hybrid_search(
+        self,
+        query_text,
+        query_vector,
+        alpha=0.5,
+        class_name="BangladeshPOI",
+        limit=5,
+        category=None,
+        location=None,
+    ):
+        """
+        Search POIs combining BM25 and vector scores.
+
+        Args:
+            alpha: Weight of the vector score; 0 is pure keyword, 1 pure vector.
+        """
+        try:
+            collection = self.client.collections.get(class_name)
+
+            response = collection.query.hybrid(
+                query=query_text,
+                vector=query_vector,
+                alpha=alpha,
+                query_properties=self.KEYWORD_PROPERTIES,
+                fusion_type=HybridFusion.RELATIVE_SCORE,
+                limit=limit,
+                filters=self.build_filters(category, location),
+                return_metadata=MetadataQuery(score=True),
+            )
+
+            return [self.to_result(obj) for obj in response.objects]
+
+        except Exception as e:
+            print(f"Hybrid search error: {e}")
+            return []
+
+    def export_local_index(self, directory, class_name="BangladeshPOI"):
+        """
+        Export all vectors into an int8 QuantizedVectorIndex saved at `directory`
+        for in-process search. Returns the number of exported vectors.
+        """
+        try:
+            collection = self.client.collections.get(class_name)
+            ids, vectors, metadata = [], [], []
+            for obj in collection.iterator(
+                include_vector=True, return_properties=["poi_name", "coordinates"]
+            ):
+                vector = obj.vector.get("default") if obj.vector else None
+                if vector is None:
+                    continue
+                ids.append(str(obj.uuid))
+                vectors.append(vector)
+                metadata.append(
+                    {
+                        "poi_name": obj.properties.get("poi_name", ""),
+                        "coordinates": obj.properties.get("coordinates", ""),
+                    }
+                )
+
+            if not ids:
+                print(f"No vectors found in {class_name}")
+                return 0
+
+            index = QuantizedVectorIndex.build(vectors, ids, metadata=metadata)
+            index.save(directory)
+            print(
+                f"Exported {len(index)} vectors to {directory} "
+                f"({index.memory_bytes() / len(index):.0f} bytes/POI in RAM, "
+                f"{index.storage_bytes() / len(index):.0f} bytes/POI in total "
+                "with the memory-mapped rescoring vectors)"
+            )
+            return len(index)
+
+        except Exception as e:
+            print(f"Export error: {e}")
+            return 0
+
+    def batch_writer(
+        self, class_name="BangladeshPOI", batch_size=100, concurrent_requests=None
+    ):
+        """
+        Open a BatchWriter on the collection (use as a context manager). Vectors
+        whose size differs from those already stored are rejected.
+        """
+        return BatchWriter(
+            self.client.collections.get(class_name),
+            batch_size=batch_size,
+            concurrent_requests=int(
+                concurrent_requests or os.getenv("WEAVIATE_BATCH_CONCURRENCY", "4")
+            ),
+            dimensions=self.get_vector_dimensions(class_name),
+        )
+
+    def get_vector_dimensions(self, class_name="BangladeshPOI"):
+        """
+        Size of the vectors stored in the collection, or None if it is empty.
+        Collections without a vectorizer do not record it in their config, so
+        one stored object is inspected.
+        """
+        collection = self.client.collections.get(class_name)
+        response = collection.query.fetch_objects(limit=1, include_vector=True)
+        for obj in response.objects:
+            vector = obj.vector.get("default") if obj.vector else None
+            if vector is not None:
+                return len(vector)
+        return None
+
     def get_object_count(self, class_name="BangladeshPOI"):
         """Get total number of stored objects"""
         try:
@@ -127,3 +418,26 @@ class WeaviateClient:
         except Exception as e:
             print(f"Error listing collections: {e}")
             return []
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_weaviate_client(class_name="BangladeshPOI") -> WeaviateClient:
+    """
+    Returns the WeaviateClient shared by every query in this process, connecting
+    and warming it up on first use. Call it once at service start so no request
+    pays the warm-up. Forked workers must call it after the fork.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            client = WeaviateClient()
+            try:
+                client.warmup(class_name)
+            except Exception:
+                client.close()
+                raise
+            _shared_client = client
+    return _shared_client
@@ -0,0 +1,456 @@
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+from app.custom_tools.weather import WeatherTools
+from app.custom_tools.geocoding import GeocodingTools
+from app.custom_tools.geocode_cache import GeocodeCache
+from app.custom_tools.poi_search import build_poi_search_tools
+from app.custom_tools.routing import RoutingTools
+from app.custom_tools.reverse_geocoding import ReverseGeocodingTools
+from app.custom_tools.route_cache import RouteCache
+
+from app.agents.planner_agent import PlannerAgent
+from app.agents.executive_agent import ExecutiveAgent
+from app.agents.rate_limited_model import RateLimitedOpenAIChat
+from app.services.plan_executor import execute_plan, execute_plan_stream
+from app.services.prefork import PreforkSupervisor
+from app.services.request_dedup import SharedRequestCache, wrap_tool_instances
+from app.services.speculation import LocationExtractor, Speculator
+
+load_dotenv()
+warnings.filterwarnings(
+    "ignore", category=UserWarning, module="google.protobuf.runtime_version"
+)
+
+openai_api_key = os.getenv("OPENAI_API_KEY")
+open_weather_api_key = os.getenv("OPEN_WEATHER_KEY")
+
+if not openai_api_key:
+    raise ValueError(
+        "OPENAI_API_KEY not found in environment variables. Please check your .env file."
+    )
+
+if not open_weather_api_key:
+    raise ValueError(
+        "OPEN_WEATHER_KEY not found in environment variables. Please check your .env file."
+    )
+
+# Agno agents keep per-run state, so every worker thread gets its own pair.
+_worker_state = threading.local()
+
+
+def read_queries(path):
+    """
+    Lazily yields (query_id, query) pairs from a JSONL file.
+
+    Each line is either {"id": ..., "query": "..."} or a bare JSON string.
+    Malformed lines are yielded with a None query so they are reported as failures.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+                continue
+            if isinstance(record, str):
+                yield line_number, record
+            elif isinstance(record, dict):
+                yield record.get("id", line_number), record.get("query")
+            else:
+                yield line_number, None
+
+
+def _get_agents(tool_instances):
+    # Built once per worker thread; every query then runs in its own throw-away
+    # session (StatelessAgentMixin), so a worker's memory does not grow per query
+    if not hasattr(_worker_state, "planner_agent"):
+        tools = list(tool_instances.values())
+        _worker_state.planner_agent = PlannerAgent(
+            model=RateLimitedOpenAIChat(id="gpt-4o", api_key=openai_api_key),
+            tools=tools,
+        )
+        _worker_state.executive_agent = ExecutiveAgent(
+            model=RateLimitedOpenAIChat(id="gpt-4o", api_key=openai_api_key),
+            tools=tools,
+        )
+    return _worker_state.planner_agent, _worker_state.executive_agent
+
+
+def plan_query(
+    query_id,
+    user_query,
+    base_tool_instances,
+    tool_instances,
+    speculator,
+    stream_plans=False,
+):
+    """
+    Runs planning, execution and synthesis for a single query. Likely tool calls
+    are started by `speculator` while the plan is being generated; with
+    `stream_plans`, plan steps also start executing as soon as they are planned.
+    """
+    started = time.perf_counter()
+    result = {"id": query_id, "query": user_query}
+
+    try:
+        if not user_query:
+            raise ValueError(
+                "Invalid input line: expected a JSON string or an object with 'query'"
+            )
+
+        planner_agent, executive_agent = _get_agents(base_tool_instances)
+        speculation = speculator.start(user_query)
+        try:
+            if stream_plans:
+                plan_steps = []
+
+                def record(steps):
+                    for step in steps:
+                        plan_steps.append(step)
+                        yield step
+
+                execution_context, step_errors = execute_plan_stream(
+                    record(planner_agent.stream_planning(user_query)),
+                    speculation.wrap(tool_instances),
+                    verbose=False,
+                )
+                if not plan_steps:
+                    raise ValueError("Failed to generate a valid plan")
+            else:
+                plan_steps = planner_agent.run_planning(user_query)
+                if not plan_steps:
+                    raise ValueError("Failed to generate a valid plan")
+
+                execution_context, step_errors = execute_plan(
+                    plan_steps, speculation.wrap(tool_instances), verbose=False
+                )
+        finally:
+            speculation.discard()
+            result["_speculation"] = speculation.stats
+        final_response = executive_agent.synthesize_response(execution_context)
+        content = (
+            final_response.content
+            if hasattr(final_response, "content")
+            else str(final_response)
+        )
+
+        result.update(
+            {
+                "status": "ok",
+                "steps": len(plan_steps),
+                "step_errors": step_errors,
+                "response": content,
+            }
+        )
+    except Exception as e:
+        result.update({"status": "error", "error": str(e)})
+
+    result["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _build_tool_instances(reverse_geocoding_tools=None):
+    tool_instances = {
+        "geocoding": GeocodingTools(geocode_cache=GeocodeCache()),
+        "weather_tools": WeatherTools(api_key=open_weather_api_key),
+        "routing": RoutingTools(route_cache=RouteCache()),
+        "reverse_geocoding": reverse_geocoding_tools or ReverseGeocodingTools(),
+    }
+    poi_search_tools = build_poi_search_tools()
+    if poi_search_tools is not None:
+        tool_instances["poi_search"] = poi_search_tools
+    return tool_instances
+
+
+def _record_result(result, out, summary):
+    for outcome, count in result.pop("_speculation", {}).items():
+        summary["speculation"][outcome] += count
+    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    summary["total"] += 1
+    if result["status"] == "ok":
+        summary["succeeded"] += 1
+    else:
+        summary["failed"] += 1
+        print(f"❌ Query {result['id']} failed: {result['error']}")
+
+
+def _finish_summary(summary, started):
+    elapsed = time.perf_counter() - started
+    summary["elapsed_s"] = round(elapsed, 2)
+    summary["throughput_qps"] = round(summary["total"] / elapsed, 3) if elapsed else 0.0
+    return summary
+
+
+def run_batch(
+    input_path,
+    output_path,
+    workers=4,
+    max_cache_entries=10000,
+    stream_plans=False,
+    processes=1,
+    task_timeout=300.0,
+):
+    """
+    Plans every query in `input_path` with a bounded worker pool and appends
+    results to `output_path` as they complete.
+
+    At most `workers * 2` queries are in flight at any time, so memory does not
+    grow with the size of the input file. With `processes` > 1 the work is spread
+    over that many forked processes with `workers` threads each (see
+    `run_batch_prefork`); a query running longer than `task_timeout` seconds
+    there is reported as failed.
+    """
+    if processes > 1:
+        return run_batch_prefork(
+            input_path,
+            output_path,
+            processes,
+            workers=workers,
+            max_cache_entries=max_cache_entries,
+            stream_plans=stream_plans,
+            task_timeout=task_timeout,
+        )
+
+    base_tool_instances = _build_tool_instances()
+    cache = SharedRequestCache(max_entries=max_cache_entries)
+    tool_instances = wrap_tool_instances(base_tool_instances, cache)
+    speculator = Speculator(tool_instances, max_workers=workers * 4)
+
+    summary = {
+        "total": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "speculation": {"reused": 0, "missed": 0},
+    }
+    max_in_flight = workers * 2
+    started = time.perf_counter()
+
+    with open(output_path, "w", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=workers
+    ) as pool:
+        in_flight = set()
+
+        def drain(return_when):
+            nonlocal in_flight
+            done, in_flight = wait(in_flight, return_when=return_when)
+            for future in done:
+                _record_result(future.result(), out, summary)
+            out.flush()
+
+        for query_id, user_query in read_queries(input_path):
+            if len(in_flight) >= max_in_flight:
+                drain(FIRST_COMPLETED)
+            in_flight.add(
+                pool.submit(
+                    plan_query,
+                    query_id,
+                    user_query,
+                    base_tool_instances,
+                    tool_instances,
+                    speculator,
+                    stream_plans,
+                )
+            )
+
+        if in_flight:
+            drain(ALL_COMPLETED)
+    speculator.shutdown()
+
+    summary["cache"] = cache.stats
+    return _finish_summary(summary, started)
+
+
+def _init_process(shared, processes, workers, max_cache_entries):
+    # The OpenAI budgets are per process, so each worker gets its share
+    for name, default in (("OPENAI_RPM_LIMIT", "500"), ("OPENAI_TPM_LIMIT", "30000")):
+        os.environ[name] = str(max(1, int(os.getenv(name, default)) // processes))
+    # Caches backed by SQLite and the Weaviate client are opened here, after the
+    # fork: connections must not be shared between processes
+    base_tool_instances = _build_tool_instances(shared["reverse_geocoding"])
+    cache = SharedRequestCache(max_entries=max_cache_entries)
+    tool_instances = wrap_tool_instances(base_tool_instances, cache)
+    return {
+        "base_tool_instances": base_tool_instances,
+        "tool_instances": tool_instances,
+        "cache": cache,
+        "speculator": Speculator(
+            tool_instances, extractor=shared["extractor"], max_workers=workers * 4
+        ),
+    }
+
+
+def _plan_in_process(stream_plans, state, task):
+    query_id, user_query = task
+    return plan_query(
+        query_id,
+        user_query,
+        state["base_tool_instances"],
+        state["tool_instances"],
+        state["speculator"],
+        stream_plans,
+    )
+
+
+def _finish_process(state):
+    state["speculator"].shutdown()
+    return state["cache"].stats
+
+
+def run_batch_prefork(
+    input_path,
+    output_path,
+    processes,
+    workers=4,
+    max_cache_entries=10000,
+    stream_plans=False,
+    task_timeout=300.0,
+):
+    """
+    Like `run_batch`, on `processes` forked worker processes with `workers`
+    threads each, so CPU-bound work (response parsing, formatting, local index
+    lookups) is not serialized on one GIL.
+
+    The reverse geocoding index and the gazetteer are built once here and
+    inherited by the workers; only the index's numpy grids stay shared pages,
+    the place dicts and the gazetteer are copied into each worker as it reads
+    them. Geocodes and routes are shared through the SQLite caches
+    (GEOCODE_CACHE_PATH, ROUTE_CACHE_PATH); identical weather lookups are only
+    deduplicated within a process.
+    """
+    shared = {
+        "reverse_geocoding": ReverseGeocodingTools(),
+        "extractor": LocationExtractor(),
+    }
+    supervisor = PreforkSupervisor(
+        processes,
+        functools.partial(_plan_in_process, stream_plans),
+        initializer=functools.partial(
+            _init_process, shared, processes, workers, max_cache_entries
+        ),
+        finalizer=_finish_process,
+        threads_per_process=workers,
+        task_timeout=task_timeout,
+    )
+
+    summary = {
+        "total": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "speculation": {"reused": 0, "missed": 0},
+    }
+    started = time.perf_counter()
+
+    with open(output_path, "w", encoding="utf-8") as out, supervisor:
+        for (query_id, user_query), result, error in supervisor.map(
+            read_queries(input_path)
+        ):
+            if error is not None:
+                result = {
+                    "id": query_id,
+                    "query": user_query,
+                    "status": "error",
+                    "error": error,
+                }
+            _record_result(result, out, summary)
+            out.flush()
+
+    # Dedup counters are per process; add them up
+    summary["cache"] = {}
+    for stats in supervisor.reports:
+        for namespace, counters in stats.items():
+            total = summary["cache"].setdefault(namespace, {"hits": 0, "misses": 0})
+            total["hits"] += counters["hits"]
+            total["misses"] += counters["misses"]
+    summary["worker_restarts"] = supervisor.restarts
+    return _finish_summary(summary, started)
+
+
+def print_summary(summary):
+    print("=" * 80)
+    print("📊 BATCH SUMMARY")
+    print("=" * 80)
+    print(f"  Queries:    {summary['total']}")
+    print(f"  Succeeded:  {summary['succeeded']}")
+    print(f"  Failed:     {summary['failed']}")
+    print(f"  Elapsed:    {summary['elapsed_s']} s")
+    print(f"  Throughput: {summary['throughput_qps']} queries/s")
+    for namespace, counters in summary["cache"].items():
+        total = counters["hits"] + counters["misses"]
+        print(
+            f"  {namespace}: {counters['misses']} fetched, "
+            f"{counters['hits']}/{total} deduplicated"
+        )
+    speculation = summary["speculation"]
+    print(
+        f"  Speculation: {speculation['reused']} tool calls answered early, "
+        f"{speculation['missed']} called after planning"
+    )
+    if summary.get("worker_restarts"):
+        print(f"  Worker processes restarted: {summary['worker_restarts']}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Plan cycling routes for every query in a JSONL file."
+    )
+    parser.add_argument("input", help="JSONL file with one query per line")
+    parser.add_argument("output", help="JSONL file to write results to")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of concurrent queries (per process with --processes)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of worker processes to prefork (default: run in this process)",
+    )
+    parser.add_argument(
+        "--max-cache-entries",
+        type=int,
+        default=10000,
+        help="Maximum number of shared geocode/weather/route results kept in memory",
+    )
+    parser.add_argument(
+        "--stream-plans",
+        action="store_true",
+        help="Start executing plan steps while the planner is still writing the plan",
+    )
+    parser.add_argument(
+        "--task-timeout",
+        type=float,
+        default=300.0,
+        help="Seconds a query may run in a worker process before it is reported "
+        "as failed (with --processes)",
+    )
+    cli_args = parser.parse_args()
+
+    print("🚴‍♂️ CYCLING ROUTE PLANNER - BATCH MODE")
+    print(f"📂 Input: {cli_args.input}")
+    print(f"📝 Output: {cli_args.output}")
+
+    batch_summary = run_batch(
+        cli_args.input,
+        cli_args.output,
+        workers=cli_args.workers,
+        max_cache_entries=cli_args.max_cache_entries,
+        stream_plans=cli_args.stream_plans,
+        processes=cli_args.processes,
+        task_timeout=cli_args.task_timeout,
+    )
+    print_summary(batch_summary)
+    sys.exit(1 if batch_summary["failed"] else 0)
@@ -0,0 +1,192 @@
+"""
+Throughput vs. worker count for the CPU-bound part of serving a query.
+
+Each simulated request does the work that runs on the GIL once the network
+calls have returned: parsing an OSRM JSON response, compacting and formatting
+the directions, labelling sampled waypoints with the offline reverse geocoder,
+and a POI vector search on the memory-mapped int8 index. Network latency is
+left out on purpose; it overlaps fine with threads and is not what limits a
+single process.
+
+The same requests are run on N threads in one process and on N prefork worker
+processes (PreforkSupervisor). The reverse geocoder and the vector index are
+built once before the fork; the PSS column (Linux only) shows the memory each
+worker adds once shared pages are split between the processes.
+
+Usage:
+    python benchmarks/prefork_scaling_benchmark.py
+    python benchmarks/prefork_scaling_benchmark.py --requests 2000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.custom_tools.reverse_geocoding import ReverseGeocoder
+from app.custom_tools.route_cache import compact_route, decode_polyline, encode_polyline
+from app.custom_tools.routing import RoutingTools
+from app.services.prefork import PreforkSupervisor
+from app.vector_store.quantized_index import QuantizedVectorIndex, normalize_rows
+
+_STEP_TYPES = ["depart", "turn", "new name", "continue", "roundabout", "end of road"]
+_MODIFIERS = ["left", "right", "slight left", "slight right", "straight"]
+
+
+def synthetic_osrm_response(rng, points=600, steps=60):
+    """An OSRM cycling response across Dhaka, as returned by the HTTP API."""
+    start = np.array([23.70, 90.35]) + rng.random(2) * 0.1
+    walk = start + np.cumsum(rng.normal(0, 0.0004, (points, 2)), axis=0)
+    return json.dumps(
+        {
+            "code": "Ok",
+            "routes": [
+                {
+                    "distance": float(rng.uniform(3000, 25000)),
+                    "duration": float(rng.uniform(600, 5000)),
+                    "geometry": encode_polyline(walk.tolist()),
+                    "legs": [
+                        {
+                            "steps": [
+                                {
+                                    "maneuver": {
+                                        "type": _STEP_TYPES[i % len(_STEP_TYPES)],
+                                        "modifier": _MODIFIERS[i % len(_MODIFIERS)],
+                                        "location": walk[i * points // steps][
+                                            ::-1
+                                        ].tolist(),
+                                    },
+                                    "name": f"Road {i}",
+                                    "distance": float(rng.uniform(50, 900)),
+                                    "duration": float(rng.uniform(10, 200)),
+                                    "geometry": encode_polyline(
+                                        walk[i * points // steps :][:10].tolist()
+                                    ),
+                                }
+                                for i in range(steps)
+                            ]
+                        }
+                    ],
+                }
+            ],
+            "waypoints": [
+                {"location": walk[0][::-1].tolist()},
+                {"location": walk[-1][::-1].tolist()},
+            ],
+        }
+    )
+
+
+def handle_request(shared, request):
+    """CPU side of one query; returns a small digest of the work done."""
+    payload, query_vector = request
+    data = json.loads(payload)
+    route = compact_route(data["routes"][0], data["waypoints"])
+    directions = RoutingTools.format_route(route)
+    waypoints = np.asarray(decode_polyline(route["geometry"]))[::20]
+    labels = shared["geocoder"].reverse_batch(waypoints[:, 0], waypoints[:, 1])
+    pois = shared["index"].search(query_vector, k=5)
+    return len(directions), len({label["label"] for label in labels}), pois[0][0]
+
+
+def memory_report(_state):
+    """Resident and proportional set size of this worker in MB (Linux only)."""
+    report = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                name, value = line.split(":", 1)
+                if name in ("Rss", "Pss"):
+                    report[name] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return report
+
+
+def build_shared(index_directory, poi_count, dimensions):
+    geocoder = ReverseGeocoder.from_files()
+    rng = np.random.default_rng(0)
+    vectors = normalize_rows(rng.standard_normal((poi_count, dimensions)))
+    QuantizedVectorIndex.build(vectors, list(range(poi_count))).save(index_directory)
+    return {
+        "geocoder": geocoder,
+        "index": QuantizedVectorIndex.load(index_directory, mmap_codes=True),
+    }
+
+
+def run_threads(shared, requests, workers):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda request: handle_request(shared, request), requests))
+    return len(requests) / (time.perf_counter() - started)
+
+
+def run_processes(shared, requests, workers):
+    supervisor = PreforkSupervisor(
+        workers,
+        lambda _state, index: handle_request(shared, requests[index]),
+        finalizer=memory_report,
+        queued_per_thread=8,
+    )
+    supervisor.start()
+    started = time.perf_counter()
+    # Only indices cross the pipe; the requests were inherited with the fork
+    results = list(supervisor.map(range(len(requests))))
+    throughput = len(requests) / (time.perf_counter() - started)
+    supervisor.shutdown()
+    failures = sum(1 for _, _, error in results if error is not None)
+    if failures:
+        print(f"  {failures} requests failed on {workers} workers")
+    pss = [report["Pss"] for report in supervisor.reports if "Pss" in report]
+    return throughput, (sum(pss) / len(pss) if pss else None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--pois", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=512)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    cli_args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as index_directory:
+        shared = build_shared(index_directory, cli_args.pois, cli_args.dimensions)
+        rng = np.random.default_rng(1)
+        requests = [
+            (
+                synthetic_osrm_response(rng),
+                rng.standard_normal(cli_args.dimensions).astype(np.float32),
+            )
+            for _ in range(cli_args.requests)
+        ]
+
+        print(
+            f"CPUs: {os.cpu_count()}, requests: {len(requests)}, "
+            f"POI index: {cli_args.pois} x {cli_args.dimensions}d int8"
+        )
+        print(
+            f"{'workers':>7}{'threads req/s':>15}{'processes req/s':>17}"
+            f"{'speedup':>9}{'PSS/worker MB':>15}"
+        )
+        print("-" * 63)
+        baseline = None
+        for workers in cli_args.workers:
+            thread_throughput = run_threads(shared, requests, workers)
+            process_throughput, pss = run_processes(shared, requests, workers)
+            baseline = baseline or process_throughput
+            print(
+                f"{workers:>7}{thread_throughput:>15.1f}{process_throughput:>17.1f}"
+                f"{process_throughput / baseline:>8.2f}x"
+                f"{pss if pss is not None else float('nan'):>15.1f}"
+            )
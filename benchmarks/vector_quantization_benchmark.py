@@ -0,0 +1,148 @@
+"""
+Recall vs. memory benchmark for POI vector storage options.
+
+Compares exact float32 search at several output dimensions against int8 and
+binary (BQ-style) representations, with and without full-precision rescoring.
+Recall@k is measured against exact search on the full 1536-dimension vectors.
+"RAM" is what stays resident; "total" adds the float32 vectors that rescoring
+reads from a memory-mapped file.
+
+Usage:
+    python benchmarks/vector_quantization_benchmark.py
+    python benchmarks/vector_quantization_benchmark.py --vectors embeddings.npy
+
+Without --vectors, synthetic clustered vectors are used whose variance decays
+across dimensions like text-embedding-3 (trained so that prefixes remain useful).
+Synthetic recall only approximates real embeddings and may differ from it; pass
+real 1536-d embeddings (e.g. exported POI vectors) for production numbers.
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.vector_store.quantized_index import QuantizedVectorIndex, normalize_rows
+
+
+def synthetic_vectors(count, dimensions=1536, clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    decay = 1.0 / np.sqrt(np.arange(1, dimensions + 1))
+    centers = rng.standard_normal((clusters, dimensions)) * decay
+    assignment = rng.integers(0, clusters, count)
+    noise = rng.standard_normal((count, dimensions)) * decay * 0.6
+    return normalize_rows(centers[assignment] + noise)
+
+
+def shorten(vectors, dimensions):
+    # Equivalent to requesting `dimensions` from the API: truncate and renormalize
+    return normalize_rows(vectors[:, :dimensions])
+
+
+def recall(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def exact_top_k(vectors, queries, k):
+    scores = queries @ vectors.T
+    return [list(np.argsort(-row)[:k]) for row in scores]
+
+
+def binary_top_k(vectors, queries, k, oversample):
+    # Sign bits, scored by agreement (what BQ does with Hamming distance)
+    bits = np.where(vectors > 0, 1.0, -1.0).astype(np.float32)
+    results = []
+    for query in queries:
+        scores = bits @ np.where(query > 0, 1.0, -1.0)
+        candidates = np.argpartition(-scores, k * oversample)[: k * oversample]
+        if oversample > 1:
+            rescored = vectors[candidates] @ query
+            results.append(list(candidates[np.argsort(-rescored)[:k]]))
+        else:
+            results.append(list(candidates[np.argsort(-scores[candidates])[:k]]))
+    return results
+
+
+def run(vectors, query_count=200, k=10):
+    rng = np.random.default_rng(1)
+    query_rows = rng.choice(len(vectors), query_count, replace=False)
+    noise = rng.standard_normal((query_count, vectors.shape[1])) * 0.01
+    queries = normalize_rows(vectors[query_rows] + noise)
+    truth = exact_top_k(vectors, queries, k)
+    ids = list(range(len(vectors)))
+
+    rows = []
+    for dimensions in (1536, 1024, 512, 256):
+        if dimensions > vectors.shape[1]:
+            continue
+        data, q = shorten(vectors, dimensions), shorten(queries, dimensions)
+
+        found = exact_top_k(data, q, k)
+        float_bytes = dimensions * 4
+        rows.append(
+            (
+                f"float32 {dimensions}d",
+                float_bytes,
+                float_bytes,
+                recall(found, truth),
+            )
+        )
+
+        # Rescoring needs the float32 vectors too; they are memory-mapped, so
+        # they count towards the total footprint but not the resident set
+        index = QuantizedVectorIndex.build(data, ids)
+        for oversample, label in ((1, "int8"), (4, "int8 + rescore x4")):
+            found = [
+                [i for i, _ in result]
+                for result in index.search_batch(q, k, oversample)
+            ]
+            ram_bytes = index.memory_bytes() / len(index)
+            rows.append(
+                (
+                    f"{label} {dimensions}d",
+                    ram_bytes,
+                    ram_bytes + (float_bytes if oversample > 1 else 0),
+                    recall(found, truth),
+                )
+            )
+
+        for oversample, label in ((1, "binary"), (4, "binary + rescore x4")):
+            found = binary_top_k(data, q, k, oversample)
+            rows.append(
+                (
+                    f"{label} {dimensions}d",
+                    dimensions / 8,
+                    dimensions / 8 + (float_bytes if oversample > 1 else 0),
+                    recall(found, truth),
+                )
+            )
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vectors", help=".npy file of 1536-d embeddings")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=10)
+    cli_args = parser.parse_args()
+
+    if cli_args.vectors:
+        vectors = normalize_rows(np.load(cli_args.vectors))
+        source = cli_args.vectors
+    else:
+        vectors = synthetic_vectors(cli_args.count)
+        source = "synthetic"
+
+    print(f"Vectors: {len(vectors)} x {vectors.shape[1]} ({source})")
+    if source == "synthetic":
+        print("Synthetic vectors: recall on real embeddings may differ")
+    print(
+        f"{'configuration':<28}{'RAM B/POI':>10}{'total B/POI':>12}"
+        f"{'recall@' + str(cli_args.k):>11}"
+    )
+    print("-" * 61)
+    for label, ram_bytes, total_bytes, recall_at_k in run(vectors, k=cli_args.k):
+        print(f"{label:<28}{ram_bytes:>10.0f}{total_bytes:>12.0f}{recall_at_k:>11.3f}")
@@ -1,15 +1,20 @@
 import os
-import re
 import warnings
 from dotenv import load_dotenv
-from agno.models.openai import OpenAIChat
 from agno.tools.tavily import TavilyTools
 from app.custom_tools.weather import WeatherTools
 from app.custom_tools.geocoding import GeocodingTools
+from app.custom_tools.geocode_cache import GeocodeCache
+from app.custom_tools.poi_search import build_poi_search_tools
 from app.custom_tools.routing import RoutingTools
+from app.custom_tools.reverse_geocoding import ReverseGeocodingTools
+from app.custom_tools.route_cache import RouteCache
 
 from app.agents.planner_agent import PlannerAgent
 from app.agents.executive_agent import ExecutiveAgent
+from app.agents.rate_limited_model import RateLimitedOpenAIChat
+from app.services.plan_executor import execute_plan_stream
+from app.services.speculation import Speculator
 
 load_dotenv()
 warnings.filterwarnings(
@@ -37,8 +42,10 @@ if not open_weather_api_key:
 
 tavily_tools = TavilyTools(api_key=tavily_api_key)
 weather_tools = WeatherTools(api_key=open_weather_api_key)
-routing_tools = RoutingTools()
-geocoding_tools = GeocodingTools()
+routing_tools = RoutingTools(route_cache=RouteCache())
+geocoding_tools = GeocodingTools(geocode_cache=GeocodeCache())
+reverse_geocoding_tools = ReverseGeocodingTools()
+poi_search_tools = build_poi_search_tools()
 
 
 def format_terminal_output(response):
@@ -90,12 +97,15 @@ if __name__ == "__main__":
             "geocoding": geocoding_tools,  # This matches "geocoding.geocode_location"
             "weather_tools": weather_tools,  # This matches "weather_tools.get_current_weather"
             "routing": routing_tools,  # This matches "routing.get_route"
+            "reverse_geocoding": reverse_geocoding_tools,  # "reverse_geocoding.reverse_geocode"
         }
+        if poi_search_tools is not None:
+            tool_instances["poi_search"] = poi_search_tools  # "poi_search.search_pois"
 
         user_query = "Give me a route plan from khalishpur to dhanmondi and weather condition on along the route"
-        planner_model = OpenAIChat(id="gpt-4o", api_key=openai_api_key)
+        planner_model = RateLimitedOpenAIChat(id="gpt-4o", api_key=openai_api_key)
         planner_agent = PlannerAgent(
-            model=planner_model, tools=[geocoding_tools, weather_tools, routing_tools]
+            model=planner_model, tools=list(tool_instances.values())
         )
 
         print("🚴‍♂️ CYCLING ROUTE PLANNER")
@@ -103,99 +113,49 @@ if __name__ == "__main__":
         print(f"📍 Query: {user_query}")
         print("⏳ Generating plan...")
 
-        plan_steps = planner_agent.run_planning(user_query)
+        executive_model = RateLimitedOpenAIChat(id="gpt-4o", api_key=openai_api_key)
+        executive_agent = ExecutiveAgent(
+            model=executive_model, tools=list(tool_instances.values())
+        )
+
+        print("\n🔄 EXECUTING PLAN (steps start as soon as they are planned)...")
+        print("-" * 80)
+
+        # Likely geocodes, weather and route are fetched while the planner runs
+        speculator = Speculator(tool_instances)
+        speculation = speculator.start(user_query)
+        plan_steps = []
+
+        def record(steps):
+            for step in steps:
+                plan_steps.append(step)
+                yield step
+
+        try:
+            execution_context, step_errors = execute_plan_stream(
+                record(planner_agent.stream_planning(user_query)),
+                speculation.wrap(tool_instances),
+            )
+        finally:
+            # Background fetches must not outlive a failed plan either
+            speculation.discard()
+            speculator.shutdown()
 
         if not plan_steps:
             print("❌ Failed to generate a valid plan. Exiting.")
             exit()
 
-        print(f"✅ Plan generated with {len(plan_steps)} steps")
+        print(f"✅ Plan executed with {len(plan_steps)} steps")
+        if step_errors:
+            # The response is still built from the steps that succeeded
+            print(f"⚠️ {len(step_errors)} of {len(plan_steps)} steps failed:")
+            for error in step_errors:
+                print(f"   - {error}")
 
-        executive_model = OpenAIChat(id="gpt-4o", api_key=openai_api_key)
-        executive_agent = ExecutiveAgent(
-            model=executive_model, tools=list(tool_instances.values())
+        print(
+            f"⚡ {speculation.stats['reused']} tool calls answered by speculative fetches"
         )
 
-        execution_context = {}
-        print("\n🔄 EXECUTING PLAN...")
-        print("-" * 80)
-
-        for i, step in enumerate(plan_steps, 1):
-            step_id = step.get("step_id", "N/A")
-            goal = step.get("goal", "No Goal Defined")
-            tool_call = step.get("tool")
-            args = step.get("args")
-            output_key = step.get("output_key")
-
-            print(f"📋 Step {i}/{len(plan_steps)}: {goal}")
-
-            if tool_call:
-                try:
-                    # Parse tool_call (e.g., "geocoding.geocode_location")
-                    tool_instance_name, method_name = tool_call.split(".")
-                    tool_instance = tool_instances.get(tool_instance_name)
-
-                    if not tool_instance:
-                        print(f"   ❌ Tool instance '{tool_instance_name}' not found")
-                        continue
-
-                    method = getattr(tool_instance, method_name)
-
-                    # Resolve arguments with placeholders from execution_context
-                    resolved_args = {}
-                    if args:
-                        for arg_key, arg_value in args.items():
-                            if isinstance(arg_value, str) and re.match(
-                                r"\{.+\..+\}", arg_value
-                            ):
-                                # This is a placeholder, e.g., "{origin_geocode.latitude}"
-                                parts = arg_value.strip("{}").split(".")
-                                if len(parts) == 2:
-                                    context_key, attribute = parts
-                                    if context_key in execution_context and isinstance(
-                                        execution_context[context_key], dict
-                                    ):
-                                        resolved_args[arg_key] = execution_context[
-                                            context_key
-                                        ].get(attribute)
-                                    else:
-                                        print(
-                                            f"   ⚠️  Could not resolve placeholder '{arg_value}'"
-                                        )
-                                        resolved_args[arg_key] = None
-                                else:
-                                    print(
-                                        f"   ⚠️  Invalid placeholder format '{arg_value}'"
-                                    )
-                                    resolved_args[arg_key] = arg_value
-                            else:
-                                resolved_args[arg_key] = arg_value
-
-                    # Filter out args that are None after resolution
-                    final_tool_args = {
-                        k: v for k, v in resolved_args.items() if v is not None
-                    }
-
-                    print(f"   🔧 Calling: {tool_call}")
-                    step_result = method(**final_tool_args)
-
-                    if output_key:
-                        execution_context[output_key] = step_result
-                        print("   ✅ Completed and stored in context")
-                    else:
-                        print("   ✅ Completed")
-
-                except AttributeError:
-                    print(
-                        f"   ❌ Method '{method_name}' not found in tool '{tool_instance_name}'"  # type: ignore
-                    )
-                except Exception as e:
-                    print(f"   ❌ Error: {e}")
-            else:
-                print("   📝 Synthesis step - preparing for final response")
-                if "input_keys" in step and step["input_keys"] and output_key:
-                    execution_context[output_key] = "Ready for synthesis."
-
         print("\n🎯 GENERATING FINAL RESPONSE...")
         print("-" * 80)
 
@@ -1,8 +1,14 @@
-import json
 import os
 from dotenv import load_dotenv
 from app.vector_store.weaviate_client import WeaviateClient
-from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service import EmbeddingService, report_failed_objects
+from app.services.ingestion_pipeline import POIIngestionPipeline
+from app.services.poi_sources import iter_json_array, iter_poi_text
+
+POI_SOURCES = [
+    ("data/points_of_interest_bangladesh.json", iter_json_array),
+    ("data/point_of_interest.txt", iter_poi_text),
+]
 
 
 def setup_vector_store():
@@ -24,27 +30,37 @@ def setup_vector_store():
             print("Failed to create collection. Exiting...")
             return 0
 
-        # Load POI data
+        # Stream POI data from every available source
         print("Loading POI data...")
-        poi_data_path = "data/points_of_interest_bangladesh.json"
-
-        if not os.path.exists(poi_data_path):
-            print(f"POI data file not found: {poi_data_path}")
-            print("Please ensure the file exists and try again.")
-            return 0
-
-        try:
-            with open(poi_data_path, "r", encoding="utf-8") as f:
-                poi_data = json.load(f)
-        except Exception as e:
-            print(f"Error loading POI data: {e}")
+        sources = []
+        for poi_data_path, parser in POI_SOURCES:
+            if os.path.exists(poi_data_path):
+                sources.append((os.path.basename(poi_data_path), parser(poi_data_path)))
+            else:
+                print(f"POI data file not found, skipping: {poi_data_path}")
+
+        if not sources:
+            print("No POI data files found. Please ensure they exist and try again.")
             return 0
 
-        print(f"Found {len(poi_data)} POIs to process")
-
         # Store POI data with embeddings
         print("Generating embeddings and storing in Weaviate...")
-        stored_count = embedding_service.store_poi_data(weaviate_client, poi_data)
+        with weaviate_client.batch_writer("BangladeshPOI") as writer:
+            pipeline = POIIngestionPipeline(
+                embedding_service, write_batch=writer.add_objects
+            )
+            summary = pipeline.run(sources)
+        stored_count = summary["stored"] - len(writer.failed_objects)
+        report_failed_objects(writer.failed_objects)
+
+        print(f"\nIngestion finished in {summary['elapsed_s']}s")
+        for stage in summary["stages"]:
+            print(
+                f"  {stage['stage']:<10} {stage['items']:>7} items "
+                f"({stage['items_per_s']}/s, busy {stage['busy_s']}s, "
+                f"dropped {stage['dropped']}, replaced {stage['replaced']}, "
+                f"failed {stage['failed']})"
+            )
 
         # Verify storage
         total_objects = weaviate_client.get_object_count()
@@ -54,6 +70,11 @@ def setup_vector_store():
 
         weaviate_client.list_collections()
 
+        # Int8 snapshot of the vectors for in-process search
+        weaviate_client.export_local_index(
+            os.getenv("LOCAL_VECTOR_INDEX_PATH", ".cache/poi_index")
+        )
+
         return stored_count
 
 
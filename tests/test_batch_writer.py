@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.vector_store.weaviate_client import BatchWriter, WeaviateClient
+
+
+class FakeBatch:
+    def __init__(self, events):
+        self.events = events
+
+    def add_object(self, properties, vector, uuid=None):
+        self.events.append(("add", uuid))
+
+    def flush(self):
+        self.events.append(("flush", None))
+
+
+class FakeBatchContext:
+    def __init__(self, events):
+        self.events = events
+
+    def __enter__(self):
+        return FakeBatch(self.events)
+
+    def __exit__(self, *exc_info):
+        self.events.append(("close", None))
+
+
+class FakeCollection:
+    name = "BangladeshPOI"
+
+    def __init__(self, failed_objects=(), stored_vector=None):
+        self.events = []
+        self.stored_vector = stored_vector
+        self.batch = SimpleNamespace(
+            fixed_size=lambda **options: FakeBatchContext(self.events),
+            failed_objects=list(failed_objects),
+        )
+        self.query = SimpleNamespace(fetch_objects=self._fetch_objects)
+
+    def _fetch_objects(self, limit, include_vector):
+        if self.stored_vector is None:
+            return SimpleNamespace(objects=[])
+        return SimpleNamespace(
+            objects=[SimpleNamespace(vector={"default": self.stored_vector})]
+        )
+
+
+def item(uuid, dimensions=3, name="Lalbagh Fort"):
+    return {
+        "properties": {"poi_name": name},
+        "vector": [0.1] * dimensions,
+        "uuid": uuid,
+    }
+
+
+def test_requeued_uuid_waits_for_earlier_batches():
+    collection = FakeCollection()
+
+    with BatchWriter(collection) as writer:
+        writer.add_objects([item("a"), item("b"), item(None), item("a"), item(None)])
+
+    assert collection.events == [
+        ("add", "a"),
+        ("add", "b"),
+        ("add", None),
+        ("flush", None),
+        ("add", "a"),
+        ("add", None),
+        ("close", None),
+    ]
+    assert writer.added == 5
+
+
+def test_vector_size_is_taken_from_the_first_object():
+    collection = FakeCollection()
+
+    with BatchWriter(collection) as writer:
+        writer.add_objects([item("a", dimensions=4)])
+        with pytest.raises(ValueError, match="holds 4-d vectors"):
+            writer.add_objects([item("b", dimensions=3)])
+
+    assert [uuid for kind, uuid in collection.events if kind == "add"] == ["a"]
+
+
+def test_vectors_must_match_the_stored_collection():
+    client = WeaviateClient.__new__(WeaviateClient)
+    collection = FakeCollection(stored_vector=[0.0] * 512)
+    client.client = SimpleNamespace(
+        collections=SimpleNamespace(get=lambda name: collection)
+    )
+
+    writer = client.batch_writer(concurrent_requests=1)
+
+    assert writer.dimensions == 512
+    with writer, pytest.raises(ValueError, match="EMBEDDING_DIMENSIONS"):
+        writer.add_objects([item("a", dimensions=1536)])
+    collection.stored_vector = None
+    assert client.get_vector_dimensions() is None
+
+
+def test_rejected_objects_are_summarized_on_close():
+    rejected = SimpleNamespace(
+        object_=SimpleNamespace(uuid="a", properties={"poi_name": "Star Mosque"}),
+        message="vector lengths don't match",
+    )
+    collection = FakeCollection(failed_objects=[rejected])
+
+    with BatchWriter(collection) as writer:
+        writer.add_objects([item("a")])
+
+    assert writer.failed_objects == [
+        {
+            "uuid": "a",
+            "poi_name": "Star Mosque",
+            "message": "vector lengths don't match",
+        }
+    ]
@@ -0,0 +1,168 @@
+import pytest
+
+from app.custom_tools import geocoding, routing
+from app.custom_tools.geocode_cache import GeocodeCache
+from app.custom_tools.route_cache import RouteCache
+from app.services.cache_warmup import CacheWarmer, qualified_poi_names
+from app.services.speculation import LocationExtractor
+
+PLACES = {
+    "Dhanmondi, Dhaka": (23.7465, 90.3760),
+    "Old Dhaka, Dhaka": (23.7104, 90.4074),
+    "Gulshan, Dhaka": (23.7925, 90.4078),
+}
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeServices:
+    """Stands in for Nominatim and OSRM; can be told to fail after some calls."""
+
+    def __init__(self, interrupt_after=None):
+        self.calls = []
+        self.interrupt_after = interrupt_after
+
+    def get(self, url, params=None, headers=None):
+        if self.interrupt_after is not None and len(self.calls) >= self.interrupt_after:
+            raise KeyboardInterrupt
+        self.calls.append(params["q"] if params else url)
+        if params:
+            point = PLACES.get(params["q"])
+            if point is None:
+                return FakeResponse([])
+            return FakeResponse(
+                [{"lat": point[0], "lon": point[1], "display_name": params["q"]}]
+            )
+        coordinates = url.split("cycling/")[1].split("?")[0]
+        (lon1, lat1), (lon2, lat2) = (
+            map(float, pair.split(",")) for pair in coordinates.split(";")
+        )
+        return FakeResponse(
+            {
+                "code": "Ok",
+                "routes": [
+                    {
+                        "distance": 5000.0,
+                        "duration": 1200.0,
+                        "geometry": "",
+                        "legs": [{"steps": []}],
+                    }
+                ],
+                "waypoints": [{"location": [lon1, lat1]}, {"location": [lon2, lat2]}],
+            }
+        )
+
+
+@pytest.fixture
+def make_warmer(tmp_path, monkeypatch):
+    caches = []
+
+    def make(services, report_only=False):
+        monkeypatch.setattr(geocoding.requests, "get", services.get)
+        monkeypatch.setattr(routing.requests, "get", services.get)
+        geocode_cache = GeocodeCache(path=str(tmp_path / "geocodes.sqlite3"))
+        route_cache = RouteCache(path=str(tmp_path / "routes.sqlite3"))
+        caches.extend([geocode_cache, route_cache])
+        return CacheWarmer(
+            geocoding.GeocodingTools(geocode_cache=geocode_cache),
+            routing.RoutingTools(route_cache=route_cache),
+            geocode_interval_s=0,
+            route_interval_s=0,
+            report_only=report_only,
+        )
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def warm(warmer, names):
+    geocodes = warmer.warm_geocodes("geocodes", names)
+    pairs = [(a, b) for a in names for b in names if a != b]
+    warmer.warm_routes("routes", pairs, geocodes)
+    return geocodes
+
+
+def test_second_run_skips_everything_cached(make_warmer):
+    names = list(PLACES) + ["Atlantis, Dhaka"]
+    first = FakeServices()
+    warm(make_warmer(first), names)
+
+    second = FakeServices()
+    warmer = make_warmer(second)
+    geocodes = warm(warmer, names)
+
+    # Six routes between the three places found, and one failed geocode
+    assert len(first.calls) == 4 + 6
+    assert second.calls == []
+    assert set(geocodes) == set(PLACES)
+    geocode_coverage, route_coverage = warmer.coverage
+    assert geocode_coverage["cached"] == 3
+    # Names not found are not retried until their entry expires
+    assert geocode_coverage["failed"] == 1
+    assert route_coverage["cached"] == 6
+
+
+def test_interrupted_run_continues_where_it_stopped(make_warmer):
+    names = list(PLACES)
+    with pytest.raises(KeyboardInterrupt):
+        warm(make_warmer(FakeServices(interrupt_after=2)), names)
+
+    resumed = FakeServices()
+    warm(make_warmer(resumed), names)
+
+    assert resumed.calls[0] == "Gulshan, Dhaka"
+    assert len(resumed.calls) == 1 + 6
+
+
+def test_report_only_never_calls_upstream(make_warmer):
+    services = FakeServices()
+    warmer = make_warmer(services, report_only=True)
+
+    warm(warmer, list(PLACES))
+
+    assert services.calls == []
+    assert warmer.coverage[0]["cached"] == warmer.coverage[0]["fetched"] == 0
+
+
+def test_pois_are_qualified_with_their_district():
+    extractor = LocationExtractor(
+        places=[
+            {
+                "name": "Dhaka",
+                "kind": "district",
+                "latitude": 23.81,
+                "longitude": 90.41,
+            },
+            {
+                "name": "Bogura",
+                "kind": "district",
+                "latitude": 24.85,
+                "longitude": 89.37,
+            },
+        ]
+    )
+    pois = [
+        {"name": "Ahsan Manzil", "latitude": 23.7086, "longitude": 90.4060},
+        {"name": "Mahasthangarh", "latitude": 24.9603, "longitude": 89.3427},
+        {"name": "Star Mosque, Dhaka", "latitude": 23.7144, "longitude": 90.4022},
+        {"name": "Somewhere without coordinates"},
+        "Lalbagh Fort, Dhaka",
+    ]
+
+    assert qualified_poi_names(pois, extractor) == [
+        "Ahsan Manzil, Dhaka",
+        "Mahasthangarh, Bogura",
+        "Star Mosque, Dhaka",
+        "Somewhere without coordinates",
+        "Lalbagh Fort, Dhaka",
+    ]
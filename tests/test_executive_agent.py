@@ -0,0 +1,50 @@
+from app.agents.executive_agent import build_synthesis_prompt
+
+
+def test_known_outputs_are_laid_out_under_their_headings():
+    prompt = build_synthesis_prompt(
+        {
+            "weather_report": "Weather in Dhaka: 31°C, haze",
+            "cycling_route_details": "Distance: 6.2 km",
+            "origin_geocode": {"latitude": 23.7465, "longitude": 90.376},
+        }
+    )
+
+    assert "--- Weather Report ---\nWeather in Dhaka: 31°C, haze" in prompt
+    assert "--- Route Details ---\nDistance: 6.2 km" in prompt
+    assert "Origin Geocode: {'latitude': 23.7465, 'longitude': 90.376}" in prompt
+    assert "Destination Geocode: Not available." in prompt
+
+
+def test_poi_search_results_reach_the_prompt():
+    prompt = build_synthesis_prompt(
+        {
+            "cycling_route_details": "Distance: 6.2 km",
+            "heritage_pois": [
+                {
+                    "poi_name": "Ahsan Manzil",
+                    "location": "Kumartoli, Old Dhaka",
+                    "category": "Palace",
+                    "description": "Pink palace of the Nawabs of Dhaka",
+                    "coordinates": "23.7086, 90.4060",
+                }
+            ],
+            "final_response": "Ready for synthesis.",
+        }
+    )
+
+    assert "--- heritage_pois ---" in prompt
+    assert "Ahsan Manzil" in prompt
+    assert "Pink palace of the Nawabs of Dhaka" in prompt
+    assert "Ready for synthesis." not in prompt
+
+
+def test_reverse_geocoded_labels_reach_the_prompt():
+    prompt = build_synthesis_prompt(
+        {
+            "origin_geocode": {"latitude": 23.7465, "longitude": 90.376},
+            "origin_label": "Dhanmondi, Dhaka",
+        }
+    )
+
+    assert "--- origin_label ---\nDhanmondi, Dhaka" in prompt
@@ -0,0 +1,57 @@
+import pytest
+
+from app.custom_tools.geocode_cache import GeocodeCache
+from app.services.place_names import name_parts, place_key
+
+DHAKA = {"latitude": 23.8103, "longitude": 90.4125, "display_name": "Dhaka"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    geocode_cache = GeocodeCache(path=str(tmp_path / "geocodes.sqlite3"))
+    yield geocode_cache
+    geocode_cache.close()
+
+
+def test_admin_kinds_do_not_collide(cache):
+    names = ["Dhaka Division", "Dhaka District", "Dhaka City", "Dhaka"]
+    for i, name in enumerate(names):
+        cache.store(name, "bd", dict(DHAKA, display_name=name, latitude=23.0 + i))
+
+    for i, name in enumerate(names):
+        assert cache.get(name, "bd")["display_name"] == name
+
+    assert len({place_key(name) for name in names}) == len(names)
+
+
+def test_country_case_and_punctuation_are_ignored(cache):
+    cache.store("Khalishpur, Khulna", "bd", DHAKA)
+
+    assert cache.get("khalishpur,  Khulna, Bangladesh.", "BD") == DHAKA
+    assert cache.get("Khalishpur, Khulna, BD", "bd") == DHAKA
+    assert cache.get("Khalishpur", "bd") is None
+
+
+def test_loose_name_parts_still_drop_admin_words():
+    assert name_parts("Khulna Division, Bangladesh") == ["khulna"]
+    assert place_key("Khulna Division, Bangladesh") == "khulna division"
+    assert place_key("Bangladesh") == "bangladesh"
+
+
+def test_not_found_entries_expire_sooner(tmp_path):
+    path = str(tmp_path / "geocodes.sqlite3")
+    writer = GeocodeCache(path=path)
+    writer.store("Atlantis", "bd", {})
+    writer.store("Dhaka", "bd", DHAKA)
+    writer.close()
+
+    fresh = GeocodeCache(path=path)
+    assert fresh.get("Atlantis", "bd") == {}
+    assert fresh.stats["not_found"] == 1
+    fresh.close()
+
+    # Older than the not-found limit, well within the limit for found places
+    expired = GeocodeCache(path=path, not_found_max_age_days=-1)
+    assert expired.get("Atlantis", "bd") is None
+    assert expired.get("Dhaka", "bd") == DHAKA
+    expired.close()
@@ -0,0 +1,112 @@
+import threading
+
+from app.services.embedding_service import EmbeddingService
+from app.services.ingestion_pipeline import POIDeduplicator, POIIngestionPipeline
+
+
+class FakeEmbeddingService:
+    """Builds content and properties like EmbeddingService; vectors are fake."""
+
+    prepare_poi_content = EmbeddingService.prepare_poi_content
+    build_poi_properties = EmbeddingService.build_poi_properties
+
+    def get_embeddings(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FailingPropertiesService(FakeEmbeddingService):
+    def build_poi_properties(self, poi, content):
+        if poi["name"] == "Broken":
+            raise KeyError("content")
+        return super().build_poi_properties(poi, content)
+
+
+def lalbagh(description):
+    return {
+        "name": "Lalbagh Fort",
+        "description": description,
+        "latitude": 23.7186,
+        "longitude": 90.3886,
+    }
+
+
+def run_pipeline(service, records, **options):
+    written = []
+    pipeline = POIIngestionPipeline(
+        service, write_batch=lambda items: written.extend(items), **options
+    )
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(pipeline.run([("json", iter(records))])),
+        daemon=True,
+    )
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "pipeline did not finish"
+    return result, written
+
+
+def test_duplicates_in_one_chunk_are_stored_once():
+    records = [
+        lalbagh("Mughal fort"),
+        {"name": "Ahsan Manzil", "latitude": 23.7086, "longitude": 90.4060},
+        lalbagh("Mughal fort built in 1678 by Prince Muhammad Azam"),
+        lalbagh("Fort"),
+    ]
+
+    summary, written = run_pipeline(FakeEmbeddingService(), records, embed_workers=1)
+
+    assert summary["stored"] == 2
+    assert len(written) == len({item["uuid"] for item in written}) == 2
+    richest = [
+        item for item in written if item["properties"]["poi_name"] == "Lalbagh Fort"
+    ]
+    assert "1678" in richest[0]["properties"]["description"]
+    write_stats = summary["stages"][-1]
+    assert write_stats["replaced"] == 0
+
+
+def test_duplicate_of_a_flushed_object_counts_as_replaced():
+    records = [
+        lalbagh("Mughal fort"),
+        {"name": "Ahsan Manzil", "latitude": 23.7086, "longitude": 90.4060},
+        lalbagh("Mughal fort built in 1678 by Prince Muhammad Azam"),
+    ]
+
+    summary, written = run_pipeline(
+        FakeEmbeddingService(),
+        records,
+        embed_workers=1,
+        embed_batch_size=1,
+        write_batch_size=1,
+    )
+
+    assert summary["stored"] == 2
+    assert len(written) == 3
+    assert summary["stages"][-1]["replaced"] == 1
+
+
+def test_embed_error_does_not_stall_the_writer():
+    records = [
+        {"name": "Broken", "latitude": 23.0, "longitude": 90.0},
+        {"name": "Ahsan Manzil", "latitude": 23.7086, "longitude": 90.4060},
+    ]
+
+    summary, written = run_pipeline(
+        FailingPropertiesService(), records, embed_workers=2, embed_batch_size=1
+    )
+
+    assert [item["properties"]["poi_name"] for item in written] == ["Ahsan Manzil"]
+    assert summary["stored"] == 1
+    assert summary["stages"][2]["failed"] == 1
+
+
+def test_name_only_duplicates_need_both_sides_without_coordinates():
+    deduplicator = POIDeduplicator()
+
+    first = deduplicator.check({"name": "Star Mosque"}, 10)
+    assert deduplicator.check({"name": "Star Mosque"}, 20) == first
+    located = deduplicator.check(
+        {"name": "Star Mosque", "latitude": 23.71, "longitude": 90.40}, 30
+    )
+    assert located not in (None, first)
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.llm_rate_limiter import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    LLMRateLimiter,
+    get_retry_after,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+def rate_limited():
+    return FakeAPIError(429, {"retry-after-ms": "1"})
+
+
+def test_retry_after_follows_the_exception_chain():
+    try:
+        try:
+            raise FakeAPIError(429, {"retry-after": "2"})
+        except FakeAPIError as e:
+            raise RuntimeError("wrapped by the model layer") from e
+    except RuntimeError as wrapped:
+        assert get_retry_after(wrapped) == 2.0
+
+    assert get_retry_after(FakeAPIError(429)) == 0.0
+    assert get_retry_after(FakeAPIError(500)) is None
+    assert get_retry_after(ValueError("not an API error")) is None
+
+
+def test_usage_is_reconciled_after_a_call():
+    limiter = LLMRateLimiter(requests_per_minute=1000, tokens_per_minute=1000)
+
+    limiter.call(lambda: "ok", estimated_tokens=300, usage_of=lambda result: 100)
+
+    assert limiter._token_allowance == pytest.approx(900, abs=5)
+
+
+def test_failed_call_refunds_its_tokens():
+    limiter = LLMRateLimiter(requests_per_minute=1000, tokens_per_minute=1000)
+
+    def failing():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call(failing, estimated_tokens=400)
+
+    assert limiter._token_allowance == pytest.approx(1000, abs=5)
+
+
+def test_rate_limited_call_is_retried_without_double_debit():
+    limiter = LLMRateLimiter(requests_per_minute=1000, tokens_per_minute=100000)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise rate_limited()
+        return "ok"
+
+    assert limiter.call(flaky, estimated_tokens=50, priority=PRIORITY_BULK) == "ok"
+    assert len(attempts) == 2
+    assert limiter.stats["rate_limited"] == 1
+    assert limiter.stats["admitted"] == 2
+
+
+def test_gives_up_after_max_retries():
+    limiter = LLMRateLimiter(max_retries=2)
+    attempts = []
+
+    def always_limited():
+        attempts.append(1)
+        raise rate_limited()
+
+    with pytest.raises(FakeAPIError):
+        limiter.call(always_limited, estimated_tokens=10)
+    assert len(attempts) == 3
+
+
+def test_acquire_waits_once_the_request_budget_is_spent():
+    limiter = LLMRateLimiter(requests_per_minute=600, tokens_per_minute=1000000)
+    for _ in range(600):
+        limiter.acquire(1)
+
+    started = time.monotonic()
+    limiter.acquire(1)
+    # One request is refilled every 0.1 s
+    assert time.monotonic() - started >= 0.05
+
+
+def wait_for_waiters(limiter, count):
+    deadline = time.monotonic() + 5
+    while len(limiter._waiters) < count:
+        assert time.monotonic() < deadline, "waiter never queued"
+        time.sleep(0.001)
+
+
+def test_interactive_waiter_is_admitted_before_earlier_bulk_waiter():
+    # One request is refilled every 0.5 s, so both waiters queue up behind it
+    limiter = LLMRateLimiter(requests_per_minute=120, tokens_per_minute=1000000)
+    for _ in range(120):
+        limiter.acquire(1)
+    admitted = []
+
+    def waiter(name, priority):
+        limiter.acquire(1, priority=priority)
+        admitted.append(name)
+
+    bulk = threading.Thread(target=waiter, args=("bulk", PRIORITY_BULK))
+    bulk.start()
+    wait_for_waiters(limiter, 1)
+    interactive = threading.Thread(
+        target=waiter, args=("interactive", PRIORITY_INTERACTIVE)
+    )
+    interactive.start()
+    wait_for_waiters(limiter, 2)
+    bulk.join(timeout=5)
+    interactive.join(timeout=5)
+
+    assert admitted == ["interactive", "bulk"]
+
+
+def test_acall_retries_and_reconciles():
+    limiter = LLMRateLimiter(requests_per_minute=6000, tokens_per_minute=600000)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise rate_limited()
+        return {"total_tokens": 10}
+
+    result = asyncio.run(
+        limiter.acall(flaky, estimated_tokens=200, usage_of=lambda r: r["total_tokens"])
+    )
+
+    assert result == {"total_tokens": 10}
+    assert len(attempts) == 2
+    assert limiter.stats["admitted"] == 2
+    assert limiter.stats["rate_limited"] == 1
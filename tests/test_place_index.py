@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.custom_tools.place_index import PlaceIndex, haversine_km
+
+
+def random_places(rng, count):
+    # Dense clusters around a few cities plus scattered rural places
+    centers = np.array([[23.81, 90.41], [22.36, 91.78], [24.90, 91.87]])
+    clustered = centers[rng.integers(0, 3, count // 2)] + rng.normal(
+        0, 0.05, (count // 2, 2)
+    )
+    rural = count - count // 2
+    scattered = np.column_stack(
+        [rng.uniform(20.7, 26.5, rural), rng.uniform(88.1, 92.6, rural)]
+    )
+    points = np.vstack([clustered, scattered])
+    return [
+        {"name": f"place {i}", "latitude": lat, "longitude": lon}
+        for i, (lat, lon) in enumerate(points)
+    ]
+
+
+def brute_force(index, latitudes, longitudes):
+    query_xy = index._project(latitudes, longitudes)
+    d2 = ((query_xy[:, None, :] - index._xy[None, :, :]) ** 2).sum(axis=-1)
+    return d2.argmin(axis=1)
+
+
+def test_grid_lookup_matches_brute_force():
+    rng = np.random.default_rng(7)
+    index = PlaceIndex(random_places(rng, 2000), cell_km=5.0)
+    # Include points off the coast, far from any place, to exercise the fallback
+    latitudes = rng.uniform(20.0, 27.0, 3000)
+    longitudes = rng.uniform(87.5, 93.0, 3000)
+
+    indices, distances = index.nearest(latitudes, longitudes)
+
+    np.testing.assert_array_equal(indices, brute_force(index, latitudes, longitudes))
+    np.testing.assert_allclose(
+        distances,
+        haversine_km(
+            latitudes,
+            longitudes,
+            index.latitudes[indices],
+            index.longitudes[indices],
+        ),
+    )
+
+
+def test_points_beyond_the_radius_get_no_place():
+    rng = np.random.default_rng(11)
+    index = PlaceIndex(random_places(rng, 500), cell_km=2.0)
+    latitudes = rng.uniform(20.7, 26.5, 1000)
+    longitudes = rng.uniform(88.1, 92.6, 1000)
+
+    indices, distances = index.nearest(latitudes, longitudes, max_distance_km=3.0)
+
+    expected = brute_force(index, latitudes, longitudes)
+    expected_km = haversine_km(
+        latitudes, longitudes, index.latitudes[expected], index.longitudes[expected]
+    )
+    within = expected_km <= 3.0
+    np.testing.assert_array_equal(indices[within], expected[within])
+    assert (indices[~within] == -1).all()
+    assert np.isinf(distances[~within]).all()
+
+
+def test_places_without_coordinates_are_skipped():
+    index = PlaceIndex(
+        [{"name": "Nowhere"}, {"name": "Dhaka", "latitude": 23.81, "longitude": 90.41}]
+    )
+
+    indices, _ = index.nearest([23.7], [90.4])
+
+    assert len(index) == 1
+    assert index.places[indices[0]]["name"] == "Dhaka"
@@ -0,0 +1,270 @@
+import json
+import threading
+
+from app.services.plan_executor import execute_plan_stream, step_dependencies
+from app.services.plan_stream import PlanStepParser, parse_plan_stream
+
+PLAN = [
+    {
+        "step_id": 1,
+        "goal": "Geocode the origin.",
+        "tool": "geocoding.geocode_location",
+        "args": {"location_name": "Khalishpur, Khulna"},
+        "output_key": "origin_geocode",
+    },
+    {
+        "step_id": 2,
+        "goal": "Weather at the origin.",
+        "tool": "weather_tools.get_current_weather",
+        "args": {"city": "Khulna {not a placeholder}", "country_code": "BD"},
+        "output_key": "weather_report",
+    },
+    {
+        "step_id": 3,
+        "goal": "Label the origin.",
+        "tool": "reverse_geocoding.reverse_geocode",
+        "args": {
+            "latitude": "{origin_geocode.latitude}",
+            "longitude": "{origin_geocode.longitude}",
+        },
+        "output_key": "origin_label",
+    },
+    {
+        "step_id": 4,
+        "goal": "Synthesize.",
+        "tool": None,
+        "args": None,
+        "input_keys": ["weather_report", "origin_label"],
+        "output_key": "final_response",
+    },
+]
+
+
+def plan_text():
+    return "```json\n" + json.dumps(PLAN, indent=2) + "\n```\nDone."
+
+
+class FakeGeocoding:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def geocode_location(self, location_name):
+        if self.fail:
+            raise RuntimeError("Nominatim unavailable")
+        return {"latitude": 22.84, "longitude": 89.54, "display_name": location_name}
+
+
+class FakeWeather:
+    def get_current_weather(self, city, country_code=None):
+        return f"Weather in {city}: 30°C"
+
+
+class FakeReverseGeocoding:
+    def __init__(self):
+        self.calls = []
+
+    def reverse_geocode(self, latitude, longitude):
+        self.calls.append((latitude, longitude))
+        return {"label": "Khalishpur, Khulna"}
+
+
+def tool_instances(fail_geocoding=False):
+    return {
+        "geocoding": FakeGeocoding(fail=fail_geocoding),
+        "weather_tools": FakeWeather(),
+        "reverse_geocoding": FakeReverseGeocoding(),
+    }
+
+
+def test_parser_returns_steps_for_any_chunking():
+    text = plan_text()
+    for size in (1, 7, len(text)):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        assert list(parse_plan_stream(chunks)) == PLAN
+
+
+def test_parser_returns_each_step_as_soon_as_it_closes():
+    parser = PlanStepParser()
+    first = json.dumps(PLAN[0])
+
+    assert parser.feed("[" + first[:-1]) == []
+    assert parser.feed("}, " + json.dumps(PLAN[1])[:10]) == [PLAN[0]]
+
+
+def test_braces_and_escapes_inside_strings_are_ignored():
+    step = {"goal": 'Say "}{" and \\ then ]', "tool": None, "output_key": "x"}
+
+    assert list(parse_plan_stream(["[", json.dumps(step), "]"])) == [step]
+
+
+def test_malformed_step_keeps_its_output_key():
+    text = (
+        '[{"step_id": 1, "output_key": "origin_geocode", "args": {,}}, {"step_id": 2}]'
+    )
+
+    steps = list(parse_plan_stream([text]))
+
+    assert steps[0]["output_key"] == "origin_geocode"
+    assert "Malformed plan step" in steps[0]["error"]
+    assert steps[1] == {"step_id": 2}
+
+
+def test_unfinished_step_is_reported_when_the_stream_ends():
+    steps = list(
+        parse_plan_stream(['[{"step_id": 1}, {"step_id": 2, "output_key": "a"'])
+    )
+
+    assert steps[0] == {"step_id": 1}
+    assert steps[1]["output_key"] == "a"
+    assert "ended in the middle" in steps[1]["error"]
+
+
+def test_step_dependencies():
+    assert step_dependencies(PLAN[0]) == set()
+    assert step_dependencies(PLAN[2]) == {"origin_geocode"}
+    assert step_dependencies(PLAN[3]) == {"weather_report", "origin_label"}
+
+
+def test_dependent_steps_get_resolved_outputs():
+    tools = tool_instances()
+
+    context, errors = execute_plan_stream(iter(PLAN), tools, verbose=False)
+
+    assert errors == []
+    assert tools["reverse_geocoding"].calls == [(22.84, 89.54)]
+    assert context["origin_label"] == {"label": "Khalishpur, Khulna"}
+    assert context["weather_report"].startswith("Weather in Khulna")
+    assert context["final_response"] == "Ready for synthesis."
+
+
+def test_steps_start_before_the_plan_is_complete():
+    first_step_ran = threading.Event()
+
+    class SignallingGeocoding(FakeGeocoding):
+        def geocode_location(self, location_name):
+            first_step_ran.set()
+            return super().geocode_location(location_name)
+
+    def slow_plan():
+        yield PLAN[0]
+        # The rest of the plan only arrives once the first step has started
+        assert first_step_ran.wait(timeout=5)
+        yield from PLAN[1:]
+
+    tools = tool_instances()
+    tools["geocoding"] = SignallingGeocoding()
+
+    context, errors = execute_plan_stream(slow_plan(), tools, verbose=False)
+
+    assert errors == []
+    assert "origin_label" in context
+
+
+def test_failed_step_fails_its_dependents_only():
+    tools = tool_instances(fail_geocoding=True)
+
+    context, errors = execute_plan_stream(iter(PLAN), tools, verbose=False)
+
+    assert "origin_geocode" not in context
+    assert "origin_label" not in context
+    assert context["weather_report"].startswith("Weather in Khulna")
+    assert tools["reverse_geocoding"].calls == []
+    assert any("Nominatim unavailable" in error for error in errors)
+    assert any("depends on failed ['origin_geocode']" in error for error in errors)
+    # Synthesis still runs on whatever was gathered
+    assert context["final_response"] == "Ready for synthesis."
+
+
+def test_malformed_step_fails_steps_that_depend_on_it():
+    steps = [
+        {
+            "malformed": "{...}",
+            "error": "Malformed plan step",
+            "output_key": "origin_geocode",
+        }
+    ] + PLAN[1:]
+    tools = tool_instances()
+
+    context, errors = execute_plan_stream(iter(steps), tools, verbose=False)
+
+    assert errors[0] == "Step 1: Malformed plan step"
+    assert any("depends on failed" in error for error in errors)
+    assert "weather_report" in context
+    assert tools["reverse_geocoding"].calls == []
+
+
+def test_missing_inputs_are_reported_when_the_stream_ends():
+    tools = tool_instances()
+
+    context, errors = execute_plan_stream(iter(PLAN[2:3]), tools, verbose=False)
+
+    assert context == {}
+    assert errors == ["Step 1: inputs never produced: ['origin_geocode']"]
+
+
+def test_stream_error_keeps_the_steps_received_so_far():
+    def broken_plan():
+        yield PLAN[0]
+        raise ConnectionError("stream reset")
+
+    context, errors = execute_plan_stream(
+        broken_plan(), tool_instances(), verbose=False
+    )
+
+    assert "origin_geocode" in context
+    assert errors == ["Plan stream failed: stream reset"]
+
+
+def test_unknown_tool_is_reported():
+    step = dict(PLAN[1], tool="weather_tools.get_forecast")
+
+    context, errors = execute_plan_stream(iter([step]), tool_instances(), verbose=False)
+
+    assert context == {}
+    assert errors == ["Step 1: Method 'get_forecast' not found in tool 'weather_tools'"]
+
+
+def test_unknown_tool_instance_is_reported_with_its_step():
+    step = dict(PLAN[1], tool="traffic.get_congestion")
+
+    context, errors = execute_plan_stream(iter([step]), tool_instances(), verbose=False)
+
+    assert context == {}
+    assert errors == ["Step 1: Tool instance 'traffic' not found"]
+
+
+def test_attribute_error_inside_a_tool_is_its_own_error():
+    class BrokenWeather(FakeWeather):
+        def get_current_weather(self, city, country_code=None):
+            return None.temperature
+
+    tools = dict(tool_instances(), weather_tools=BrokenWeather())
+
+    _, errors = execute_plan_stream(iter([PLAN[1]]), tools, verbose=False)
+
+    assert len(errors) == 1
+    assert errors[0].startswith("Step 1: 'NoneType' object has no attribute")
+
+
+def test_step_killed_by_a_base_exception_still_finishes_the_plan():
+    class ExitingWeather(FakeWeather):
+        def get_current_weather(self, city, country_code=None):
+            raise SystemExit(1)
+
+    tools = dict(tool_instances(), weather_tools=ExitingWeather())
+    outcome = {}
+    thread = threading.Thread(
+        target=lambda: outcome.update(
+            zip(
+                ("context", "errors"),
+                execute_plan_stream(iter(PLAN), tools, verbose=False),
+            )
+        ),
+        daemon=True,
+    )
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive(), "executor hung on the interrupted step"
+    assert outcome["errors"] == ["Step 2: interrupted"]
+    assert outcome["context"]["origin_label"] == {"label": "Khalishpur, Khulna"}
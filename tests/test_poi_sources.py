@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from app.services.poi_sources import (
+    iter_json_array,
+    iter_poi_text,
+    normalize_poi,
+    parse_coordinates,
+)
+
+
+def test_json_array_elements_survive_chunk_boundaries(tmp_path):
+    records = [{"name": f"POI {i}", "latitude": 23.5 + i / 1000} for i in range(50)]
+    path = tmp_path / "pois.json"
+    path.write_text(json.dumps(records, indent=2), encoding="utf-8")
+
+    for chunk_size in (1, 7, 4096):
+        assert list(iter_json_array(str(path), chunk_size=chunk_size)) == records
+
+
+def test_non_array_json_is_rejected(tmp_path):
+    path = tmp_path / "pois.json"
+    path.write_text('{"name": "Lalbagh Fort"}', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
+
+
+def test_text_records_are_read_field_by_field(tmp_path):
+    path = tmp_path / "pois.txt"
+    path.write_text(
+        "1. Lalbagh Fort (Lalbagh Kella)\n"
+        "Type: Mughal Historical Fort\n"
+        "Coordinates: 23.7186° N, 90.3886° E\n"
+        "2. Star Mosque\n"
+        "Key Features: Mosaic of Japanese tiles\n",
+        encoding="utf-8",
+    )
+
+    records = list(iter_poi_text(str(path)))
+
+    assert records == [
+        {
+            "name": "Lalbagh Fort (Lalbagh Kella)",
+            "type": "Mughal Historical Fort",
+            "coordinates": "23.7186° N, 90.3886° E",
+        },
+        {"name": "Star Mosque", "key_features": "Mosaic of Japanese tiles"},
+    ]
+
+
+def test_coordinates_and_hemispheres():
+    assert parse_coordinates("23.7186° N, 90.3886° E") == (23.7186, 90.3886)
+    assert parse_coordinates("33.9 S, 18.4 W") == (-33.9, -18.4)
+    assert parse_coordinates("near the river") == (None, None)
+
+
+def test_normalized_poi_has_numeric_coordinates():
+    poi = normalize_poi(
+        {"name": " Star   Mosque ", "coordinates": "23.7144, 90.4022", "type": ""},
+        "text",
+    )
+
+    assert poi == {
+        "name": "Star Mosque",
+        "latitude": 23.7144,
+        "longitude": 90.4022,
+        "source": "text",
+    }
@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+from app.services.prefork import PreforkSupervisor
+
+
+def handle(state, task):
+    kind, value = task
+    if kind == "die":
+        os._exit(3)
+    if kind == "hang":
+        time.sleep(60)
+    if kind == "unpicklable":
+        return threading.Lock()
+    return value * 2
+
+
+def run(tasks, **options):
+    with PreforkSupervisor(2, handle, **options) as supervisor:
+        outcomes = {
+            task: (result, error) for task, result, error in supervisor.map(tasks)
+        }
+    return outcomes, supervisor
+
+
+def test_results_come_back_for_every_task():
+    tasks = [("ok", i) for i in range(20)]
+
+    outcomes, supervisor = run(tasks, threads_per_process=2)
+
+    assert outcomes == {task: (task[1] * 2, None) for task in tasks}
+    assert supervisor.restarts == 0
+
+
+def test_dead_worker_is_replaced_and_its_tasks_failed():
+    tasks = (
+        [("ok", i) for i in range(5)] + [("die", 0)] + [("ok", i) for i in range(5, 15)]
+    )
+
+    outcomes, supervisor = run(tasks)
+
+    assert set(outcomes) == set(tasks)
+    assert outcomes[("die", 0)] == (None, "Worker process died")
+    assert supervisor.restarts == 1
+    failed = [task for task, (_, error) in outcomes.items() if error]
+    # Only the tasks queued on the dead worker are lost
+    assert len(failed) <= supervisor.capacity
+    assert all(
+        result == task[1] * 2
+        for task, (result, error) in outcomes.items()
+        if error is None
+    )
+
+
+def test_unpicklable_result_is_reported_instead_of_lost():
+    tasks = [("unpicklable", 0), ("ok", 1)]
+
+    outcomes, _ = run(tasks, task_timeout=10)
+
+    result, error = outcomes[("unpicklable", 0)]
+    assert result is None and "pickle" in error
+    assert outcomes[("ok", 1)] == (2, None)
+
+
+def test_stuck_task_times_out_and_its_worker_is_replaced():
+    tasks = [("hang", 0)] + [("ok", i) for i in range(1, 6)]
+    started = time.monotonic()
+
+    outcomes, supervisor = run(tasks, task_timeout=0.5)
+
+    assert time.monotonic() - started < 20
+    assert outcomes[("hang", 0)] == (None, "Task timed out after 0.5 s")
+    assert supervisor.restarts == 1
+    assert set(outcomes) == set(tasks)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.vector_store.quantized_index import QuantizedVectorIndex, normalize_rows
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(2000, 256)).astype(np.float32)
+    # Queries near stored vectors, so there is a meaningful top 10 to recover
+    queries = vectors[rng.choice(len(vectors), 50, replace=False)]
+    queries = queries + rng.normal(scale=0.8, size=queries.shape).astype(np.float32)
+    return vectors, queries
+
+
+def exact_top_k(vectors, queries, k):
+    scores = normalize_rows(queries) @ normalize_rows(vectors).T
+    return np.argsort(-scores, axis=1)[:, :k], scores
+
+
+def recall(results, expected):
+    hits = sum(
+        len({i for i, _ in found} & set(wanted.tolist()))
+        for found, wanted in zip(results, expected)
+    )
+    return hits / expected.size
+
+
+def test_rescored_search_recovers_the_exact_neighbours(data):
+    vectors, queries = data
+    index = QuantizedVectorIndex.build(vectors, ids=range(len(vectors)))
+    expected, exact_scores = exact_top_k(vectors, queries, 10)
+
+    results = index.search_batch(queries, k=10, oversample=4)
+
+    assert recall(results, expected) >= 0.99
+    # Rescored similarities are the full-precision ones
+    for row, found in enumerate(results):
+        ids = [i for i, _ in found]
+        assert [score for _, score in found] == pytest.approx(
+            exact_scores[row, ids].tolist(), abs=1e-5
+        )
+
+
+def test_quantized_scores_alone_stay_close(data):
+    vectors, queries = data
+    index = QuantizedVectorIndex.build(vectors, ids=range(len(vectors)))
+    expected, exact_scores = exact_top_k(vectors, queries, 10)
+
+    results = index.search_batch(queries, k=10, oversample=1)
+
+    assert recall(results, expected) >= 0.9
+    for row, found in enumerate(results):
+        for i, score in found:
+            assert score == pytest.approx(exact_scores[row, i], abs=0.01)
+
+
+def test_saved_index_searches_the_same(tmp_path, data):
+    vectors, queries = data
+    ids = [f"poi-{i}" for i in range(len(vectors))]
+    built = QuantizedVectorIndex.build(vectors, ids=ids, metadata=[{"i": 1}] * 2000)
+    built.save(str(tmp_path))
+
+    loaded = QuantizedVectorIndex.load(str(tmp_path), mmap_codes=True)
+
+    assert loaded.dimensions == 256
+    assert loaded.memory_bytes() == 2000 * (256 + 4)
+    assert loaded.search(queries[0], k=5) == built.search(queries[0], k=5)
+    # Without the full-precision vectors only the int8 codes are searched
+    approximate = QuantizedVectorIndex.load(str(tmp_path), rescore=False)
+    assert approximate.full_vectors is None
+    assert approximate.search(vectors[7], k=1)[0][0] == "poi-7"
+
+
+def test_empty_index_returns_no_results():
+    index = QuantizedVectorIndex.build(np.zeros((0, 8)), ids=[])
+
+    assert index.search_batch([np.ones(8)], k=3) == [[]]
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agno.models.message import Message
+
+from app.agents import rate_limited_model
+from app.agents.rate_limited_model import RateLimitedOpenAIChat
+from app.services.llm_rate_limiter import LLMRateLimiter
+
+
+def chunk(content=None, total_tokens=None):
+    usage = SimpleNamespace(total_tokens=total_tokens) if total_tokens else None
+    return SimpleNamespace(content=content, usage=usage)
+
+
+STREAM = [chunk("Ride "), chunk("safe."), chunk(total_tokens=40)]
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return iter(STREAM)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+
+        async def stream():
+            for item in STREAM:
+                yield item
+
+        return stream()
+
+
+def fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    shared = LLMRateLimiter(requests_per_minute=1000, tokens_per_minute=10000)
+    monkeypatch.setattr(rate_limited_model, "get_llm_rate_limiter", lambda: shared)
+    return shared
+
+
+def make_model():
+    return RateLimitedOpenAIChat(id="gpt-4o-mini", api_key="test", max_tokens=500)
+
+
+def test_stream_requests_usage_and_reconciles_it(limiter):
+    model = make_model()
+    completions = FakeCompletions()
+    model._client = fake_client(completions)
+
+    chunks = list(model.invoke_stream([Message(role="user", content="hi")]))
+
+    assert chunks == STREAM
+    assert completions.requests[0]["stream_options"] == {"include_usage": True}
+    # The estimate (prompt + 500 completion tokens) is replaced by the 40 used
+    assert limiter._token_allowance == pytest.approx(10000 - 40, abs=5)
+
+
+def test_async_stream_requests_usage_and_reconciles_it(limiter):
+    model = make_model()
+    completions = FakeAsyncCompletions()
+    model.get_async_client = lambda: fake_client(completions)
+
+    async def consume():
+        stream = model.ainvoke_stream([Message(role="user", content="hi")])
+        return [item async for item in stream]
+
+    chunks = asyncio.run(consume())
+
+    assert chunks == STREAM
+    assert completions.requests[0]["stream_options"] == {"include_usage": True}
+    assert limiter._token_allowance == pytest.approx(10000 - 40, abs=5)
@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.request_dedup import SharedRequestCache, wrap_tool_instances
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class FakeGeocoding:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def geocode_location(self, location_name, country_code="bd"):
+        with self.lock:
+            self.calls.append(location_name)
+        return {"latitude": 23.74, "longitude": 90.37, "display_name": location_name}
+
+    def describe(self):
+        return "not deduplicated"
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = SharedRequestCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return {"latitude": 1.0}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(cache.get_or_compute, "geocoding", "dhanmondi", compute)
+            for _ in range(8)
+        ]
+        # Let every caller reach the cache before the owner finishes
+        wait_until(lambda: sum(cache.stats.get("geocoding", {}).values()) == 8)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == {"latitude": 1.0} for result in results)
+    assert cache.stats["geocoding"] == {"hits": 7, "misses": 1}
+
+
+def test_failed_results_are_not_shared():
+    cache = SharedRequestCache()
+    results = iter([{}, "Error fetching OSRM routing data", {"latitude": 1.0}])
+
+    assert cache.get_or_compute("ns", "key", lambda: next(results)) == {}
+    assert cache.get_or_compute("ns", "key", lambda: next(results)).startswith("Error")
+    assert cache.get_or_compute("ns", "key", lambda: next(results)) == {"latitude": 1.0}
+    assert cache.get_or_compute("ns", "key", lambda: next(results)) == {"latitude": 1.0}
+
+
+def test_exception_reaches_waiters_and_is_not_cached():
+    cache = SharedRequestCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        owner = pool.submit(cache.get_or_compute, "ns", "key", failing)
+        started.wait(timeout=5)
+        waiter = pool.submit(cache.get_or_compute, "ns", "key", lambda: "unused")
+        wait_until(lambda: cache.stats["ns"]["hits"] == 1)
+        release.set()
+        for future in (owner, waiter):
+            with pytest.raises(RuntimeError, match="upstream down"):
+                future.result(timeout=5)
+
+    assert cache.get_or_compute("ns", "key", lambda: "recovered") == "recovered"
+
+
+def test_completed_entries_are_bounded():
+    cache = SharedRequestCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute("ns", key, lambda: key)
+
+    calls = []
+    cache.get_or_compute("ns", "a", lambda: calls.append("a") or "a")
+    cache.get_or_compute("ns", "c", lambda: calls.append("c") or "c")
+    assert calls == ["a"]
+
+
+def test_proxy_dedups_equivalent_geocodes_only():
+    geocoding = FakeGeocoding()
+    tools = wrap_tool_instances({"geocoding": geocoding}, SharedRequestCache())
+
+    first = tools["geocoding"].geocode_location(location_name="Dhanmondi,  Dhaka")
+    second = tools["geocoding"].geocode_location(location_name="dhanmondi, dhaka")
+    other = tools["geocoding"].geocode_location(location_name="Khalishpur, Khulna")
+
+    assert first is second
+    assert other["display_name"] == "Khalishpur, Khulna"
+    assert geocoding.calls == ["Dhanmondi,  Dhaka", "Khalishpur, Khulna"]
+    assert tools["geocoding"].describe() == "not deduplicated"
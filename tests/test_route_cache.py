@@ -0,0 +1,151 @@
+import pytest
+
+from app.custom_tools.route_cache import (
+    METERS_PER_DEGREE,
+    RouteCache,
+    decode_polyline,
+    encode_polyline,
+)
+
+ORIGIN = (23.7465, 90.3760)  # Dhanmondi
+DESTINATION = (23.7104, 90.4074)  # Old Dhaka
+
+
+def make_route():
+    return {
+        "distance": 6000.0,
+        "duration": 1500.0,
+        "geometry": encode_polyline([list(ORIGIN), [23.73, 90.39], list(DESTINATION)]),
+        "steps": [
+            ["depart", "", "Road 27", 1200.0],
+            ["turn", "left", "Mirpur Road", 4800.0],
+            ["arrive", "", "", 0.0],
+        ],
+        "start": list(ORIGIN),
+        "end": list(DESTINATION),
+    }
+
+
+def north_of(point, meters):
+    return point[0] + meters / METERS_PER_DEGREE, point[1]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    route_cache = RouteCache(path=str(tmp_path / "routes.sqlite3"))
+    route_cache.store(*ORIGIN, *DESTINATION, make_route())
+    yield route_cache
+    route_cache.close()
+
+
+def test_exact_endpoints_return_the_stored_route(cache):
+    route = cache.lookup(*ORIGIN, *DESTINATION)
+
+    assert route == make_route()
+    assert cache.stats == {"exact_hits": 1, "approximate_hits": 0, "misses": 0}
+    assert cache.contains(*ORIGIN, *DESTINATION)
+
+
+def test_nearby_endpoints_get_connector_legs(cache):
+    origin = north_of(ORIGIN, 120)
+    destination = north_of(DESTINATION, -200)
+
+    route = cache.lookup(*origin, *destination)
+
+    assert cache.stats["approximate_hits"] == 1
+    assert route["steps"][0][:2] == ["connector", "start"]
+    # The end connector goes before the arrive step
+    assert route["steps"][-2][:2] == ["connector", "end"]
+    assert route["steps"][-1][0] == "arrive"
+    assert route["distance"] == pytest.approx(6000 + 120 + 200, abs=2)
+    geometry = decode_polyline(route["geometry"])
+    assert geometry[0] == pytest.approx(list(origin), abs=1e-5)
+    assert geometry[-1] == pytest.approx(list(destination), abs=1e-5)
+    # Approximate hits do not count as stored for these endpoints
+    assert not cache.contains(*origin, *destination)
+
+
+def test_endpoints_beyond_tolerance_miss(cache):
+    assert cache.lookup(*north_of(ORIGIN, 400), *DESTINATION) is None
+    assert cache.lookup(*ORIGIN, *north_of(DESTINATION, 400)) is None
+    assert cache.stats["misses"] == 2
+
+
+def test_neighbouring_cells_are_searched(tmp_path):
+    route_cache = RouteCache(path=str(tmp_path / "routes.sqlite3"), cell_size_m=50)
+    route_cache.store(*ORIGIN, *DESTINATION, make_route())
+
+    # 200 m away is several 50 m cells over, but still within the 250 m tolerance
+    assert route_cache.lookup(*north_of(ORIGIN, 200), *DESTINATION) is not None
+    route_cache.close()
+
+
+def test_expired_routes_are_not_used(tmp_path):
+    path = str(tmp_path / "routes.sqlite3")
+    RouteCache(path=path).store(*ORIGIN, *DESTINATION, make_route())
+
+    expired = RouteCache(path=path, max_age_days=0)
+    assert expired.lookup(*ORIGIN, *DESTINATION) is None
+    assert not expired.contains(*ORIGIN, *DESTINATION)
+
+
+def test_changing_the_grid_clears_the_cache(tmp_path):
+    path = str(tmp_path / "routes.sqlite3")
+    RouteCache(path=path).store(*ORIGIN, *DESTINATION, make_route())
+
+    assert RouteCache(path=path, cell_size_m=100).lookup(*ORIGIN, *DESTINATION) is None
+
+
+class FakeOSRMResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        route = make_route()
+        return {
+            "code": "Ok",
+            "routes": [
+                {
+                    "distance": route["distance"],
+                    "duration": route["duration"],
+                    "geometry": route["geometry"],
+                    "legs": [{"steps": []}],
+                }
+            ],
+            "waypoints": [
+                {"location": [ORIGIN[1], ORIGIN[0]]},
+                {"location": [DESTINATION[1], DESTINATION[0]]},
+            ],
+        }
+
+
+def test_routing_tools_serve_repeated_routes_from_the_cache(tmp_path, monkeypatch):
+    from app.custom_tools import routing
+
+    calls = []
+    monkeypatch.setattr(
+        routing.requests, "get", lambda url: calls.append(url) or FakeOSRMResponse()
+    )
+    route_cache = RouteCache(path=str(tmp_path / "routes.sqlite3"))
+    tools = routing.RoutingTools(route_cache=route_cache)
+
+    first = tools.get_route(*ORIGIN, *DESTINATION)
+    second = tools.get_route(*(str(value) for value in (*ORIGIN, *DESTINATION)))
+
+    assert first == second
+    assert len(calls) == 1
+    route_cache.close()
+
+
+def test_routing_tools_do_not_cache_unparsable_endpoints(tmp_path, monkeypatch):
+    from app.custom_tools import routing
+
+    monkeypatch.setattr(routing.requests, "get", lambda url: FakeOSRMResponse())
+    route_cache = RouteCache(path=str(tmp_path / "routes.sqlite3"))
+    tools = routing.RoutingTools(route_cache=route_cache)
+
+    result = tools.get_route("{origin.latitude}", ORIGIN[1], *DESTINATION)
+
+    assert not result.startswith("Unexpected error")
+    assert route_cache.lookup(*ORIGIN, *DESTINATION) is None
+    route_cache.close()
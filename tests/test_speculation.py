@@ -0,0 +1,193 @@
+from concurrent.futures import Future
+
+import pytest
+
+from app.services.speculation import LocationExtractor, Speculation, Speculator
+
+PLACES = [
+    {"name": "Dhaka", "kind": "division", "latitude": 23.81, "longitude": 90.41},
+    {"name": "Dhaka", "kind": "district", "latitude": 23.81, "longitude": 90.41},
+    {"name": "Khulna", "kind": "district", "latitude": 22.85, "longitude": 89.54},
+    {
+        "name": "Khalishpur",
+        "kind": "neighborhood",
+        "district": "Khulna",
+        "latitude": 22.87,
+        "longitude": 89.52,
+    },
+    {
+        "name": "Dhanmondi",
+        "kind": "neighborhood",
+        "district": "Dhaka",
+        "latitude": 23.75,
+        "longitude": 90.38,
+    },
+    {
+        "name": "Gulshan",
+        "kind": "neighborhood",
+        "district": "Dhaka",
+        "latitude": 23.79,
+        "longitude": 90.41,
+    },
+]
+
+KHALISHPUR = {
+    "latitude": 22.87,
+    "longitude": 89.52,
+    "display_name": "Khalishpur, Khulna",
+}
+DHANMONDI = {"latitude": 23.75, "longitude": 90.38, "display_name": "Dhanmondi, Dhaka"}
+
+
+@pytest.fixture
+def extractor():
+    return LocationExtractor(places=PLACES)
+
+
+def done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def test_gazetteer_places_are_qualified_with_their_district(extractor):
+    assert extractor.describe("Khalishpur, Bangladesh") == {
+        "name": "Khalishpur, Khulna",
+        "city": "Khulna",
+    }
+    # The district seat wins over the division of the same name
+    assert extractor.describe("Dhaka Division") == {"name": "Dhaka", "city": "Dhaka"}
+
+
+def test_unknown_places_only_get_a_city_from_a_known_qualifier(extractor):
+    assert extractor.describe("Gulshan 1") == {"name": "gulshan 1", "city": None}
+    assert extractor.describe("Gulshan 1, Dhaka") == {
+        "name": "gulshan 1, dhaka",
+        "city": "Dhaka",
+    }
+
+
+def test_extract_route_phrasings(extractor):
+    origin, destination = extractor.extract(
+        "Plan a ride from Khalishpur to Dhanmondi, Dhaka tomorrow"
+    )
+    assert origin["name"] == "Khalishpur, Khulna"
+    assert destination["name"] == "Dhanmondi, Dhaka"
+
+    origin, destination = extractor.extract("cycle between Gulshan and Dhanmondi")
+    assert (origin["name"], destination["name"]) == (
+        "Gulshan, Dhaka",
+        "Dhanmondi, Dhaka",
+    )
+
+
+def test_extract_falls_back_to_the_places_mentioned(extractor):
+    origin, destination = extractor.extract("Is it rainy in Khalishpur today?")
+
+    assert origin["name"] == "Khalishpur, Khulna"
+    assert destination is None
+
+
+def test_city_from_a_geocoded_address(extractor):
+    address = "Gulshan Avenue, Gulshan, Dhaka, Dhaka Division, 1212, Bangladesh"
+
+    assert extractor.city_from_address(address) == "Dhaka"
+    assert extractor.city_from_address("Somewhere, Bangladesh") is None
+
+
+def make_speculation(extractor):
+    speculation = Speculation(
+        extractor.describe("Khalishpur"), extractor.describe("Dhanmondi")
+    )
+    speculation.futures = {
+        "origin_geocode": done(KHALISHPUR),
+        "destination_geocode": done(DHANMONDI),
+        "origin_weather": done("Weather in Khulna: 30°C"),
+        "destination_weather": done("Error fetching weather"),
+        "route": done("### Route Overview"),
+    }
+    return speculation
+
+
+def test_geocode_is_reused_only_for_the_same_place(extractor):
+    speculation = make_speculation(extractor)
+
+    assert speculation.match_geocode("Khalishpur, Khulna, Bangladesh") == KHALISHPUR
+    assert speculation.match_geocode("Khalishpur, Dhaka") is None
+    assert speculation.match_geocode("Gulshan") is None
+
+
+def test_weather_is_reused_only_when_it_succeeded(extractor):
+    speculation = make_speculation(extractor)
+
+    assert speculation.match_weather("khulna", "BD") == "Weather in Khulna: 30°C"
+    assert speculation.match_weather("Khulna", "US") is None
+    # Failed calls are never reused
+    assert speculation.match_weather("Dhaka") is None
+
+
+def test_route_is_reused_only_between_the_speculated_geocodes(extractor):
+    speculation = make_speculation(extractor)
+    endpoints = {
+        "origin_latitude": "22.87",
+        "origin_longitude": 89.52,
+        "destination_latitude": 23.75,
+        "destination_longitude": 90.38,
+    }
+
+    assert speculation.match_route(**endpoints) == "### Route Overview"
+    assert speculation.match_route(**dict(endpoints, origin_latitude=22.9)) is None
+    assert speculation.match_route(**dict(endpoints, origin_latitude="{x}")) is None
+
+
+class FakeGeocoding:
+    def __init__(self, results):
+        self.results = results
+
+    def geocode_location(self, location_name, country_code="bd"):
+        return self.results.get(location_name, {})
+
+
+class FakeWeather:
+    def __init__(self):
+        self.cities = []
+
+    def get_current_weather(self, city, country_code=None):
+        self.cities.append(city)
+        return f"Weather in {city}"
+
+
+def run_speculator(extractor, query, geocodes):
+    weather = FakeWeather()
+    speculator = Speculator(
+        {"geocoding": FakeGeocoding(geocodes), "weather_tools": weather},
+        extractor=extractor,
+    )
+    speculation = speculator.start(query)
+    for future in speculation.futures.values():
+        future.result(timeout=5)
+    speculator.shutdown()
+    return speculation, weather
+
+
+def test_weather_for_an_unknown_place_waits_for_its_geocode(extractor):
+    address = {
+        "latitude": 23.78,
+        "longitude": 90.41,
+        "display_name": "Gulshan 1, Gulshan, Dhaka, Bangladesh",
+    }
+
+    speculation, weather = run_speculator(
+        extractor, "from Gulshan 1 to Khalishpur", {"gulshan 1": address}
+    )
+
+    assert sorted(weather.cities) == ["Dhaka", "Khulna"]
+    assert speculation.origin["city"] == "Dhaka"
+    assert speculation.match_weather("Dhaka") == "Weather in Dhaka"
+
+
+def test_no_weather_is_speculated_for_an_unresolved_raw_name(extractor):
+    speculation, weather = run_speculator(extractor, "from Gulshan 1 to Banani 11", {})
+
+    assert weather.cities == []
+    assert speculation.match_weather("gulshan 1") is None
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from agno.agent import Agent
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage
+
+from app.agents.rate_limited_model import RateLimitedOpenAIChat
+from app.agents.stateless_agent import StatelessAgentMixin
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return ChatCompletion(
+            id="completion",
+            created=0,
+            model="gpt-4o-mini",
+            object="chat.completion",
+            choices=[
+                Choice(
+                    finish_reason="stop",
+                    index=0,
+                    message=ChatCompletionMessage(role="assistant", content="ok"),
+                )
+            ],
+            usage=CompletionUsage(prompt_tokens=5, completion_tokens=1, total_tokens=6),
+        )
+
+
+class EchoAgent(StatelessAgentMixin, Agent):
+    pass
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("AGNO_TELEMETRY", "false")
+    model = RateLimitedOpenAIChat(id="gpt-4o-mini", api_key="test")
+    completions = FakeCompletions()
+    model._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    echo = EchoAgent(model=model, instructions="Answer briefly.")
+    echo.completions = completions
+    return echo
+
+
+def test_released_session_keeps_no_runs(agent):
+    agent.run("hello", session_id="kept")
+    assert agent.memory.runs
+
+    agent.release_session()
+
+    assert not agent.memory.runs
+    assert not agent.memory.memories and not agent.memory.summaries
+    assert agent.session_id is None
+    assert agent.run_response is None
+
+
+def test_isolated_runs_do_not_accumulate(agent):
+    for i in range(3):
+        assert agent.run_isolated(f"hello {i}").content == "ok"
+
+    assert not agent.memory.runs
+    # Every request sees only the system message and its own message
+    assert [len(request["messages"]) for request in agent.completions.requests] == [
+        2,
+        2,
+        2,
+    ]
+    assert agent.completions.requests[-1]["messages"][-1]["content"] == "hello 2"
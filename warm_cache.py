@@ -0,0 +1,182 @@
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+from app.custom_tools.geocoding import GeocodingTools
+from app.custom_tools.geocode_cache import GeocodeCache
+from app.custom_tools.routing import RoutingTools
+from app.custom_tools.route_cache import RouteCache
+from app.services.cache_warmup import (
+    DEFAULT_INTEREST_PHRASES,
+    CacheWarmer,
+    default_neighborhoods,
+    iter_query_texts,
+    load_name_list,
+    local_route_pairs,
+    print_coverage,
+    qualified_poi_names,
+    query_route_pairs,
+)
+from app.services.poi_sources import iter_json_array
+from app.services.speculation import LocationExtractor
+
+
+def warm_caches(cli_args):
+    """Fills the geocode, route and embedding caches; returns the coverage."""
+    geocode_cache = GeocodeCache()
+    route_cache = RouteCache()
+    embedding_service = None
+    if os.getenv("OPENAI_API_KEY"):
+        from app.services.embedding_cache import EmbeddingCache
+        from app.services.embedding_service import EmbeddingService
+
+        embedding_service = EmbeddingService(cache=EmbeddingCache())
+    else:
+        print("OPENAI_API_KEY not set, interest phrases will not be embedded")
+
+    warmer = CacheWarmer(
+        GeocodingTools(geocode_cache=geocode_cache),
+        RoutingTools(route_cache=route_cache),
+        embedding_service,
+        geocode_interval_s=cli_args.geocode_interval,
+        route_interval_s=cli_args.route_interval,
+        report_only=cli_args.report_only,
+    )
+    print(f"Geocode cache:   {geocode_cache.path}")
+    print(f"Route cache:     {route_cache.path}")
+    if embedding_service is not None:
+        print(f"Embedding cache: {embedding_service.cache.path}")
+
+    extractor = LocationExtractor()
+    if cli_args.neighborhoods:
+        neighborhoods = [
+            extractor.describe(name) for name in load_name_list(cli_args.neighborhoods)
+        ]
+        neighborhoods = [place for place in neighborhoods if place]
+    else:
+        neighborhoods = default_neighborhoods(extractor)
+    route_pairs = None
+    if cli_args.queries:
+        route_pairs = query_route_pairs(
+            extractor, iter_query_texts(cli_args.queries), cli_args.route_pairs
+        )
+
+    try:
+        print("\nGeocoding points of interest...")
+        pois = (
+            list(iter_json_array(cli_args.pois))
+            if cli_args.pois.endswith(".json")
+            else load_name_list(cli_args.pois)
+        )
+        warmer.warm_geocodes("POI geocodes", qualified_poi_names(pois, extractor))
+
+        print("Geocoding neighbourhoods...")
+        geocodes = warmer.warm_geocodes(
+            "Neighbourhood geocodes", [place["name"] for place in neighborhoods]
+        )
+
+        if route_pairs is not None:
+            print("Geocoding places from past queries...")
+            geocodes.update(
+                warmer.warm_geocodes(
+                    "Query place geocodes",
+                    [name for pair in route_pairs for name in pair],
+                )
+            )
+        else:
+            route_pairs = local_route_pairs(
+                neighborhoods,
+                geocodes,
+                cli_args.route_pairs,
+                max_distance_km=cli_args.max_route_km,
+            )
+
+        print(f"Routing {len(route_pairs)} place pairs...")
+        warmer.warm_routes("Route matrix", route_pairs, geocodes)
+
+        print("Embedding interest phrases...")
+        phrases = (
+            load_name_list(cli_args.phrases)
+            if cli_args.phrases
+            else DEFAULT_INTEREST_PHRASES
+        )
+        warmer.warm_embeddings("Interest phrase embeddings", phrases)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the command again to continue where it stopped")
+        print_coverage(warmer.coverage)
+        sys.exit(130)
+
+    return warmer.coverage
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Precompute geocodes, routes and query embeddings into the persistent caches."
+    )
+    parser.add_argument(
+        "--pois",
+        default="data/points_of_interest_bangladesh.json",
+        help="POIs to geocode (JSON array with 'name', or one name per line)",
+    )
+    parser.add_argument(
+        "--neighborhoods",
+        help="Neighbourhoods to geocode, one per line or a JSON array "
+        "(default: district seats and neighbourhoods in data/places_bangladesh.json)",
+    )
+    parser.add_argument(
+        "--queries",
+        help="Batch input JSONL of past queries; routes are warmed for their most "
+        "frequent origin/destination pairs instead of nearby neighbourhood pairs",
+    )
+    parser.add_argument(
+        "--route-pairs", type=int, default=200, help="Number of routes to warm"
+    )
+    parser.add_argument(
+        "--max-route-km",
+        type=float,
+        default=40.0,
+        help="Longest straight-line distance for neighbourhood pairs",
+    )
+    parser.add_argument(
+        "--phrases", help="Interest phrases to embed, one per line or a JSON array"
+    )
+    parser.add_argument(
+        "--geocode-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between Nominatim requests (its usage policy allows one per second)",
+    )
+    parser.add_argument(
+        "--route-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between OSRM requests",
+    )
+    parser.add_argument(
+        "--report-only",
+        action="store_true",
+        help="Only report cache coverage, without calling any service",
+    )
+    parser.add_argument(
+        "--min-coverage",
+        type=float,
+        default=0.0,
+        help="Exit with an error if any section ends below this coverage (percent)",
+    )
+    cli_args = parser.parse_args()
+
+    print("🔥 CACHE WARM-UP")
+    coverage = warm_caches(cli_args)
+    print_coverage(coverage)
+
+    below = [
+        entry["section"]
+        for entry in coverage
+        if entry["total"]
+        and 100.0 * (entry["cached"] + entry["fetched"]) / entry["total"]
+        < cli_args.min_coverage
+    ]
+    if below:
+        print(f"❌ Below {cli_args.min_coverage}% coverage: {', '.join(below)}")
+    sys.exit(1 if below else 0)